@@ -1,80 +1,111 @@
+"""
+사분면 분석 결과 전략 지도 (seoul_strategic_map.html)
+
+행정동 좌표는 면적.csv 중심 좌표(modeling/dong_geo.py)에서 가져오므로 분석 표에 있는 행정동은 모두 지도에 올라간다.
+마커는 행정동마다 CircleMarker + HTML 팝업을 따로 만들지 않고 점 피처 GeoJSON 레이어 하나로 묶어
+클러스터 레이어에 올린다. 색/크기/툴팁/팝업은 피처 속성을 읽는 템플릿 하나라서
+행정동 전체(약 425개)를 올려도 HTML이 작고 지도가 바로 뜬다.
+
+    python seoul.strategic_map.py
+"""
+import os
+import sys
+import time
+
 import pandas as pd
 import folium
-from folium.plugins import Fullscreen
-
-# 1. 데이터 로드 및 분석
-df = pd.read_csv('quad_analysis2.csv')
-cols_to_norm = ['CAGR', 'avg_naver', 'blog_post']
-
-# 순위(Rank) 변환
-df_rank = df[cols_to_norm].rank(pct=True)
-w1, w2, w3 = 0.34, 0.33, 0.33 
-
-# X, Y 지수 생성 (0~1 사이 값)
-df['X_Index'] = (df_rank['CAGR'] * w1) + (df_rank['avg_naver'] * w2) + (df_rank['blog_post'] * w3)
-df['Y_Index'] = df['하이브리드_점수'].rank(pct=True)
-
-# 2. 위경도 딕셔너리 (성수동 키값 반영 버전)
-geo_master = {
-    '가산동': [37.4766, 126.8872], '여의동': [37.5244, 126.9317], '서교동': [37.5543, 126.9208],
-    '압구정동': [37.5303, 127.0305], '상암동': [37.5815, 126.8860], '삼성1동': [37.5144, 127.0626],
-    '서초2동': [37.4877, 127.0315], '대치4동': [37.4997, 127.0526], '성수동': [37.5415, 127.0435],
-    '청담동': [37.5251, 127.0492], '문정2동': [37.4851, 127.1202], '용강동': [37.5413, 126.9408],
-    '서초3동': [37.4836, 127.0116], '신당동': [37.5566, 127.0163], '염리동': [37.5463, 126.9458],
-    '양평2동': [37.5381, 126.8920], '송파2동': [37.5019, 127.1121], '방배1동': [37.4831, 126.9934],
-    '논현2동': [37.5173, 127.0372], '중림동': [37.5595, 126.9672], '구로3동': [37.4851, 126.8943],
-    '효창동': [37.5435, 126.9632], '삼성2동': [37.5111, 127.0459]
-}
-
-# 3. 지도 초기화
-m = folium.Map(location=[37.55, 126.98], zoom_start=12, tiles='CartoDB positron')
-
-# 4. 분석 결과를 바탕으로 지도에 마커 추가
-for i, row in df.iterrows():
-    name = row['행정동']
-    if name not in geo_master: continue  # 좌표 없는 동네는 패스
-    
-    x, y = row['X_Index'], row['Y_Index']
-    coords = geo_master[name]
-    
-    # 사분면 판정 및 스타일 설정 (님의 Matplotlib 색상 로직 반영)
-    if x >= 0.5 and y >= 0.5:
-        color, label = '#e74c3c', '1사분면 (핵심)'
-    elif x < 0.5 and y >= 0.5:
-        color, label = '#f1c40f', '2사분면 (잠재)'
-    elif x < 0.5 and y < 0.5:
-        color, label = '#95a5a6', '3사분면 (정체)'
-    else:
-        color, label = '#3498db', '4사분면 (효율)'
-        
-    # 유망주(송파2동, 양평2동) 및 추격자(신당동) 강조 로직 추가
-    weight = 1
-    radius = 12
-    if name in ['송파2동', '양평2동', '신당동']:
-        weight = 4  # 테두리 강조
-        radius = 16 # 크기 키움
-        
-    # 마커 추가
-    folium.CircleMarker(
-        location=coords,
-        radius=radius,
-        color=color,
-        fill=True,
-        fill_color=color,
-        fill_opacity=0.7,
-        weight=weight,
-        tooltip=f"{name} ({label})",
-        popup=folium.Popup(f"""
-            <div style='width:150px'>
-                <b>{name}</b><br>
-                X_Rank: {x:.2f}<br>
-                Y_Rank: {y:.2f}<br>
-                <hr>
-                {label}
-            </div>""", max_width=200)
-    ).add_to(m)
-
-# 5. 저장 및 확인
-Fullscreen().add_to(m)
-m.save('seoul_strategic_map.html')
-print("지도 파일 생성 완료!")
\ No newline at end of file
+from folium.plugins import Fullscreen, MarkerCluster
+
+MODELING_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'modeling')
+sys.path.insert(0, MODELING_PATH)
+from dong_geo import locate
+from quadrant import attach_quadrants, load_xy
+
+INPUT_FILE = 'quad_analysis2.csv'  # 없으면 raw_data/xy.csv
+OUTPUT_FILE = 'seoul_strategic_map.html'
+
+# 유망주(송파2동, 양평2동) 및 추격자(신당동) 강조
+HIGHLIGHT_DONGS = ['송파2동', '양평2동', '신당동']
+RADIUS, WEIGHT = 12, 1  # 기본 마커 크기 / 테두리
+HIGHLIGHT_RADIUS, HIGHLIGHT_WEIGHT = 16, 4  # 강조 마커 크기 / 테두리
+
+MAP_CENTER, MAP_ZOOM = [37.55, 126.98], 12
+# 줌 14 이상에서는 클러스터를 풀어서 행정동 마커를 그대로 보여줌
+CLUSTER_OPTIONS = {'maxClusterRadius': 40, 'disableClusteringAtZoom': 14}
+
+
+def build_features(df, highlight=HIGHLIGHT_DONGS):
+    """
+    사분면 결과 → 점 피처 GeoJSON
+
+    Args:
+        df (DataFrame): 행정동, X_Index, Y_Index, label, color 컬럼 (quadrant.attach_quadrants 결과)
+            행정동_코드 컬럼이 있으면 코드로 좌표를 찾음 (여러 구에 있는 같은 이름 행정동 구분)
+
+    Returns:
+        tuple: (GeoJSON FeatureCollection dict, 좌표를 못 찾은 행정동 list)
+    """
+    coords = locate(df['행정동'], df.get('행정동_코드'))
+    found = coords['lat'].notna().to_numpy()
+    rows = df.loc[found]
+    emphasized = rows['행정동'].isin(highlight).to_numpy()
+    columns = zip(rows['행정동'], coords.loc[found, 'lat'], coords.loc[found, 'lon'], rows['X_Index'],
+                  rows['Y_Index'], rows['label'], rows['color'], emphasized)
+    features = [{
+        'type': 'Feature',
+        'id': i,
+        'geometry': {'type': 'Point', 'coordinates': [round(lon, 6), round(lat, 6)]},
+        'properties': {
+            'name': name, 'label': label, 'color': color,
+            'X_Index': round(float(x), 2), 'Y_Index': round(float(y), 2),
+            'radius': HIGHLIGHT_RADIUS if strong else RADIUS, 'weight': HIGHLIGHT_WEIGHT if strong else WEIGHT,
+        },
+    } for i, (name, lat, lon, x, y, label, color, strong) in enumerate(columns)]
+    return {'type': 'FeatureCollection', 'features': features}, df.loc[~found, '행정동'].tolist()
+
+
+def _marker_style(feature):
+    props = feature['properties']
+    return {'color': props['color'], 'fillColor': props['color'], 'fillOpacity': 0.7,
+            'radius': props['radius'], 'weight': props['weight']}
+
+
+def render_map(df, output=OUTPUT_FILE, highlight=HIGHLIGHT_DONGS):
+    """
+    전략 지도 HTML 저장
+
+    Returns:
+        list: 좌표를 못 찾아 지도에서 빠진 행정동
+    """
+    geojson, missing = build_features(df, highlight)
+
+    m = folium.Map(location=MAP_CENTER, zoom_start=MAP_ZOOM, tiles='CartoDB positron')
+    cluster = MarkerCluster(name='사분면 분석', options=CLUSTER_OPTIONS).add_to(m)
+    folium.GeoJson(
+        geojson,
+        name='행정동',
+        marker=folium.CircleMarker(radius=RADIUS, fill=True),
+        style_function=_marker_style,
+        tooltip=folium.GeoJsonTooltip(fields=['name', 'label'], aliases=['행정동', '사분면']),
+        popup=folium.GeoJsonPopup(fields=['name', 'X_Index', 'Y_Index', 'label'],
+                                  aliases=['행정동', 'X_Rank', 'Y_Rank', '사분면'], max_width=200),
+    ).add_to(cluster)
+    Fullscreen().add_to(m)
+    m.save(output)
+    return missing
+
+
+# 메인 실행
+if __name__ == "__main__":
+    start = time.time()
+
+    # 1. 데이터 로드 및 분석: X, Y 지수 (순위 기반 0~1, 가중치 0.34/0.33/0.33) + 사분면 판정 (0.5 기준)
+    df = pd.read_csv(INPUT_FILE) if os.path.exists(INPUT_FILE) else load_xy()
+    df = attach_quadrants(df, method='rank')
+
+    # 2. 지도 저장
+    missing = render_map(df)
+    print(f"지도 파일 생성 완료! {OUTPUT_FILE} (행정동 {len(df) - len(missing)}개, "
+          f"{os.path.getsize(OUTPUT_FILE) / 1024:.0f}KB, {time.time() - start:.1f}초)")
+    if missing:
+        print(f"⚠️ 좌표를 찾지 못한 행정동 {len(missing)}개: {', '.join(missing)}")
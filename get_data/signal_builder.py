@@ -0,0 +1,151 @@
+"""
+X축 검색 신호 계산 (quad_x_data.ipynb)
+
+행정동별 CAGR, 네이버 검색률 평균/성장률, 블로그 총합/신선도, 유튜브 신선도를
+행정동 수와 상관없이 파일마다 한 번의 벡터 연산으로 계산한다.
+날짜×행정동 표(keyword_search_3y.csv, naver_trend.csv)는 열 전체에 한 번에 집계하고,
+유튜브 영상은 행정동 groupby 한 번으로 집계한다 (행정동마다 전체 표를 다시 거르지 않음).
+
+    from signal_builder import attach_signals, build_signals
+    df = attach_signals(pd.read_csv('xy.csv'), build_signals())
+"""
+import os
+import sys
+from datetime import timedelta
+
+import pandas as pd
+
+# ===== 경로 설정 =====
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(BASE_PATH, 'raw_data')
+YOUTUBE_API_PATH = os.path.join(BASE_PATH, 'get_data', 'youtube_api')
+
+SEARCH_FILE = 'keyword_search_3y.csv'  # 판다랭크 일별 검색량 (행: 날짜, 열: 행정동)
+NAVER_FILE = 'naver_trend.csv'  # 네이버 데이터랩 일별 검색률 (행: 날짜, 열: 행정동)
+BLOG_FILE = 'blog.csv'  # 판다랭크 블로그 (행: 키워드/월 검색량/전체 게시글/월 발행량..., 열: 행정동)
+YOUTUBE_FILE = 'youtube_data.csv'  # 유튜브 저장소가 비어 있을 때 쓰는 CSV
+
+SIGNAL_COLS = ['CAGR', 'avg_naver', 'naver_growth', 'blog_post', 'blog_freshness', 'yt_freshness']
+
+CAGR_START, CAGR_END = 2023, 2025  # CAGR 비교 연도
+GROWTH_DAYS = 90  # 네이버 성장률: 처음/최근 이 행 수(일)의 평균 비교
+FRESH_DAYS = 365  # 유튜브 신선도: 마지막 게시일 기준 이 일수 안에 올라온 영상 비율
+
+
+# ===== 로드 =====
+def load_daily(filename, data_path=DATA_PATH):
+    """날짜×행정동 CSV (인덱스: 날짜)"""
+    frame = pd.read_csv(os.path.join(data_path, filename), index_col=0)
+    frame.index = pd.to_datetime(frame.index)
+    return frame.sort_index()
+
+
+def load_blog(data_path=DATA_PATH):
+    """blog.csv (행: 항목, 열: 행정동, 키워드 행 외에는 천 단위 쉼표를 뗀 숫자)"""
+    blog = pd.read_csv(os.path.join(data_path, BLOG_FILE), index_col=0)
+    numeric = blog.drop(index='키워드', errors='ignore').astype(str).replace(',', '', regex=True)
+    return numeric.apply(pd.to_numeric, errors='coerce').astype(float)
+
+
+def load_youtube(data_path=DATA_PATH):
+    """
+    유튜브 영상별 (district, publishedAt)
+
+    수집 저장소(raw_data/youtube_store)의 영상별 최신 스냅샷을 읽고, 저장소가 비어 있으면 youtube_data.csv
+    """
+    if YOUTUBE_API_PATH not in sys.path:
+        sys.path.insert(0, YOUTUBE_API_PATH)
+    from video_store import load_latest
+
+    yt = load_latest(columns=['district', 'publishedAt'])
+    if yt.empty:
+        yt = pd.read_csv(os.path.join(data_path, YOUTUBE_FILE), encoding='utf-8-sig',
+                         usecols=['district', 'publishedAt'])
+    yt['publishedAt'] = pd.to_datetime(yt['publishedAt'])
+    return yt
+
+
+# ===== 신호 =====
+def search_cagr(search, start_year=CAGR_START, end_year=CAGR_END):
+    """
+    연도별 검색량 합계의 연평균 성장률 (시작 연도 합계가 0이면 0)
+
+    Args:
+        search (DataFrame): 날짜×행정동 검색량
+    """
+    yearly = search.groupby(search.index.year).sum()
+    first, last = yearly.loc[start_year], yearly.loc[end_year]
+    cagr = (last / first.where(first > 0)) ** (1 / (end_year - start_year)) - 1
+    return cagr.where(first > 0, 0.0).rename('CAGR')
+
+
+def naver_signals(naver, days=GROWTH_DAYS):
+    """
+    네이버 검색률 전체 평균과 성장률 (최근 days행 평균 / 처음 days행 평균 - 1)
+
+    Returns:
+        DataFrame: 행정동 × (avg_naver, naver_growth)
+    """
+    return pd.DataFrame({
+        'avg_naver': naver.mean(),
+        'naver_growth': naver.tail(days).mean() / naver.head(days).mean() - 1,
+    })
+
+
+def blog_signals(blog):
+    """
+    블로그 전체 게시글 수와 신선도 (월 발행량 / 전체 게시글, 게시글이 없으면 0)
+
+    Returns:
+        DataFrame: 행정동 × (blog_post, blog_freshness)
+    """
+    total, monthly = blog.loc['전체 게시글'], blog.loc['월 발행량']
+    return pd.DataFrame({
+        'blog_post': total,
+        'blog_freshness': (monthly / total.where(total > 0)).where(total > 0, 0.0),
+    })
+
+
+def youtube_freshness(yt, days=FRESH_DAYS, as_of=None):
+    """
+    행정동별 최근 영상 비율 (0~1): as_of(없으면 마지막 게시일) - days 이후에 올라온 영상 / 전체 영상
+
+    Args:
+        yt (DataFrame): district, publishedAt (영상 한 행)
+    """
+    cutoff = (yt['publishedAt'].max() if as_of is None else as_of) - timedelta(days=days)
+    return (yt['publishedAt'] >= cutoff).groupby(yt['district']).mean().rename('yt_freshness')
+
+
+def build_signals(data_path=DATA_PATH, youtube=None):
+    """
+    행정동 전체의 X축 입력
+
+    Args:
+        data_path (str): raw_data 폴더
+        youtube (DataFrame): district, publishedAt (None이면 load_youtube)
+
+    Returns:
+        DataFrame: 인덱스 행정동, 컬럼 SIGNAL_COLS (어느 파일에든 있는 행정동은 모두 포함, 없는 값은 NaN)
+    """
+    youtube = load_youtube(data_path) if youtube is None else youtube
+    signals = pd.concat([
+        search_cagr(load_daily(SEARCH_FILE, data_path)),
+        naver_signals(load_daily(NAVER_FILE, data_path)),
+        blog_signals(load_blog(data_path)),
+        youtube_freshness(youtube),
+    ], axis=1)
+    signals.index.name = '행정동'
+    return signals[SIGNAL_COLS]
+
+
+def attach_signals(df, signals, key='행정동'):
+    """
+    df[key]의 행정동에 신호 컬럼을 붙임 (기존 같은 이름 컬럼은 덮어씀, 유튜브 데이터가 없는 행정동의 yt_freshness는 0)
+    """
+    df = df.copy()
+    for col in signals.columns:
+        df[col] = df[key].map(signals[col])
+    if 'yt_freshness' in df:
+        df['yt_freshness'] = df['yt_freshness'].fillna(0)
+    return df
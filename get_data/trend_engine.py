@@ -0,0 +1,348 @@
+"""
+일별 검색 시계열(날짜×행정동) 추세 지표
+
+naver_trend.csv / keyword_search_3y.csv 같은 날짜×행정동 표에서 행정동 전체에 대해 한 번에 계산한다.
+    growth       : 최근 GROWTH_WINDOW일 평균 / 그 전 GROWTH_WINDOW일 평균 - 1
+    ma_slope     : MA_WINDOW일 이동평균의 최근 SLOPE_WINDOW일 회귀 기울기 (하루당, 평균 수준 대비 비율)
+    yoy          : 최근 YOY_WINDOW일 평균 / 364일 전(요일 맞춤) 같은 구간 평균 - 1 (계절성 제거)
+    shift_z      : 최근 SHIFT_SHORT일 평균이 그 전 SHIFT_BASE일 평균에서 기준 구간 표준편차 몇 배만큼 벗어났는지
+    change_point : |shift_z| >= SHIFT_Z면 방향(+1/-1), 아니면 0
+
+rolling 합은 누적합 차이로 구해서 창 크기와 상관없이 O(날짜 × 행정동)이다.
+마지막 날 지표(latest_values)는 지표마다 필요한 창 구간만 합산하고,
+TrendMonitor는 계산에 필요한 최근 lookback()일만 들고 있다가 새 날짜가 들어오면 마지막 날만 다시 계산한다.
+
+    monitor = TrendMonitor(load_daily('naver_trend.csv'))
+    latest = monitor.update(new_days)  # 행정동 × 지표 (마지막 날)
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from signal_builder import NAVER_FILE, SEARCH_FILE, load_daily
+
+# ===== 창 설정 (일) =====
+GROWTH_WINDOW = 28
+MA_WINDOW = 7
+SLOPE_WINDOW = 28
+YOY_WINDOW = 28
+YOY_LAG = 364  # 52주 (같은 요일끼리 비교)
+SHIFT_SHORT = 14
+SHIFT_BASE = 90
+SHIFT_Z = 2.0
+
+METRICS = ['growth', 'ma_slope', 'yoy', 'shift_z', 'change_point']
+
+
+# ===== 창 연산 (행: 날짜, 열: 행정동) =====
+def _rolling_sum(values, window):
+    """t행 = t-window+1 ~ t행의 합 (앞쪽 window-1행은 NaN)"""
+    out = np.full(values.shape, np.nan)
+    if window <= len(values):
+        cum = np.cumsum(values, axis=0)
+        out[window - 1] = cum[window - 1]
+        out[window:] = cum[window:] - cum[:-window]
+    return out
+
+
+def _shift(values, lag):
+    """lag행 뒤로 민 배열 (앞쪽 lag행은 NaN)"""
+    out = np.full(values.shape, np.nan)
+    if lag < len(values):
+        out[lag:] = values[:len(values) - lag]
+    return out
+
+
+def rolling_mean(values, window, min_periods=None):
+    """
+    결측을 건너뛰는 이동평균 (창이 다 차기 전 앞쪽 window-1행은 NaN)
+
+    Args:
+        values (ndarray): 날짜 × 행정동
+        min_periods (int): 창 안에 값이 이보다 적으면 NaN (None이면 창의 절반)
+    """
+    min_periods = max(1, window // 2) if min_periods is None else min_periods
+    valid = ~np.isnan(values)
+    total = _rolling_sum(np.where(valid, values, 0.0), window)
+    count = _rolling_sum(valid.astype(float), window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count >= min_periods, total / count, np.nan)
+
+
+def rolling_std(values, window, min_periods=None):
+    """결측을 건너뛰는 이동 표준편차 (모표준편차)"""
+    min_periods = max(2, window // 2) if min_periods is None else min_periods
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    count = _rolling_sum(valid.astype(float), window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = _rolling_sum(filled, window) / count
+        var = _rolling_sum(filled ** 2, window) / count - mean ** 2
+        return np.where(count >= min_periods, np.sqrt(np.clip(var, 0, None)), np.nan)
+
+
+def rolling_growth(values, window=GROWTH_WINDOW):
+    """최근 window일 평균 / 그 전 window일 평균 - 1"""
+    mean = rolling_mean(values, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return mean / _shift(mean, window) - 1
+
+
+def ma_slope(values, ma_window=MA_WINDOW, window=SLOPE_WINDOW):
+    """
+    이동평균의 최근 window일 최소제곱 기울기 (하루당 변화량 / 창 안의 평균 수준)
+
+    0.01이면 하루에 평균 수준의 1%씩 늘고 있다는 뜻.
+    """
+    ma = rolling_mean(values, ma_window)
+    valid = ~np.isnan(ma)
+    y = np.where(valid, ma, 0.0)
+    t = np.where(valid, np.arange(len(ma), dtype=float)[:, None], 0.0)
+    n = _rolling_sum(valid.astype(float), window)
+    st, sy = _rolling_sum(t, window), _rolling_sum(y, window)
+    stt, sty = _rolling_sum(t * t, window), _rolling_sum(t * y, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = (n * sty - st * sy) / (n * stt - st * st)
+        return np.where(n >= max(2, window // 2), slope / (sy / n), np.nan)
+
+
+def seasonal_yoy(values, window=YOY_WINDOW, lag=YOY_LAG):
+    """최근 window일 평균 / lag일 전 같은 구간 평균 - 1"""
+    mean = rolling_mean(values, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return mean / _shift(mean, lag) - 1
+
+
+def _shift_flag(recent, base_mean, base_std, threshold):
+    """(shift_z, change_point): 기준 표준편차가 0이면 z=0, 계산 불가면 NaN"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = (recent - base_mean) / base_std
+    z = np.where(base_std > 0, z, np.where(np.isnan(base_std), np.nan, 0.0))
+    flag = np.where(np.isnan(z), np.nan, np.where(np.abs(z) >= threshold, np.sign(z), 0.0))
+    return z, flag
+
+
+def level_shift(values, short=SHIFT_SHORT, base=SHIFT_BASE, threshold=SHIFT_Z):
+    """
+    최근 short일 평균과 그 전 base일 (평균, 표준편차) 비교
+
+    Returns:
+        tuple: (shift_z, change_point) — change_point는 |shift_z| >= threshold면 +1/-1, 아니면 0 (계산 불가면 NaN)
+    """
+    recent = rolling_mean(values, short)
+    base_mean = _shift(rolling_mean(values, base), short)
+    base_std = _shift(rolling_std(values, base), short)
+    return _shift_flag(recent, base_mean, base_std, threshold)
+
+
+# ===== 마지막 날만 (창 구간을 직접 합산) =====
+def _tail_sums(values, window, offset=0):
+    """끝에서 offset행 앞에서 끝나는 window행의 (합, 제곱합, 값 개수) — 행이 모자라면 개수 0"""
+    stop = len(values) - offset
+    if stop < window:
+        empty = np.zeros(values.shape[1])
+        return empty, empty, empty
+    block = values[stop - window:stop]
+    valid = ~np.isnan(block)
+    filled = np.where(valid, block, 0.0)
+    return filled.sum(axis=0), (filled * filled).sum(axis=0), valid.sum(axis=0)
+
+
+def _tail_mean(values, window, offset=0):
+    """rolling_mean(values, window)[-1 - offset]"""
+    total, _, count = _tail_sums(values, window, offset)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count >= max(1, window // 2), total / count, np.nan)
+
+
+def _tail_std(values, window, offset=0):
+    """rolling_std(values, window)[-1 - offset]"""
+    total, square, count = _tail_sums(values, window, offset)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        var = square / count - mean ** 2
+        return np.where(count >= max(2, window // 2), np.sqrt(np.clip(var, 0, None)), np.nan)
+
+
+def _tail_slope(values, ma_window, window):
+    """ma_slope(values, ma_window, window)[-1]"""
+    ma = rolling_mean(values[-(ma_window + window - 1):], ma_window)[-window:]
+    if len(ma) < window:
+        return np.full(values.shape[1], np.nan)
+    valid = ~np.isnan(ma)
+    y = np.where(valid, ma, 0.0)
+    t = np.where(valid, np.arange(window, dtype=float)[:, None], 0.0)
+    n, st, sy = valid.sum(axis=0), t.sum(axis=0), y.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = (n * (t * y).sum(axis=0) - st * sy) / (n * (t * t).sum(axis=0) - st * st)
+        return np.where(n >= max(2, window // 2), slope / (sy / n), np.nan)
+
+
+def latest_values(values, growth_window=GROWTH_WINDOW, ma_window=MA_WINDOW, slope_window=SLOPE_WINDOW,
+                  yoy_window=YOY_WINDOW, yoy_lag=YOY_LAG, shift_short=SHIFT_SHORT, shift_base=SHIFT_BASE,
+                  shift_z=SHIFT_Z):
+    """
+    마지막 행의 지표만 계산 (trend_frames의 마지막 행과 같은 값, 부동소수 오차 범위)
+
+    지표마다 필요한 창 구간만 합산하므로 전체 기간 rolling보다 훨씬 적게 읽는다.
+
+    Args:
+        values (ndarray): 날짜 × 행정동 (daily_matrix 기준 빠짐없는 일 단위)
+
+    Returns:
+        dict: 지표 이름 → 행정동 길이 ndarray (METRICS)
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        growth = _tail_mean(values, growth_window) / _tail_mean(values, growth_window, growth_window) - 1
+        yoy = _tail_mean(values, yoy_window) / _tail_mean(values, yoy_window, yoy_lag) - 1
+    z, flag = _shift_flag(_tail_mean(values, shift_short), _tail_mean(values, shift_base, shift_short),
+                          _tail_std(values, shift_base, shift_short), shift_z)
+    return {
+        'growth': growth,
+        'ma_slope': _tail_slope(values, ma_window, slope_window),
+        'yoy': yoy,
+        'shift_z': z,
+        'change_point': flag,
+    }
+
+
+# ===== 표 단위 =====
+def daily_matrix(frame):
+    """날짜 인덱스를 빠짐없는 일 단위로 맞춤 (빈 날은 NaN → 행 간격 = 일수)"""
+    frame = frame.sort_index()
+    frame = frame[~frame.index.duplicated(keep='last')]
+    return frame.asfreq('D').astype(float)
+
+
+def lookback(growth_window=GROWTH_WINDOW, ma_window=MA_WINDOW, slope_window=SLOPE_WINDOW,
+             yoy_window=YOY_WINDOW, yoy_lag=YOY_LAG, shift_short=SHIFT_SHORT, shift_base=SHIFT_BASE, shift_z=None):
+    """마지막 날 지표를 계산하는 데 필요한 최근 일수 (shift_z는 창 길이와 무관)"""
+    return max(2 * growth_window, ma_window + slope_window, yoy_window + yoy_lag, shift_short + shift_base)
+
+
+def trend_frames(frame, growth_window=GROWTH_WINDOW, ma_window=MA_WINDOW, slope_window=SLOPE_WINDOW,
+                 yoy_window=YOY_WINDOW, yoy_lag=YOY_LAG, shift_short=SHIFT_SHORT, shift_base=SHIFT_BASE,
+                 shift_z=SHIFT_Z):
+    """
+    날짜별 추세 지표 전체 (백테스트/차트용)
+
+    Args:
+        frame (DataFrame): 날짜 × 행정동 (signal_builder.load_daily)
+
+    Returns:
+        dict: 지표 이름 → 날짜 × 행정동 DataFrame (METRICS)
+    """
+    frame = daily_matrix(frame)
+    values = frame.to_numpy()
+    z, flag = level_shift(values, shift_short, shift_base, shift_z)
+    arrays = {
+        'growth': rolling_growth(values, growth_window),
+        'ma_slope': ma_slope(values, ma_window, slope_window),
+        'yoy': seasonal_yoy(values, yoy_window, yoy_lag),
+        'shift_z': z,
+        'change_point': flag,
+    }
+    return {name: pd.DataFrame(arr, index=frame.index, columns=frame.columns) for name, arr in arrays.items()}
+
+
+def latest_trends(frame, **windows):
+    """
+    마지막 날의 추세 지표
+
+    Returns:
+        DataFrame: 인덱스 행정동, 컬럼 METRICS (+ as_of)
+    """
+    frame = daily_matrix(frame)
+    return _latest_frame(latest_values(frame.to_numpy(), **windows), frame.columns, frame.index[-1])
+
+
+def _latest_frame(arrays, columns, as_of):
+    latest = pd.DataFrame(np.column_stack([arrays[name] for name in METRICS]),
+                          index=columns.rename('행정동'), columns=METRICS)
+    latest['as_of'] = as_of
+    return latest
+
+
+class TrendMonitor:
+    """
+    매일 새 날짜를 붙여 가며 마지막 날 추세 지표만 다시 계산
+
+    최근 lookback()일을 ndarray로 들고 있다가, 바로 다음 날짜가 같은 행정동 열로 들어오면 배열 끝에 붙이고
+    latest_values로 마지막 날만 계산한다 (행정동 수백 개도 갱신 한 번에 몇 ms).
+    날짜가 비거나, 같은 날짜가 다시 들어오거나 (수정치 반영), 처음 보는 행정동 열이 있으면 표를 다시 맞춘다.
+
+    Args:
+        history (DataFrame): 날짜 × 행정동 (전체 기간이어도 최근 lookback()일만 남김)
+        **windows: trend_frames의 창 설정
+    """
+
+    def __init__(self, history, **windows):
+        self.windows = windows
+        self.size = lookback(**windows)
+        self._set(daily_matrix(history))
+        self.latest = self._compute() if len(self.dates) else None
+
+    def _set(self, frame):
+        frame = frame.iloc[-self.size:]
+        self.dates, self.columns = frame.index, frame.columns
+        self.values = frame.to_numpy(dtype=float)
+
+    def _compute(self):
+        return _latest_frame(latest_values(self.values, **self.windows), self.columns, self.dates[-1])
+
+    @property
+    def buffer(self):
+        """최근 lookback()일 표 (날짜 × 행정동)"""
+        return pd.DataFrame(self.values, index=self.dates, columns=self.columns)
+
+    def update(self, rows):
+        """
+        새 날짜 추가 후 마지막 날 지표
+
+        Args:
+            rows (DataFrame): 날짜 × 행정동 (하루 또는 여러 날)
+
+        Returns:
+            DataFrame: latest_trends 결과
+        """
+        dates = pd.DatetimeIndex(pd.to_datetime(rows.index))
+        following = len(self.dates) and dates.equals(
+            pd.date_range(self.dates[-1] + pd.Timedelta(days=1), periods=len(dates), freq='D'))
+        if following and rows.columns.equals(self.columns):
+            self.values = np.concatenate([self.values, rows.to_numpy(dtype=float)])[-self.size:]
+            self.dates = self.dates.append(dates)[-self.size:]
+        else:
+            self._set(daily_matrix(pd.concat([self.buffer, rows.set_axis(dates).astype(float)])))
+        self.latest = self._compute()
+        return self.latest
+
+    def movers(self, metric='shift_z', top=10):
+        """마지막 날 metric 절댓값이 큰 행정동"""
+        latest = self.latest.dropna(subset=[metric])
+        return latest.reindex(latest[metric].abs().sort_values(ascending=False).index).head(top)
+
+    def save(self, path):
+        """최근 lookback()일 표 저장 (Parquet, 다음 실행에서 TrendMonitor.load)"""
+        self.buffer.to_parquet(path)
+
+    @classmethod
+    def load(cls, path, **windows):
+        return cls(pd.read_parquet(path), **windows)
+
+
+# 메인 실행
+if __name__ == "__main__":
+    for filename in (NAVER_FILE, SEARCH_FILE):
+        frame = load_daily(filename)
+        monitor = TrendMonitor(frame.iloc[:-1])
+        start = time.perf_counter()
+        latest = monitor.update(frame.iloc[-1:])
+        elapsed = (time.perf_counter() - start) * 1000
+
+        print(f"\n{'='*70}")
+        print(f"📈 {filename}: 행정동 {frame.shape[1]}개, 기준일 {latest['as_of'].iloc[0]:%Y-%m-%d} (갱신 {elapsed:.1f}ms)")
+        print(f"{'='*70}")
+        print(monitor.movers().drop(columns='as_of').round(3).to_string())
+        flagged = latest[latest['change_point'] != 0].dropna(subset=['change_point'])
+        print(f"🔔 수준 변화: {', '.join(f'{d}({int(v):+d})' for d, v in flagged['change_point'].items()) or '없음'}")
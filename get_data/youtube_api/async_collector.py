@@ -0,0 +1,654 @@
+import asyncio
+import inspect
+import json
+import os
+import time
+
+import aiohttp
+
+import config as cf
+from get_csv_filtered import (
+    build_search_params, clean_search_item, filter_video_items, keyword_folder, new_filter_stats,
+    print_filter_stats, print_keywords, save_cleaned_csv, save_search_result,
+)
+from crawl_journal import CrawlJournal, crawl_id
+from http_replay import ReplayMiss, default_cassette, youtube_api_key, youtube_base_url
+from quota_scheduler import (
+    ParkedWork, QuotaBudget, QuotaExhausted, backoff_delay, classify_error, keyword_group, order_by_group,
+)
+from time_slicer import SliceMerge, is_saturated, slice_count, split_window
+from video_store import VideoStore
+
+# API 키와 주소는 import할 때가 아니라 요청할 때 읽음 (base_url/api_key가 None이면 .env / YOUTUBE_API_BASE_URL)
+DETAIL_BATCH_SIZE = 50  # videos API 한 번에 조회 가능한 최대 id 수
+
+
+class ApiError(Exception):
+    """API 요청 실패 (HTTP 오류 / 연결 실패)"""
+
+
+async def _call(callback, *args):
+    """콜백 호출 (코루틴을 돌려주면 끝날 때까지 기다림)"""
+    ret = callback(*args)
+    if inspect.isawaitable(ret):
+        await ret
+
+
+async def fetch_json(session, url, params, limiter, endpoint, budget=None, group=None, max_retries=None):
+    """
+    GET 요청 후 JSON 반환 (limiter로 동시 요청 수 제한)
+
+    요청마다 쿼터를 먼저 차감하고, 403(속도 제한)/429/5xx/연결 오류는 지터 백오프 후 재시도.
+    재시도 대기 중에는 limiter를 놓아서 다른 요청이 진행되게 함.
+    replay 모드는 네트워크를 쓰지 않으므로 쿼터를 차감하지 않고, 녹화되지 않은 요청은 ApiError로 실패한다.
+
+    Raises:
+        QuotaExhausted: 쿼터 소진 (남은 작업은 호출한 쪽에서 미룸)
+        ApiError: 재시도 후에도 실패한 경우 / replay 모드에서 녹화되지 않은 요청
+    """
+    max_retries = cf.MAX_RETRIES if max_retries is None else max_retries
+    cassette = default_cassette()  # HTTP_MODE가 record/replay면 녹화/재생
+    replay = cassette is not None and cassette.mode == "replay"
+    for attempt in range(max_retries + 1):
+        async with limiter:
+            if budget is not None and not replay:
+                budget.charge(endpoint, group)
+            try:
+                if replay:
+                    try:
+                        status, body = cassette.lookup(url, params)
+                    except ReplayMiss as e:
+                        raise ApiError(str(e)) from e
+                else:
+                    async with session.get(url, params=params) as response:
+                        status, body = response.status, await response.text()
+                    if cassette is not None:
+                        cassette.save(url, params, status, body)
+                if status < 400:
+                    return json.loads(body)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, body = None, str(e)
+
+        kind = "retry" if status is None else classify_error(status, body)
+        if kind == "quota":
+            if budget is not None:
+                budget.exhaust()
+            raise QuotaExhausted(f"API 쿼터 소진 응답 ({status})")
+        if kind == "fail" or attempt == max_retries:
+            raise ApiError(f"HTTP {status}: {body[:200]}" if status else body)
+        await asyncio.sleep(backoff_delay(attempt))
+
+
+async def search_pages(session, query, limiter, base_url=None, api_key=None,
+                       total_count=100, max_results=50, region_code="KR", budget=None, group=None,
+                       page_token=None, fetched=0, published_after=None, published_before=None):
+    """
+    search API를 페이지 단위로 가져오는 비동기 제너레이터
+
+    page_token/fetched를 주면 그 페이지부터 이어서 가져옴 (수집 기록 재개용)
+    published_after/published_before를 주면 그 기간만 검색 (None이면 config.py 기간)
+
+    Yields:
+        dict: 검색 응답 페이지 (items, pageInfo, nextPageToken)
+    """
+    base_url = base_url or youtube_base_url()
+    api_key = api_key or youtube_api_key()
+    next_page_token = page_token
+    total_fetched = fetched
+
+    while total_fetched < total_count:
+        params = {
+            "key": api_key,
+            "part": "snippet",
+            "q": query,
+            "publishedAfter": published_after or cf.publishedAfter,
+            "publishedBefore": published_before or cf.publishedBefore,
+            "type": "video",
+            "maxResults": min(max_results, total_count - total_fetched),
+            "order": cf.order,
+            "regionCode": region_code
+        }
+        if next_page_token:
+            params["pageToken"] = next_page_token
+
+        data = await fetch_json(session, f"{base_url}/search", params, limiter, "search", budget, group)
+        items = data.get("items", [])
+        total_fetched += len(items)
+        yield data
+
+        next_page_token = data.get("nextPageToken")
+        if not next_page_token or not items:
+            break
+
+
+async def fetch_details(session, video_ids, limiter, base_url=None, api_key=None,
+                        budget=None, group=None):
+    """videos API 한 배치(최대 50개) 조회"""
+    base_url = base_url or youtube_base_url()
+    params = {
+        "key": api_key or youtube_api_key(),
+        "part": "snippet,statistics,contentDetails",
+        "id": ",".join(video_ids)
+    }
+    data = await fetch_json(session, f"{base_url}/videos", params, limiter, "videos", budget, group)
+    return data.get("items", [])
+
+
+class DetailBatcher:
+    """
+    여러 키워드가 함께 쓰는 상세 조회 배치
+
+    키워드마다 따로 50개씩 끊어서 조회하면 겹치는 영상(홍대/서교동, 성수/성수동 등)을
+    여러 번 조회하고 키워드마다 덜 찬 마지막 배치가 나간다. 여기서는
+    - 캐시(journal)에 있거나 이미 조회 중인 영상 id는 다시 조회하지 않고
+    - 새로 받을 id가 50개 모일 때마다 배치를 보내며
+    - 검색 중인 키워드가 하나도 없을 때만 덜 찬 배치를 보낸다.
+    """
+
+    def __init__(self, fetch, journal=None, ttl_hours=None, batch_size=DETAIL_BATCH_SIZE):
+        self.fetch = fetch  # async (video_ids) -> videos API items
+        self.journal = journal
+        self.ttl_hours = ttl_hours
+        self.batch_size = batch_size
+        self.futures = {}  # video_id → Future (응답 아이템, 삭제/비공개 영상은 None)
+        self.queue = []
+        self.searching = 0
+        self.fetched = 0  # 실제로 조회한 영상 수
+        self._tasks = set()  # 진행 중인 배치 (이벤트 루프는 task를 약한 참조로만 들고 있음)
+
+    def begin_search(self):
+        self.searching += 1
+
+    def end_search(self):
+        self.searching -= 1
+        if self.searching == 0:
+            self.flush()
+
+    def request(self, video_ids):
+        """
+        영상 상세 정보 요청
+
+        Returns:
+            list: video_ids 순서의 Future (캐시에 있으면 이미 완료된 상태)
+        """
+        loop = asyncio.get_event_loop()
+        new = [vid for vid in dict.fromkeys(video_ids) if vid not in self.futures]
+        missing, cached = set(new), {}
+        if self.journal is not None and new:
+            missing = set(self.journal.missing_details(new, self.ttl_hours))
+            cached = {item["id"]: item for item in self.journal.cached_details([v for v in new if v not in missing])}
+
+        for vid in new:
+            future = self.futures[vid] = loop.create_future()
+            if vid in missing:
+                self.queue.append(vid)
+            else:
+                future.set_result(cached.get(vid))
+
+        while len(self.queue) >= self.batch_size:
+            self._send(self.queue[:self.batch_size])
+            self.queue = self.queue[self.batch_size:]
+        return [self.futures[vid] for vid in dict.fromkeys(video_ids)]
+
+    def flush(self):
+        """덜 찬 배치까지 모두 보냄"""
+        for i in range(0, len(self.queue), self.batch_size):
+            self._send(self.queue[i:i + self.batch_size])
+        self.queue = []
+
+    def _send(self, batch):
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self, cancel=False):
+        """진행 중인 배치가 끝날 때까지 대기 (cancel이면 취소)"""
+        tasks = list(self._tasks)
+        if cancel:
+            for task in tasks:
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, batch):
+        try:
+            items = await self.fetch(batch)
+        except asyncio.CancelledError:
+            for vid in batch:
+                self.futures[vid].cancel()
+            raise
+        except Exception as e:
+            for vid in batch:
+                self.futures[vid].set_exception(e)
+            return
+        if self.journal is not None:
+            self.journal.record_details(batch, items)
+        self.fetched += len(batch)
+        by_id = {item.get("id"): item for item in items}
+        for vid in batch:
+            self.futures[vid].set_result(by_id.get(vid))
+
+
+async def search_window(session, query, limiter, on_items, base_url=None, api_key=None,
+                        total_count=100, region_code="KR", budget=None, group=None, journal=None,
+                        published_after=None, published_before=None, stop_if_saturated=False, until=None):
+    """
+    기간 하나 검색: 페이지가 도착할 때마다 on_items(정리된 검색 아이템, 영상 id)를 호출
+
+    journal을 주면 페이지를 기록하고 기록된 위치부터 이어서 검색한다 (기록된 아이템은 먼저 on_items로 넘김).
+    stop_if_saturated면 첫 페이지의 totalResults가 포화일 때 더 넘기지 않는다 (구간 분할은 호출한 쪽에서).
+    until(인자 없는 함수)이 True를 돌려주면 다음 페이지를 요청하지 않는다.
+    on_items가 코루틴을 돌려주면 끝날 때까지 기다린 뒤 다음 페이지를 요청한다 (collector 파이프라인의 큐가 차면 검색이 쉬어 감).
+
+    Returns:
+        dict: pageInfo (totalResults, resultsPerPage)
+    """
+    params = build_search_params(query, total_count, 50, region_code, published_after, published_before,
+                                 time_sliced=False)
+    page_info = {"totalResults": 0, "resultsPerPage": 0}
+    page_token, fetched = None, 0
+    if journal is not None:
+        crawl = journal.start(query, params)
+        cid = crawl["crawl_id"]
+        page_token, fetched = crawl["next_page_token"], crawl["fetched"]
+        if fetched:
+            video_ids, items, page_info = journal.search_result(cid)
+            await _call(on_items, items, video_ids)
+        if crawl["search_done"] or (fetched and not page_token) or (
+            stop_if_saturated and fetched and is_saturated(page_info["totalResults"])
+        ):
+            return page_info
+
+    async for page in search_pages(
+        session, query, limiter, base_url, api_key, total_count, region_code=region_code, budget=budget,
+        group=group, page_token=page_token, fetched=fetched,
+        published_after=published_after, published_before=published_before,
+    ):
+        if not fetched:
+            info = page.get("pageInfo", {})
+            page_info = {
+                "totalResults": info.get("totalResults", 0),
+                "resultsPerPage": info.get("resultsPerPage", 0)
+            }
+
+        items = page.get("items", [])
+        cleaned = [clean_search_item(item) for item in items]
+        fetched += len(items)
+        if journal is not None:
+            done = not page.get("nextPageToken") or not items or fetched >= total_count
+            journal.record_page(cid, page, cleaned, done)
+        await _call(on_items, cleaned, [item["id"]["videoId"] for item in items if "videoId" in item.get("id", {})])
+
+        if stop_if_saturated and is_saturated(page_info["totalResults"]):
+            break
+        if until is not None and until():
+            break
+    return page_info
+
+
+async def search_sliced(session, query, limiter, on_items, base_url=None, api_key=None,
+                        total_count=100, region_code="KR", budget=None, group=None, journal=None):
+    """
+    시간 분할 검색: 포화된 기간을 반씩 나눠 두 구간을 동시에 검색하고 영상 id 기준으로 합침
+
+    구간마다 첫 페이지의 totalResults를 보고 포화된 구간만 나누므로 결과가 적은 구간에 쿼터를 쓰지 않는다.
+    on_items에는 처음 나온 영상만 넘긴다.
+
+    Returns:
+        SliceMerge: 합친 결과 (result()로 video_ids, search_items)
+    """
+    merged = SliceMerge(total_count)
+
+    def collect(items, video_ids):
+        new_items = merged.add(items)
+        return on_items(new_items, [item["id"]["videoId"] for item in new_items if "videoId" in item.get("id", {})])
+
+    async def run(after, before):
+        if merged.full:
+            return
+        halves = split_window(after, before)
+        page_info = await search_window(
+            session, query, limiter, collect, base_url, api_key, slice_count(total_count), region_code,
+            budget, group, journal, after, before, stop_if_saturated=halves is not None,
+            until=lambda: merged.full,  # 동시에 도는 다른 구간이 상한을 채우면 멈춤
+        )
+        merged.slices += 1
+        if halves is not None and is_saturated(page_info["totalResults"]):
+            merged.splits += 1
+            # 한쪽이 실패해도 다른 쪽은 끝까지 기록한 뒤 첫 오류를 올림
+            errors = [e for e in await asyncio.gather(*(run(a, b) for a, b in halves), return_exceptions=True) if e]
+            if errors:
+                raise errors[0]
+
+    await run(cf.publishedAfter, cf.publishedBefore)
+    return merged
+
+
+async def search_sliced_standalone(query, total_count=100, region_code="KR", budget=None, journal=None,
+                                   max_concurrency=None):
+    """
+    세션 없이 부르는 시간 분할 검색 (get_csv_filtered.search_youtube_sliced가 asyncio.run으로 호출)
+
+    Returns:
+        SliceMerge: search_sliced 결과
+    """
+    max_concurrency = max_concurrency or cf.MAX_CONCURRENCY
+    connector = aiohttp.TCPConnector(limit=max_concurrency)
+    timeout = aiohttp.ClientTimeout(total=cf.REQUEST_TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        return await search_sliced(
+            session, query, asyncio.Semaphore(max_concurrency), lambda items, video_ids: None,
+            total_count=total_count, region_code=region_code, budget=budget, group=keyword_group(query),
+            journal=journal,
+        )
+
+
+async def search_keyword(session, keyword, limiter, on_items, base_url=None, api_key=None,
+                         total_count=None, region_code="KR", budget=None, journal=None):
+    """
+    키워드 하나 검색 (cf.TIME_SLICING이면 search_sliced, 아니면 전체 기간 search_window)
+
+    journal에 검색이 끝난 기록이 있으면 요청 없이 기록된 결과를 on_items로 넘긴다.
+
+    Returns:
+        dict: pageInfo (시간 분할이면 totalResults = 중복 제외 결과 수)
+
+    Raises:
+        ApiError, QuotaExhausted: 검색 실패 / 쿼터 소진
+    """
+    group = keyword_group(keyword)
+    total_count = cf.total_count if total_count is None else total_count
+    if not cf.TIME_SLICING:
+        return await search_window(
+            session, keyword, limiter, on_items, base_url, api_key, total_count, region_code, budget, group, journal,
+        )
+
+    crawl = journal.start(keyword, build_search_params(keyword, total_count, 50, region_code)) if journal else None
+    if crawl is not None and crawl["search_done"]:
+        video_ids, items, page_info = journal.search_result(crawl["crawl_id"])
+        await _call(on_items, items, video_ids)
+        return page_info
+
+    merged = await search_sliced(
+        session, keyword, limiter, on_items, base_url, api_key, total_count, region_code, budget, group, journal,
+    )
+    video_ids, items = merged.result()
+    page_info = {"totalResults": len(items), "resultsPerPage": 50}
+    print(f"[시간 분할] [{keyword}] 구간 {merged.slices}개 (분할 {merged.splits}회) → 중복 제외 {len(items)}개")
+    if crawl is not None:
+        # 합친 결과를 키워드 기록으로 남겨서 상세 조회/저장은 일반 검색과 같은 방식으로 처리
+        journal.record_page(crawl["crawl_id"], {"pageInfo": page_info}, items, done=True)
+    return page_info
+
+
+def new_result(keyword, search_params):
+    """키워드 수집 결과 dict (collect_keyword / collector 파이프라인 / save_result 공용)"""
+    return {
+        "keyword": keyword,
+        "video_ids": [],
+        "search_items": [],
+        "search_params": search_params,
+        "page_info": {"totalResults": 0, "resultsPerPage": 0},
+        "cleaned_items": [],
+        "stats": new_filter_stats(),
+        "error": None,
+        "parked": False,
+        "complete": False,
+    }
+
+
+async def collect_keyword(session, keyword, limiter, base_url=None, api_key=None,
+                          total_count=None, region_code="KR", budget=None, journal=None, batcher=None):
+    """
+    키워드 하나 수집: 검색 페이지가 도착하는 대로 영상 id를 상세 조회 배치에 넘김
+
+    쿼터가 모자라면 수집을 멈추고 parked=True로 돌려준다.
+    journal(CrawlJournal)을 주면 받은 페이지/상세 정보를 기록하고, 다음 실행에서 기록된 위치부터 이어서 수집한다.
+    batcher(DetailBatcher)를 여러 키워드가 같이 쓰면 겹치는 영상은 한 번만 조회한다.
+    cf.TIME_SLICING이면 포화된 기간을 나눠서 검색한다 (search_sliced).
+
+    Returns:
+        dict: video_ids, search_items, search_params, page_info, cleaned_items, stats, error, parked, complete
+    """
+    total_count = cf.total_count if total_count is None else total_count
+    search_params = build_search_params(keyword, total_count, 50, region_code)
+    crawl = journal.start(keyword, search_params) if journal is not None else None
+    result = new_result(keyword, search_params)
+    if batcher is None:
+        batcher = DetailBatcher(
+            lambda batch: fetch_details(session, batch, limiter, base_url, api_key, budget), journal
+        )
+
+    futures = []  # 상세 정보 (검색 순서 유지)
+
+    def on_items(items, video_ids):
+        # 50개가 모이면 다음 검색 페이지를 기다리지 않고 상세 조회 시작
+        result["search_items"].extend(items)
+        result["video_ids"].extend(video_ids)
+        futures.extend(batcher.request(video_ids))
+
+    search_done = False
+    batcher.begin_search()
+    try:
+        result["page_info"] = await search_keyword(
+            session, keyword, limiter, on_items, base_url, api_key, total_count, region_code, budget, journal,
+        )
+        search_done = True
+    except ApiError as e:
+        result["error"] = f"검색 실패: {e}"
+    except QuotaExhausted as e:
+        result.update(error=str(e), parked=True)
+    finally:
+        batcher.end_search()
+
+    raw_items = {}
+    for item in await asyncio.gather(*futures, return_exceptions=True):
+        if isinstance(item, ApiError):
+            result["error"] = f"상세 조회 실패: {item}"
+            continue
+        if isinstance(item, QuotaExhausted):
+            result.update(error=str(item), parked=True)
+            continue
+        if isinstance(item, BaseException):
+            raise item
+        if item is not None:
+            raw_items.setdefault(item.get("id"), item)
+    raw_items = list(raw_items.values())
+
+    if crawl is not None:
+        # 이전 실행에서 받은 페이지까지 합친 전체 결과
+        cid = crawl["crawl_id"]
+        result["video_ids"], result["search_items"], result["page_info"] = journal.search_result(cid)
+        raw_items = journal.detail_items(cid)
+        result["complete"] = journal.state(cid)["search_done"] and not journal.pending_videos(cid)
+    else:
+        result["complete"] = search_done and not result["error"] and not result["parked"]
+    result["cleaned_items"] = filter_video_items(raw_items, result["stats"])
+
+    return result
+
+
+def plan_keywords(keywords, budget=None, total_count=None):
+    """
+    키워드를 지역 그룹 순으로 정렬하고 쿼터 예산을 그룹별로 배분
+
+    예산을 못 받은 키워드는 쿼터를 쓰기 전에 바로 미룬다.
+    그룹의 마지막 키워드가 끝나면 호출한 쪽에서 budget.finish(group)로 남은 배분량을 공용으로 반납한다.
+
+    Returns:
+        tuple: (정렬된 키워드, 예산을 못 받은 키워드 set, 그룹 → 이번 실행에서 처리할 키워드 수)
+    """
+    keywords = order_by_group(keywords)
+    group_left = {}
+    for keyword in keywords:
+        group_left[keyword_group(keyword)] = group_left.get(keyword_group(keyword), 0) + 1
+
+    skipped = set()
+    if budget is not None:
+        funded = budget.plan(group_left, budget.keyword_cost(total_count))
+        seen = {}
+        for keyword in keywords:
+            group = keyword_group(keyword)
+            seen[group] = seen.get(group, 0) + 1
+            if seen[group] > funded[group]:
+                skipped.add(keyword)
+        for group in group_left:
+            group_left[group] = funded[group]
+    return keywords, skipped, group_left
+
+
+async def collect_all(keywords, base_url=None, api_key=None, max_concurrency=None,
+                      keyword_concurrency=None, total_count=None, on_result=None, budget=None, journal=None):
+    """
+    전체 키워드 동시 수집 (HTTP 세션 하나를 공유)
+
+    Args:
+        keywords (list): 검색 키워드 목록
+        base_url (str): API 주소 (가짜 서버 테스트 시 교체)
+        max_concurrency (int): 동시에 보내는 HTTP 요청 수
+        keyword_concurrency (int): 동시에 처리하는 키워드 수
+        total_count (int): 키워드별 검색 결과 수
+        on_result (callable): 키워드 하나가 끝날 때마다 호출 (결과 dict 전달)
+        budget (QuotaBudget): 쿼터 예산 (주면 키워드의 지역 그룹별로 배분해서 차감)
+        journal (CrawlJournal): 수집 기록 (주면 중간에 멈춘 키워드를 기록된 위치부터 이어서 수집)
+
+    Returns:
+        list: collect_keyword 결과 (지역 그룹 순으로 정렬한 키워드 순서)
+    """
+    max_concurrency = max_concurrency or cf.MAX_CONCURRENCY
+    keywords, skipped, group_left = plan_keywords(keywords, budget, total_count)
+    keyword_limiter = asyncio.Semaphore(keyword_concurrency or cf.KEYWORD_CONCURRENCY)
+    limiter = asyncio.Semaphore(max_concurrency)
+
+    connector = aiohttp.TCPConnector(limit=max_concurrency)
+    timeout = aiohttp.ClientTimeout(total=cf.REQUEST_TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        # 상세 조회는 키워드 구분 없이 고유 영상 id 기준으로 묶어서 (쿼터는 공용으로 차감)
+        batcher = DetailBatcher(
+            lambda batch: fetch_details(session, batch, limiter, base_url, api_key, budget), journal
+        )
+
+        async def run(keyword):
+            if keyword in skipped:
+                result = dict(new_result(keyword, None), error="쿼터 부족으로 이번 실행에서 제외", parked=True)
+                if on_result:
+                    on_result(result)
+                return result
+
+            async with keyword_limiter:
+                result = await collect_keyword(
+                    session, keyword, limiter, base_url, api_key, total_count,
+                    budget=budget, journal=journal, batcher=batcher,
+                )
+            group = keyword_group(keyword)
+            group_left[group] -= 1
+            if budget is not None and group_left[group] == 0:
+                budget.finish(group)
+            if on_result:
+                on_result(result)
+            return result
+
+        try:
+            results = await asyncio.gather(*(run(keyword) for keyword in keywords))
+        except BaseException:
+            await batcher.close(cancel=True)
+            raise
+        await batcher.close()
+        print(f"[상세] 고유 영상 {len(batcher.futures)}개 중 {batcher.fetched}개 조회 (나머지는 캐시/중복)")
+        return results
+
+
+def save_result(result, store, data_dir=None, journal=None, district=None):
+    """
+    키워드 수집 결과를 저장소(VideoStore)에 추가
+
+    data_dir을 주면 get_csv_filtered.py와 같은 JSON/CSV도 저장한다.
+    journal을 주면 수집이 끝난 키워드만 저장한다 (저장 완료 기록은 store.flush() 뒤에 mark_saved로).
+    district를 주면 키워드의 지역 그룹 대신 그 행정동으로 저장한다.
+
+    Returns:
+        tuple: (검색 결과 JSON, 정리 데이터 CSV) 경로 (저장하지 않았으면 None)
+    """
+    if result["parked"]:
+        return None
+    if journal is not None and not result["complete"]:
+        print(f"⚠️ [{result['keyword']}] 수집이 끝나지 않아 저장을 미룹니다. 다음 실행에서 이어서 수집합니다.")
+        return None
+    if not result["video_ids"]:
+        print(f"❌ [{result['keyword']}] 검색 결과가 없습니다. {result['error'] or ''}")
+        return None
+    store.add(result["keyword"], result["cleaned_items"], district)
+    if data_dir is None:
+        return None, None
+    folder_name = keyword_folder(result["keyword"], data_dir)
+    search_filename = save_search_result(
+        result["search_items"], result["search_params"], result["page_info"], folder_name
+    )
+    cleaned_filename = save_cleaned_csv(result["cleaned_items"], search_filename, folder_name)
+    return search_filename, cleaned_filename
+
+
+def mark_saved(saved, store, journal):
+    """저장소에 쓴 키워드를 수집 기록에 저장 완료로 표시 (saved: 결과 dict → save_result 반환값)"""
+    for result, (search_filename, cleaned_filename) in saved:
+        journal.mark_saved(
+            crawl_id(result["keyword"], result["search_params"]), search_filename, cleaned_filename or store.root
+        )
+
+
+# 메인 실행
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.join(script_dir, "data")
+    start = time.time()
+
+    # 지난 실행에서 쿼터 부족으로 미룬 키워드를 먼저 처리
+    parked = ParkedWork()
+    resumed = parked.take_ready()
+    keywords = list(dict.fromkeys(resumed + cf.KEYWORDS))
+    if resumed:
+        print(f"♻️ 미뤄 둔 키워드 {len(resumed)}개 재개")
+    print_keywords(keywords)
+
+    # 수집 기록: 저장까지 끝난 키워드는 건너뛰고, 중간에 멈춘 키워드는 이어서 수집
+    journal = CrawlJournal()
+    done_keywords = [
+        kw for kw in keywords if journal.start(kw, build_search_params(kw, cf.total_count))["saved"]
+    ]
+    if done_keywords:
+        print(f"⏭️ 이미 수집 완료된 키워드 {len(done_keywords)}개 건너뜀 (다시 수집하려면 CrawlJournal().reset())")
+        keywords = [kw for kw in keywords if kw not in done_keywords]
+
+    budget = QuotaBudget()
+    print(f"🔋 남은 쿼터: {budget.remaining:,} / {budget.daily_limit:,}")
+
+    store = VideoStore()
+    saved = []
+
+    def on_result(result):
+        if result["parked"]:
+            parked.park(result["keyword"], keyword_group(result["keyword"]), result["error"])
+            print(f"⏸️ [{result['keyword']}] 쿼터 부족 → 다음 초기화 이후로 미룸")
+            return
+        files = save_result(result, store, data_dir if cf.SAVE_RUN_FILES else None, journal)
+        if files is not None:
+            saved.append((result, files))
+        status = f"⚠️ {result['error']}" if result["error"] else "✅"
+        print(f"{status} [{result['keyword']}] 검색 {len(result['video_ids'])}개 → 저장 {len(result['cleaned_items'])}개")
+
+    results = asyncio.run(collect_all(keywords, on_result=on_result, budget=budget, journal=journal))
+    store.flush()
+    mark_saved(saved, store, journal)
+
+    total_stats = new_filter_stats()
+    for result in results:
+        for key, value in result["stats"].items():
+            total_stats[key] += value
+    print_filter_stats(total_stats)
+
+    print(f"\n{'='*70}")
+    print(f"🎉 전체 완료: 총 {sum(len(r['cleaned_items']) for r in results)}개의 비디오 데이터를 저장했습니다.")
+    print(f"📁 저장 위치: {store.root}/")
+    print(f"🔑 처리한 키워드 수: {len(keywords)}개 (실패 {sum(1 for r in results if r['error'] and not r['parked'])}개)")
+    print(f"⏸️ 미룬 키워드: {len(parked)}개 / 🔋 남은 쿼터: {budget.remaining:,}")
+    print(f"⏱️ 소요 시간: {time.time() - start:.1f}초")
+    print(f"{'='*70}")
@@ -0,0 +1,13 @@
+"""
+YouTube 수집기 (검색 → 중복 제거 → 상세 조회 → 필터 → 저장 파이프라인 + CLI)
+
+    cd get_data/youtube_api
+    python -m collector collect                               # config.py KEYWORDS 전체
+    python -m collector collect "코엑스 맛집" --district 삼성1동
+    python -m collector refresh                               # 저장된 영상 조회수만 다시 받기
+
+import만으로는 .env를 읽거나 출력하지 않으므로 스케줄러 작업에서 Pipeline을 직접 만들어 써도 된다.
+(youtube_api 폴더가 sys.path에 있어야 함)
+"""
+from .cli import build_parser, main
+from .pipeline import STAGES, Pipeline, StageCounter, print_stage_stats
@@ -0,0 +1,180 @@
+"""
+수집기 CLI
+
+    python -m collector collect                              # config.py KEYWORDS 전체 (미뤄 둔 키워드 먼저)
+    python -m collector collect "코엑스 맛집" --district 삼성1동  # get_csv.py처럼 키워드 하나
+    python -m collector collect --locations 성수 홍대 --total-count 200
+    python -m collector refresh                              # 저장된 영상의 조회수만 다시 받기
+
+옵션으로 준 기간/정렬/시간 분할 설정은 이 프로세스의 config 값을 덮어쓴다.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import config as cf
+from crawl_journal import CrawlJournal
+from get_csv_filtered import build_search_params, new_filter_stats, print_filter_stats, print_keywords
+from http_replay import MODES
+from quota_scheduler import ParkedWork, QuotaBudget, keyword_group
+from stat_refresh import refresh_statistics
+from video_store import STORE_PATH, VideoStore, export_csv
+
+from .pipeline import Pipeline, print_stage_stats
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m collector",
+        description="YouTube 수집 (검색 → 중복 제거 → 상세 조회 → 필터 → 저장)",
+    )
+    parser.add_argument("--base-url", help="API 주소 (기본: YOUTUBE_API_BASE_URL 또는 config.py)")
+    parser.add_argument("--http-mode", choices=MODES, help="live / record / replay (기본: config.py HTTP_MODE)")
+    parser.add_argument("--no-budget", action="store_true", help="쿼터 예산을 쓰지 않음 (가짜 서버 테스트용)")
+    sub = parser.add_subparsers(dest="command")
+
+    collect = sub.add_parser("collect", help="키워드 검색 → 저장소에 추가")
+    collect.add_argument("keywords", nargs="*", help="검색 키워드 (없으면 config.py KEYWORDS)")
+    collect.add_argument("--locations", nargs="+", help="지역명 → config.py CATEGORIES로 키워드 생성")
+    collect.add_argument("--district", help="모든 키워드를 이 행정동으로 저장 (기본: LOCATION_GROUPS 기준)")
+    collect.add_argument("--total-count", type=int, help=f"키워드별 검색 결과 수 (기본: {cf.total_count})")
+    collect.add_argument("--after", help="검색 시작 시각 (ISO 8601)")
+    collect.add_argument("--before", help="검색 종료 시각 (ISO 8601)")
+    collect.add_argument("--order", help="정렬 (date, rating, relevance, title, videoCount, viewCount)")
+    collect.add_argument("--time-slicing", dest="time_slicing", action="store_true", default=None,
+                         help="결과가 많은 기간을 나눠서 검색")
+    collect.add_argument("--no-time-slicing", dest="time_slicing", action="store_false")
+    collect.add_argument("--concurrency", type=int, help="동시 HTTP 요청 수")
+    collect.add_argument("--search-workers", type=int, help="동시에 검색하는 키워드 수")
+    collect.add_argument("--detail-workers", type=int, help="동시에 보내는 상세 조회 배치 수")
+    collect.add_argument("--queue-size", type=int, help="단계 사이 큐 크기")
+    collect.add_argument("--store", default=STORE_PATH, help="저장소 폴더")
+    collect.add_argument("--run-files", action="store_true", default=cf.SAVE_RUN_FILES,
+                         help="data/<지역>/ 아래 JSON/CSV도 저장")
+    collect.add_argument("--export-csv", help="끝나고 행정동별 최신 스냅샷을 이 CSV로 내보냄 (youtube_data.csv 형식)")
+    collect.add_argument("--no-journal", action="store_true", help="수집 기록 없이 처음부터 (이어서 수집 안 함)")
+
+    refresh = sub.add_parser("refresh", help="저장된 영상의 조회수/좋아요/댓글 수만 다시 받기 (stat_refresh.py)")
+    refresh.add_argument("--districts", nargs="+", help="행정동 (기본: 전체)")
+    refresh.add_argument("--interval-hours", type=float, help="영상별 최소 조회 간격")
+    refresh.add_argument("--max-age-days", type=int, help="게시된 지 이 일수가 지난 영상 제외")
+    return parser
+
+
+def apply_overrides(args):
+    """CLI 옵션 → config 값 / 환경변수 (이 프로세스 안에서만)"""
+    if args.http_mode:
+        os.environ["YOUTUBE_HTTP_MODE"] = args.http_mode
+    for option, name in (("after", "publishedAfter"), ("before", "publishedBefore"), ("order", "order")):
+        value = getattr(args, option, None)
+        if value:
+            setattr(cf, name, value)
+    if getattr(args, "time_slicing", None) is not None:
+        cf.TIME_SLICING = args.time_slicing
+
+
+def select_keywords(args, parked):
+    """검색할 키워드 (직접 준 키워드 > --locations > 미뤄 둔 키워드 + config.py KEYWORDS)"""
+    if args.keywords:
+        return list(dict.fromkeys(args.keywords))
+    if args.locations:
+        return [f"{loc} {' | '.join(cf.CATEGORIES)}" for loc in dict.fromkeys(args.locations)]
+    resumed = parked.take_ready()
+    if resumed:
+        print(f"♻️ 미뤄 둔 키워드 {len(resumed)}개 재개")
+    return list(dict.fromkeys(resumed + cf.KEYWORDS))
+
+
+def run_collect(args):
+    start = time.time()
+    total_count = cf.total_count if args.total_count is None else args.total_count
+    parked = ParkedWork()
+    keywords = select_keywords(args, parked)
+    print_keywords(keywords)
+
+    # 수집 기록: 저장까지 끝난 키워드는 건너뛰고, 중간에 멈춘 키워드는 이어서 수집
+    journal = None if args.no_journal else CrawlJournal()
+    if journal is not None:
+        done = [kw for kw in keywords if journal.start(kw, build_search_params(kw, total_count))["saved"]]
+        if done:
+            print(f"⏭️ 이미 수집 완료된 키워드 {len(done)}개 건너뜀 (다시 수집하려면 CrawlJournal().reset())")
+            keywords = [kw for kw in keywords if kw not in done]
+
+    budget = None if args.no_budget else QuotaBudget()
+    if budget is not None:
+        print(f"🔋 남은 쿼터: {budget.remaining:,} / {budget.daily_limit:,}")
+
+    def on_result(result):
+        if result["parked"]:
+            parked.park(result["keyword"], keyword_group(result["keyword"]), result["error"])
+            print(f"⏸️ [{result['keyword']}] 쿼터 부족 → 다음 초기화 이후로 미룸")
+            return
+        status = f"⚠️ {result['error']}" if result["error"] else "✅"
+        print(f"{status} [{result['keyword']}] 검색 {len(result['video_ids'])}개 → 저장 {len(result['cleaned_items'])}개")
+
+    store = VideoStore(args.store)
+    pipeline = Pipeline(
+        keywords, store, journal, budget, args.base_url,
+        total_count=total_count,
+        districts={kw: args.district for kw in keywords} if args.district else None,
+        data_dir=os.path.join(SCRIPT_DIR, "data") if args.run_files else None,
+        on_result=on_result,
+        max_concurrency=args.concurrency,
+        search_workers=args.search_workers,
+        detail_workers=args.detail_workers,
+        queue_size=args.queue_size,
+    )
+    results = asyncio.run(pipeline.run())
+
+    total_stats = new_filter_stats()
+    for result in results:
+        for key, value in result["stats"].items():
+            total_stats[key] += value
+    print_filter_stats(total_stats)
+    print_stage_stats(pipeline.counters)
+
+    if args.export_csv:
+        export_csv(args.export_csv, root=store.root)
+
+    failed = sum(1 for r in results if r["error"] and not r["parked"])
+    print(f"\n{'='*70}")
+    print(f"🎉 전체 완료: 총 {sum(len(r['cleaned_items']) for r in results)}개의 비디오 데이터를 저장했습니다.")
+    print(f"📁 저장 위치: {store.root}/")
+    print(f"🔑 처리한 키워드 수: {len(results)}개 (실패 {failed}개)")
+    print(f"⏸️ 미룬 키워드: {len(parked)}개" + (f" / 🔋 남은 쿼터: {budget.remaining:,}" if budget else ""))
+    print(f"⏱️ 소요 시간: {time.time() - start:.1f}초")
+    print(f"{'='*70}")
+    return 1 if failed else 0
+
+
+def run_refresh(args):
+    budget = None if args.no_budget else QuotaBudget()
+    velocity = refresh_statistics(
+        districts=args.districts, budget=budget, base_url=args.base_url,
+        interval_hours=args.interval_hours, max_age_days=args.max_age_days,
+    )
+    if len(velocity):
+        print(velocity[['district', 'videos', 'view_delta', 'views_per_day', 'median_views_per_day']].to_string(index=False))
+    return 0
+
+
+def main(argv=None):
+    """
+    CLI 진입점
+
+    Returns:
+        int: 종료 코드 (실패한 키워드가 있으면 1)
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:  # 하위 명령을 안 주면 collect
+        args = parser.parse_args(argv + ["collect"])
+    apply_overrides(args)
+    if args.command == "refresh":
+        return run_refresh(args)
+    return run_collect(args)
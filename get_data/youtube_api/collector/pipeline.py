@@ -0,0 +1,454 @@
+"""
+수집 파이프라인: 검색 → 중복 제거 → 상세 조회 → 필터 → 저장
+
+단계마다 작업자(task)가 따로 돌고 단계 사이는 크기 제한이 있는 asyncio.Queue로 이어져 있어서
+앞 단계가 다음 페이지를 검색하는 동안 뒤 단계가 상세 조회/필터/저장을 한다.
+뒤 단계가 밀리면 큐가 차서 앞 단계가 기다리므로 메모리에 쌓이는 양은 QUEUE_SIZE로 묶인다.
+
+    search  (SEARCH_WORKERS개)  키워드 → 검색 페이지 (journal이 있으면 기록된 위치부터)
+    dedupe  (1개)               처음 본 영상 id만 50개씩 묶음 (캐시에 있으면 상세 조회 생략)
+    details (DETAIL_WORKERS개)  videos API 배치 조회
+    filter  (1개)               content_filter 규칙 적용 + CSV 필드 정리
+    store   (1개)               검색/상세가 모두 끝난 키워드부터 VideoStore에 추가
+
+단계별 처리 건수, 입력 대기/출력 대기 시간, 큐 최대 대기량은 StageCounter에 쌓인다.
+"""
+import asyncio
+import time
+
+import aiohttp
+
+import config as cf
+from async_collector import (
+    DETAIL_BATCH_SIZE, ApiError, fetch_details, mark_saved, new_result, plan_keywords, save_result,
+    search_keyword,
+)
+from content_filter import HIT_KEYS, STAT_KEYS, default_filter
+from get_csv_filtered import build_search_params, clean_video_item
+from quota_scheduler import QuotaExhausted, keyword_group
+
+STAGES = ("search", "dedupe", "details", "filter", "store")
+
+_DONE = object()  # 앞 단계 작업자 하나가 끝났다는 표시
+
+
+class StageCounter:
+    """
+    단계 하나의 처리량
+
+    입력/출력 단위는 단계마다 다르다 (search: 키워드 → 영상 id, dedupe: 영상 id → 새 영상 id,
+    details: 조회한 id → 받은 아이템, filter: 아이템 → 통과, store: 키워드 → 저장한 영상).
+    idle은 입력 큐가 비어서 기다린 시간, blocked는 출력 큐가 차서 기다린 시간 (작업자 합계).
+    """
+
+    def __init__(self, name, workers=1):
+        self.name = name
+        self.workers = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.idle = 0.0
+        self.blocked = 0.0
+        self.max_backlog = 0
+        self.started = None
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def busy(self):
+        """작업자 하나당 실제로 일한 비율 (0~1)"""
+        total = self.elapsed * self.workers
+        return max(0.0, 1 - (self.idle + self.blocked) / total) if total else 0.0
+
+    @property
+    def rate(self):
+        """초당 입력 처리 건수"""
+        return self.items_in / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "in": self.items_in,
+            "out": self.items_out,
+            "rate": round(self.rate, 1),
+            "busy": round(self.busy, 3),
+            "idle_s": round(self.idle, 2),
+            "blocked_s": round(self.blocked, 2),
+            "max_backlog": self.max_backlog,
+            "elapsed_s": round(self.elapsed, 2),
+        }
+
+
+def print_stage_stats(counters):
+    """단계별 처리량 표 출력"""
+    print("\n" + "="*70)
+    print("⚙️ 단계별 처리량")
+    print("="*70)
+    print(f"  {'단계':<8}{'작업자':>6}{'입력':>8}{'출력':>8}{'건/초':>9}{'가동률':>8}{'출력 대기':>10}{'최대 큐':>8}")
+    for counter in counters.values():
+        print(f"  {counter.name:<8}{counter.workers:>6}{counter.items_in:>8}{counter.items_out:>8}"
+              f"{counter.rate:>9.1f}{counter.busy:>8.0%}{counter.blocked:>9.1f}s{counter.max_backlog:>8}")
+    print("="*70 + "\n")
+
+
+class Pipeline:
+    """
+    단계별 작업자 + 큐로 이어진 수집 파이프라인
+
+    Args:
+        keywords (list): 검색 키워드
+        store (VideoStore): 저장소 (None이면 저장하지 않고 결과만 돌려줌)
+        journal (CrawlJournal): 수집 기록 (주면 이어서 수집, 상세 정보 캐시 사용, 저장 완료 표시)
+        budget (QuotaBudget): 쿼터 예산 (지역 그룹별 배분, 예산을 못 받은 키워드는 바로 parked)
+        base_url, api_key (str): API 주소/키 (None이면 YOUTUBE_API_BASE_URL / .env)
+        total_count (int): 키워드별 검색 결과 수 (None이면 cf.total_count)
+        districts (dict): 키워드 → 저장할 행정동 (없는 키워드는 LOCATION_GROUPS 기준)
+        data_dir (str): 주면 키워드별 JSON/CSV도 저장 (get_csv_filtered.py 형식)
+        on_result (callable): 키워드 하나가 끝날 때마다 결과 dict로 호출 (저장은 파이프라인이 함)
+        max_concurrency (int): 동시에 보내는 HTTP 요청 수 (None이면 cf.MAX_CONCURRENCY)
+        search_workers, detail_workers (int): 단계별 작업자 수 (None이면 cf.SEARCH_WORKERS / cf.DETAIL_WORKERS)
+        queue_size (int): 단계 사이 큐 크기 (None이면 cf.QUEUE_SIZE)
+    """
+
+    def __init__(self, keywords, store=None, journal=None, budget=None, base_url=None, api_key=None,
+                 total_count=None, region_code="KR", districts=None, data_dir=None, on_result=None,
+                 content_filter=None, ttl_hours=None, max_concurrency=None, search_workers=None,
+                 detail_workers=None, queue_size=None):
+        self.keywords = list(dict.fromkeys(keywords))
+        self.store = store
+        self.journal = journal
+        self.budget = budget
+        self.base_url = base_url
+        self.api_key = api_key
+        self.total_count = cf.total_count if total_count is None else total_count
+        self.region_code = region_code
+        self.districts = districts or {}
+        self.data_dir = data_dir
+        self.on_result = on_result
+        self.content_filter = content_filter
+        self.ttl_hours = ttl_hours
+        self.max_concurrency = max_concurrency or cf.MAX_CONCURRENCY
+        self.search_workers = search_workers or cf.SEARCH_WORKERS
+        self.detail_workers = detail_workers or cf.DETAIL_WORKERS
+        self.queue_size = queue_size or cf.QUEUE_SIZE
+
+        self.counters = {
+            "search": StageCounter("search", self.search_workers),
+            "dedupe": StageCounter("dedupe"),
+            "details": StageCounter("details", self.detail_workers),
+            "filter": StageCounter("filter"),
+            "store": StageCounter("store"),
+        }
+        self.results = {}  # 키워드 → new_result dict
+        self.saved = []  # (결과, save_result 반환값) → flush 뒤 mark_saved
+
+    # ===== 큐 =====
+    async def _get(self, counter, queue):
+        if counter.started is None:
+            counter.started = time.perf_counter()
+        counter.max_backlog = max(counter.max_backlog, queue.qsize())
+        if queue.empty():
+            start = time.perf_counter()
+            item = await queue.get()
+            counter.idle += time.perf_counter() - start
+            return item
+        return queue.get_nowait()
+
+    async def _put(self, counter, queue, item):
+        if queue.full():
+            start = time.perf_counter()
+            await queue.put(item)
+            counter.blocked += time.perf_counter() - start
+        else:
+            queue.put_nowait(item)
+
+    # ===== 실행 =====
+    async def run(self):
+        """
+        전체 키워드 수집 (store가 있으면 끝에 flush, journal이 있으면 저장 완료 표시)
+
+        Returns:
+            list: 키워드별 결과 dict (지역 그룹 순)
+        """
+        keywords, skipped, self.group_left = plan_keywords(self.keywords, self.budget, self.total_count)
+        for keyword in keywords:
+            self.results[keyword] = new_result(
+                keyword, build_search_params(keyword, self.total_count, 50, self.region_code)
+            )
+        for keyword in skipped:
+            self.results[keyword].update(error="쿼터 부족으로 이번 실행에서 제외", parked=True)
+            self._finish(self.results[keyword])
+
+        keyword_queue = asyncio.Queue()
+        for keyword in keywords:
+            if keyword not in skipped:
+                keyword_queue.put_nowait(keyword)
+        for _ in range(self.search_workers):
+            keyword_queue.put_nowait(_DONE)
+        search_queue, detail_queue, filter_queue, store_queue = (
+            asyncio.Queue(self.queue_size) for _ in range(4)
+        )
+
+        limiter = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        timeout = aiohttp.ClientTimeout(total=cf.REQUEST_TIMEOUT)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            tasks = [asyncio.ensure_future(self._search(session, limiter, keyword_queue, search_queue))
+                     for _ in range(self.search_workers)]
+            tasks.append(asyncio.ensure_future(self._dedupe(search_queue, detail_queue, filter_queue, store_queue)))
+            tasks += [asyncio.ensure_future(self._details(session, limiter, detail_queue, filter_queue))
+                      for _ in range(self.detail_workers)]
+            tasks.append(asyncio.ensure_future(self._filter(filter_queue, store_queue)))
+            tasks.append(asyncio.ensure_future(self._store(store_queue)))
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+        if self.store is not None:
+            self.store.flush()
+            if self.journal is not None:
+                mark_saved(self.saved, self.store, self.journal)
+        return [self.results[keyword] for keyword in keywords]
+
+    # ===== 1. 검색 =====
+    async def _search(self, session, limiter, keyword_queue, out):
+        counter = self.counters["search"]
+        while True:
+            keyword = await self._get(counter, keyword_queue)
+            if keyword is _DONE:
+                await self._put(counter, out, _DONE)
+                counter.finished = time.perf_counter()
+                return
+
+            counter.items_in += 1
+            result = self.results[keyword]
+            await self._put(counter, out, ("start", keyword))
+
+            async def on_items(items, video_ids, keyword=keyword):
+                counter.items_out += len(video_ids)
+                await self._put(counter, out, ("page", keyword, items, video_ids))
+
+            search_done = False
+            try:
+                result["page_info"] = await search_keyword(
+                    session, keyword, limiter, on_items, self.base_url, self.api_key, self.total_count,
+                    self.region_code, self.budget, self.journal,
+                )
+                search_done = True
+            except ApiError as e:
+                result["error"] = f"검색 실패: {e}"
+            except QuotaExhausted as e:
+                result.update(error=str(e), parked=True)
+
+            # 그룹의 마지막 키워드면 남은 배분량을 다른 그룹에 넘김 (상세 조회는 공용 쿼터)
+            group = keyword_group(keyword)
+            self.group_left[group] -= 1
+            if self.budget is not None and self.group_left[group] == 0:
+                self.budget.finish(group)
+            await self._put(counter, out, ("end", keyword, search_done))
+
+    # ===== 2. 중복 제거 =====
+    async def _dedupe(self, inp, detail_queue, filter_queue, store_queue):
+        counter = self.counters["dedupe"]
+        seen = set()
+        pending = []  # 상세 조회할 영상 id (50개가 차면 배치로 보냄)
+        searching = 0
+        open_workers = self.search_workers
+
+        async def send(ids):
+            for i in range(0, len(ids), DETAIL_BATCH_SIZE):
+                await self._put(counter, detail_queue, ids[i:i + DETAIL_BATCH_SIZE])
+
+        while open_workers:
+            message = await self._get(counter, inp)
+            if message is _DONE:
+                open_workers -= 1
+                continue
+            kind, keyword = message[0], message[1]
+            if kind == "start":
+                searching += 1
+                continue
+            if kind == "end":
+                searching -= 1
+                await self._put(counter, store_queue, message)
+                if searching == 0 and pending:
+                    # 검색 중인 키워드가 없을 때만 덜 찬 배치를 보냄
+                    await send(pending)
+                    pending = []
+                continue
+
+            _, _, items, video_ids = message
+            counter.items_in += len(video_ids)
+            new = [vid for vid in dict.fromkeys(video_ids) if vid not in seen]
+            seen.update(new)
+            counter.items_out += len(new)
+            # 키워드 ↔ 영상 연결을 먼저 보내야 저장 단계가 결과를 키워드에 붙일 수 있음
+            await self._put(counter, store_queue, ("link", keyword, items, video_ids))
+            if not new:
+                continue
+
+            missing = new
+            if self.journal is not None:
+                missing = self.journal.missing_details(new, self.ttl_hours)
+                fresh = set(missing)
+                cached = [vid for vid in new if vid not in fresh]
+                if cached:
+                    await self._put(counter, filter_queue, ("items", cached, self.journal.cached_details(cached)))
+            pending.extend(missing)
+            if len(pending) >= DETAIL_BATCH_SIZE:
+                full = len(pending) - len(pending) % DETAIL_BATCH_SIZE
+                await send(pending[:full])
+                pending = pending[full:]
+
+        await send(pending)
+        for _ in range(self.detail_workers):
+            await self._put(counter, detail_queue, _DONE)
+        await self._put(counter, filter_queue, _DONE)
+        await self._put(counter, store_queue, _DONE)
+        counter.finished = time.perf_counter()
+
+    # ===== 3. 상세 조회 =====
+    async def _details(self, session, limiter, inp, out):
+        counter = self.counters["details"]
+        while True:
+            batch = await self._get(counter, inp)
+            if batch is _DONE:
+                await self._put(counter, out, _DONE)
+                counter.finished = time.perf_counter()
+                return
+
+            counter.items_in += len(batch)
+            try:
+                items = await fetch_details(session, batch, limiter, self.base_url, self.api_key, self.budget)
+            except (ApiError, QuotaExhausted) as e:
+                await self._put(counter, out, ("failed", batch, e))
+                continue
+            if self.journal is not None:
+                self.journal.record_details(batch, items)
+            counter.items_out += len(items)
+            await self._put(counter, out, ("items", batch, items))
+
+    # ===== 4. 필터 =====
+    async def _filter(self, inp, out):
+        counter = self.counters["filter"]
+        content_filter = self.content_filter or default_filter()
+        open_workers = self.detail_workers + 1  # 상세 조회 작업자 + 캐시를 넘기는 중복 제거 단계
+        while open_workers:
+            message = await self._get(counter, inp)
+            if message is _DONE:
+                open_workers -= 1
+                continue
+            kind, video_ids, payload = message
+            if kind == "failed":
+                await self._put(counter, out, message)
+                continue
+
+            # 응답에 없는 id는 삭제/비공개 영상
+            by_id = {item.get("id"): item for item in payload}
+            items = [by_id[vid] for vid in video_ids if vid in by_id]
+            reasons, hits = content_filter.classify_hits(items)
+            counter.items_in += len(items)
+            counter.items_out += reasons.count(None)
+            verdicts = [
+                (item.get("id"), reason, item_hits if reason else clean_video_item(item))
+                for item, reason, item_hits in zip(items, reasons, hits)
+            ]
+            verdicts += [(vid, "missing", None) for vid in video_ids if vid not in by_id]
+            await self._put(counter, out, ("videos", video_ids, verdicts))
+        await self._put(counter, out, _DONE)
+        counter.finished = time.perf_counter()
+
+    # ===== 5. 저장 =====
+    async def _store(self, inp):
+        counter = self.counters["store"]
+        verdicts = {}  # 영상 id → (None, 정리된 아이템) / (제외 사유, 적중 규칙 tuple) / ("failed", 예외)
+        owners = {}  # 결과를 기다리는 영상 id → 키워드 목록
+        waiting = {}  # 키워드 → 결과를 기다리는 영상 id
+        passed = {}  # 키워드 → {영상 id: 정리된 아이템}
+        ended = {}  # 검색이 끝난 키워드 → 검색 성공 여부
+
+        def apply(keyword, vid):
+            reason, value = verdicts[vid]
+            result = self.results[keyword]
+            if reason == "failed":
+                if isinstance(value, QuotaExhausted):
+                    result.update(error=str(value), parked=True)
+                else:
+                    result["error"] = f"상세 조회 실패: {value}"
+            elif reason != "missing":
+                result["stats"]["total"] += 1
+                if reason is None:
+                    result["stats"]["passed"] += 1
+                    passed[keyword][vid] = value
+                else:
+                    result["stats"][STAT_KEYS[reason]] += 1
+                    for rule in value:
+                        result["stats"][HIT_KEYS[rule]] += 1
+
+        def try_finish(keyword):
+            if keyword not in ended or waiting[keyword]:
+                return
+            result = self.results[keyword]
+            items = passed.pop(keyword)
+            result["cleaned_items"] = [items[vid] for vid in dict.fromkeys(result["video_ids"]) if vid in items]
+            result["complete"] = ended.pop(keyword) and not result["error"] and not result["parked"]
+            del waiting[keyword]
+            counter.items_out += len(result["cleaned_items"]) if self._finish(result) else 0
+
+        open_workers = 2  # 중복 제거 단계 + 필터 단계
+        while open_workers:
+            message = await self._get(counter, inp)
+            if message is _DONE:
+                open_workers -= 1
+                continue
+            kind = message[0]
+            if kind == "link":
+                _, keyword, items, video_ids = message
+                result = self.results[keyword]
+                result["search_items"].extend(items)
+                result["video_ids"].extend(video_ids)
+                waiting.setdefault(keyword, set())
+                passed.setdefault(keyword, {})
+                for vid in dict.fromkeys(video_ids):
+                    if vid in verdicts:
+                        apply(keyword, vid)
+                    elif vid not in waiting[keyword]:
+                        waiting[keyword].add(vid)
+                        owners.setdefault(vid, []).append(keyword)
+            elif kind == "end":
+                _, keyword, search_done = message
+                counter.items_in += 1
+                waiting.setdefault(keyword, set())
+                passed.setdefault(keyword, {})
+                ended[keyword] = search_done
+                try_finish(keyword)
+            else:
+                _, video_ids, payload = message
+                if kind == "failed":
+                    payload = [(vid, "failed", payload) for vid in video_ids]
+                for vid, reason, value in payload:
+                    verdicts[vid] = (reason, value)
+                    for keyword in owners.pop(vid, []):
+                        waiting[keyword].discard(vid)
+                        apply(keyword, vid)
+                        try_finish(keyword)
+        counter.finished = time.perf_counter()
+
+    def _finish(self, result):
+        """끝난 키워드 저장 + on_result 호출 (저장했으면 True)"""
+        files = None
+        if self.store is not None:
+            files = save_result(result, self.store, self.data_dir, self.journal, self.districts.get(result["keyword"]))
+            if files is not None:
+                self.saved.append((result, files))
+        if self.on_result is not None:
+            self.on_result(result)
+        return files is not None
@@ -70,7 +70,51 @@ STOPWORDS = [
 # ==== 추가 필터링 설정 ==== 
 CHANNEL_BLACKLIST = ["청담언니"]  # 제외할 채널 목록
 REQUIRED_IN_TITLE = ["청담", "청담동", "청담역"]  # 제목에 반드시 포함되어야 할 키워드
+FILTER_REQUIRED_TITLE = False  # 제목 필수 키워드 필터 사용 여부
 MIN_DURATION = 120  # 최소 영상 길이 (초) - 2분
 FILTER_SHORTS = False  # Shorts 제거 여부
 FILTER_ADS = False  # 협찬 콘텐츠 제거 여부
 AD_KEYWORDS = ['협찬', '#협찬', 'AD', '광고', 'PR', '제공', 'sponsor']  # 협찬 키워드
+
+# ==== 비동기 수집 설정 (async_collector.py) ====
+API_BASE_URL = "https://www.googleapis.com/youtube/v3"  # 로컬 가짜 서버로 테스트할 때는 YOUTUBE_API_BASE_URL 환경변수로 교체
+MAX_CONCURRENCY = 8  # 동시에 보내는 HTTP 요청 수
+KEYWORD_CONCURRENCY = 4  # 동시에 처리하는 키워드 수
+REQUEST_TIMEOUT = 30  # 요청 하나의 제한 시간 (초)
+
+# ==== 쿼터 설정 (quota_scheduler.py) ====
+DAILY_QUOTA = 10000  # 하루 쿼터 (태평양 시간 자정에 초기화)
+QUOTA_COST = {"search": 100, "videos": 1}  # 요청 1회당 소모 단위
+MAX_RETRIES = 5  # 403(속도 제한)/429/5xx 재시도 횟수
+BACKOFF_BASE = 1.0  # 재시도 대기 시작값 (초), 2배씩 증가 + 지터
+BACKOFF_MAX = 60.0  # 재시도 대기 최대값 (초)
+
+# ==== 상세 정보 캐시 (crawl_journal.py) ====
+DETAIL_TTL_HOURS = 24 * 7  # 캐시된 조회수/좋아요/댓글 수를 다시 받기 전까지 유효 시간
+
+# ==== 시간 분할 검색 (time_slicer.py) ====
+TIME_SLICING = False  # True면 결과가 많은 기간을 반씩 나눠서 검색 (total_count = 전체 구간 합계 상한)
+SLICE_MAX_RESULTS = 500  # 구간 하나에서 search API로 넘겨받을 수 있는 최대 결과 수 (넘으면 구간 분할)
+MIN_SLICE_HOURS = 24  # 이보다 짧은 구간은 더 나누지 않음
+
+# ==== 수집 데이터 저장소 (video_store.py) ====
+SAVE_RUN_FILES = False  # True면 저장소와 함께 기존처럼 실행마다 data/<지역>/ 아래 JSON/CSV도 저장
+
+# ==== 조회수 추적 (stat_refresh.py) ====
+REFRESH_INTERVAL_HOURS = 24  # 영상별 통계를 다시 받는 최소 간격 (더 자주 실행해도 이 간격이 지난 영상만 조회)
+REFRESH_MAX_AGE_DAYS = None  # 게시된 지 이 일수가 지난 영상은 더 추적하지 않음 (None이면 전체)
+
+# ==== 오프라인 녹화/재생 (http_replay.py, fake_server.py) ====
+HTTP_MODE = "live"  # live / record (응답을 CASSETTE_DIR에 녹화) / replay (녹화된 응답만 사용) — YOUTUBE_HTTP_MODE 환경변수로도 지정
+CASSETTE_DIR = ".cassettes"  # 녹화 폴더 (스크립트 위치 기준, YOUTUBE_CASSETTE_DIR 환경변수로 교체)
+FAKE_PORT = 8080  # 가짜 서버 포트 → YOUTUBE_API_BASE_URL=http://127.0.0.1:8080/youtube/v3
+FAKE_LATENCY = 0.05  # 가짜 서버 응답 지연 (초)
+FAKE_JITTER = 0.02  # 응답 지연에 더할 무작위 시간 최대값 (초)
+FAKE_ERROR_RATE = 0.0  # 오류를 돌려줄 요청 비율 (0~1)
+FAKE_ERRORS = ["429", "rateLimitExceeded", "500"]  # 주입할 오류 종류 ("quotaExceeded"도 가능)
+FAKE_QUOTA = None  # 가짜 서버 쿼터 상한 (넘으면 quotaExceeded, None이면 무제한)
+
+# ==== 수집 파이프라인 (collector/) ====
+QUEUE_SIZE = 64  # 단계 사이 큐 크기 (뒤 단계가 밀리면 앞 단계가 기다림)
+SEARCH_WORKERS = KEYWORD_CONCURRENCY  # 동시에 검색하는 키워드 수
+DETAIL_WORKERS = 4  # 동시에 보내는 상세 조회 배치 수 (HTTP 요청 수는 MAX_CONCURRENCY로 제한)
@@ -0,0 +1,151 @@
+import re
+
+import config as cf
+
+# 필터 규칙 (순서 = 우선순위: 여러 규칙에 걸리면 앞 규칙으로 제외 집계)
+RULES = ["channel", "stopwords", "title", "duration", "ads"]
+
+# new_filter_stats()의 키
+STAT_KEYS = {
+    "channel": "filtered_channel",
+    "stopwords": "filtered_stopwords",
+    "title": "filtered_title",
+    "duration": "filtered_duration",
+    "ads": "filtered_ads",
+}
+# 우선순위와 상관없이 규칙에 걸린 영상 수 (new_filter_stats()의 키)
+HIT_KEYS = {rule: f"hit_{rule}" for rule in RULES}
+
+DURATION_PATTERN = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+
+
+def get_duration_seconds(duration_str):
+    """ISO 8601 duration을 초로 변환 (예: PT2M30S → 150초)"""
+    if not duration_str:
+        return 0
+    match = DURATION_PATTERN.match(duration_str)
+    if match:
+        hours = int(match.group(1) or 0)
+        minutes = int(match.group(2) or 0)
+        seconds = int(match.group(3) or 0)
+        return hours * 3600 + minutes * 60 + seconds
+    return 0
+
+
+def literal_pattern(words):
+    """
+    단어 목록 → 소문자 정규식 하나 (긴 단어 먼저, 특수문자 이스케이프)
+
+    단어마다 `in`으로 다시 훑는 대신 텍스트를 한 번만 훑는다. 단어가 없으면 None.
+    대소문자 무시는 re.IGNORECASE 대신 텍스트를 소문자로 바꿔서 비교 (짧은 단어에서 훨씬 빠름).
+    """
+    words = sorted({w.lower() for w in words if w}, key=len, reverse=True)
+    if not words:
+        return None
+    return re.compile("|".join(re.escape(w) for w in words))
+
+
+class ContentFilter:
+    """
+    금지어 / 협찬 키워드 / 채널 블랙리스트 / 제목 필수 키워드 / 영상 길이 필터
+
+    규칙은 만들 때 한 번만 컴파일하고, classify()는 영상 배치 전체를 한 번 훑으면서
+    영상별 제외 사유와 규칙별 적중 수를 함께 돌려준다.
+    """
+
+    def __init__(self, stopwords=None, ad_keywords=None, channel_blacklist=None, required_in_title=None,
+                 min_duration=None, filter_shorts=None, filter_ads=None, filter_title=None):
+        self.stopwords = literal_pattern(cf.STOPWORDS if stopwords is None else stopwords)
+        self.ad_keywords = literal_pattern(cf.AD_KEYWORDS if ad_keywords is None else ad_keywords)
+        self.required_in_title = literal_pattern(cf.REQUIRED_IN_TITLE if required_in_title is None else required_in_title)
+        self.channel_blacklist = frozenset(cf.CHANNEL_BLACKLIST if channel_blacklist is None else channel_blacklist)
+        self.min_duration = cf.MIN_DURATION if min_duration is None else min_duration
+        self.filter_shorts = cf.FILTER_SHORTS if filter_shorts is None else filter_shorts
+        self.filter_ads = cf.FILTER_ADS if filter_ads is None else filter_ads
+        self.filter_title = cf.FILTER_REQUIRED_TITLE if filter_title is None else filter_title
+
+    def has_stopword(self, title, description):
+        """제목/설명에 금지어 포함 여부 (공백 제거 후 비교)"""
+        if self.stopwords is None:
+            return False
+        text = (str(title) + " " + str(description)).replace(" ", "").lower()
+        return self.stopwords.search(text) is not None
+
+    def rule_masks(self, items):
+        """
+        규칙별 적중 여부 (켜진 규칙만)
+
+        영상마다 규칙 함수를 부르는 대신, 배치의 텍스트를 한 번 만들어 두고
+        규칙마다 컴파일된 정규식을 리스트 전체에 적용한다.
+
+        Args:
+            items (list): videos API 응답 아이템
+
+        Returns:
+            dict: 규칙 이름 → 영상별 bool 리스트
+        """
+        snippets = [item.get("snippet", {}) for item in items]
+        titles = [sn.get("title", "") or "" for sn in snippets]
+        # 금지어는 공백을 뺀 텍스트, 협찬 키워드는 공백을 둔 텍스트에서 찾음 (기존 필터와 동일)
+        texts = [(t + " " + (sn.get("description", "") or "")).lower() for t, sn in zip(titles, snippets)]
+
+        masks = {}
+        if self.channel_blacklist:
+            masks["channel"] = [sn.get("channelTitle", "") in self.channel_blacklist for sn in snippets]
+        if self.stopwords is not None:
+            search = self.stopwords.search
+            masks["stopwords"] = [search(t.replace(" ", "")) is not None for t in texts]
+        if self.filter_title and self.required_in_title is not None:
+            search = self.required_in_title.search
+            masks["title"] = [search(t.lower()) is None for t in titles]
+        if self.filter_shorts:
+            durations = [item.get("contentDetails", {}).get("duration", "") for item in items]
+            seconds = {d: get_duration_seconds(d) for d in set(durations)}  # 같은 길이 문자열은 한 번만 파싱
+            masks["duration"] = [seconds[d] < self.min_duration for d in durations]
+        if self.filter_ads and self.ad_keywords is not None:
+            search = self.ad_keywords.search
+            masks["ads"] = [search(t) is not None for t in texts]
+        return masks
+
+    def classify_hits(self, items):
+        """
+        영상 배치 분류 + 영상별 적중 규칙
+
+        Returns:
+            tuple: (영상별 제외 사유 리스트 (통과면 None, 여러 규칙이면 RULES에서 앞선 규칙),
+                    영상별 적중 규칙 tuple 리스트 (RULES 순서))
+        """
+        masks = self.rule_masks(items)
+        active = [rule for rule in RULES if rule in masks]
+        hits = [tuple(rule for rule in active if masks[rule][i]) for i in range(len(items))]
+        return [h[0] if h else None for h in hits], hits
+
+    def classify(self, items):
+        """
+        영상 배치 분류
+
+        Returns:
+            tuple: (영상별 제외 사유 리스트 (통과면 None), 규칙별 적중 수 dict)
+                적중 수는 우선순위와 상관없이 규칙에 걸린 영상 수 (한 영상이 여러 규칙에 걸릴 수 있음)
+        """
+        reasons, hits = self.classify_hits(items)
+        hit_counts = dict.fromkeys(RULES, 0)
+        for item_hits in hits:
+            for rule in item_hits:
+                hit_counts[rule] += 1
+        return reasons, hit_counts
+
+
+_default = {}
+
+
+def default_filter():
+    """config.py 설정으로 만든 필터 (설정이 바뀌면 다시 컴파일)"""
+    key = (
+        tuple(cf.STOPWORDS), tuple(cf.AD_KEYWORDS), tuple(cf.CHANNEL_BLACKLIST), tuple(cf.REQUIRED_IN_TITLE),
+        cf.MIN_DURATION, cf.FILTER_SHORTS, cf.FILTER_ADS, cf.FILTER_REQUIRED_TITLE,
+    )
+    if key not in _default:
+        _default.clear()
+        _default[key] = ContentFilter()
+    return _default[key]
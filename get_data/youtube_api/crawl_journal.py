@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import config as cf
+from quota_scheduler import keyword_group
+
+STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".crawl")
+JOURNAL_PATH = os.path.join(STATE_DIR, "journal.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawls (
+    crawl_id TEXT PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    search_params TEXT NOT NULL,
+    next_page_token TEXT,
+    fetched INTEGER NOT NULL DEFAULT 0,
+    total_results INTEGER NOT NULL DEFAULT 0,
+    results_per_page INTEGER NOT NULL DEFAULT 0,
+    search_done INTEGER NOT NULL DEFAULT 0,
+    search_file TEXT,
+    cleaned_file TEXT,
+    saved_at TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS search_items (
+    crawl_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    video_id TEXT,
+    item TEXT NOT NULL,
+    PRIMARY KEY (crawl_id, position)
+);
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    item TEXT,
+    fetched_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keyword_videos (
+    keyword TEXT NOT NULL,
+    location TEXT NOT NULL,
+    location_group TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    PRIMARY KEY (keyword, video_id)
+);
+CREATE INDEX IF NOT EXISTS keyword_videos_video ON keyword_videos (video_id);
+"""
+
+
+def crawl_id(keyword, search_params):
+    """키워드 + 검색 조건(기간/정렬/개수) 해시 → 같은 조건의 재실행만 이어서 수집"""
+    spec = json.dumps(dict(search_params, query=keyword), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(spec.encode("utf-8")).hexdigest()[:16]
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class CrawlJournal:
+    """
+    키워드별 수집 진행 상황 기록 (SQLite)
+
+    검색 페이지는 받는 즉시 nextPageToken과 함께 기록하고,
+    상세 정보는 키워드와 상관없이 영상 id 하나당 한 번만 기록한다 (videos 캐시).
+    중간에 멈춘 뒤 다시 실행하면 마지막 페이지 토큰부터 이어서 검색하고,
+    캐시에 없거나 통계(조회수 등)가 오래된 영상만 조회하기 때문에
+    이미 받은 페이지/영상에 쿼터를 다시 쓰지 않는다.
+    저장까지 끝난 키워드는 다음 실행에서 건너뛴다 (같은 검색 조건일 때).
+
+    어떤 키워드(지역)에서 검색된 영상인지는 keyword_videos 테이블에 따로 남긴다.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # ===== 검색 =====
+    def start(self, keyword, search_params):
+        """
+        키워드 수집 시작 (이미 있으면 기존 진행 상황 그대로)
+
+        Returns:
+            dict: crawl_id, next_page_token, fetched, total_results, search_done, saved
+        """
+        cid = crawl_id(keyword, search_params)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO crawls (crawl_id, keyword, search_params, updated_at) VALUES (?, ?, ?, ?)",
+                (cid, keyword, json.dumps(search_params, ensure_ascii=False), _now()),
+            )
+        return self.state(cid)
+
+    def state(self, cid):
+        row = self.conn.execute("SELECT * FROM crawls WHERE crawl_id = ?", (cid,)).fetchone()
+        return {
+            "crawl_id": cid,
+            "keyword": row["keyword"],
+            "next_page_token": row["next_page_token"],
+            "fetched": row["fetched"],
+            "total_results": row["total_results"],
+            "search_done": bool(row["search_done"]),
+            "saved": row["saved_at"] is not None,
+        }
+
+    def record_page(self, cid, data, items, done):
+        """
+        검색 페이지 하나 기록 (아이템 + 다음 페이지 토큰을 한 트랜잭션으로)
+
+        Args:
+            cid (str): crawl_id
+            data (dict): search API 응답 (pageInfo, nextPageToken)
+            items (list): 저장할 형태로 정리한 아이템 (clean_search_item 결과)
+            done (bool): 마지막 페이지 여부
+        """
+        with self.conn:
+            fetched, keyword = self.conn.execute(
+                "SELECT fetched, keyword FROM crawls WHERE crawl_id = ?", (cid,)
+            ).fetchone()
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO search_items (crawl_id, position, video_id, item) VALUES (?, ?, ?, ?)",
+                [
+                    (cid, fetched + i, item.get("id", {}).get("videoId"), json.dumps(item, ensure_ascii=False))
+                    for i, item in enumerate(items)
+                ],
+            )
+            self._link(keyword, [item.get("id", {}).get("videoId") for item in items])
+            if fetched == 0:
+                page_info = data.get("pageInfo", {})
+                self.conn.execute(
+                    "UPDATE crawls SET total_results = ?, results_per_page = ? WHERE crawl_id = ?",
+                    (page_info.get("totalResults", 0), page_info.get("resultsPerPage", 0), cid),
+                )
+            self.conn.execute(
+                "UPDATE crawls SET fetched = ?, next_page_token = ?, search_done = ?, updated_at = ? WHERE crawl_id = ?",
+                (fetched + len(items), data.get("nextPageToken"), int(done), _now(), cid),
+            )
+
+    def search_result(self, cid):
+        """
+        기록된 검색 결과 (search_youtube 반환 형식)
+
+        Returns:
+            tuple: (video_ids, search_items, page_info)
+        """
+        rows = self.conn.execute(
+            "SELECT video_id, item FROM search_items WHERE crawl_id = ? ORDER BY position", (cid,)
+        ).fetchall()
+        crawl = self.conn.execute(
+            "SELECT total_results, results_per_page FROM crawls WHERE crawl_id = ?", (cid,)
+        ).fetchone()
+        video_ids = [r["video_id"] for r in rows if r["video_id"]]
+        page_info = {"totalResults": crawl["total_results"], "resultsPerPage": crawl["results_per_page"]}
+        return video_ids, [json.loads(r["item"]) for r in rows], page_info
+
+    # ===== 키워드 ↔ 영상 =====
+    def _link(self, keyword, video_ids):
+        location = keyword.split()[0] if keyword else keyword
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO keyword_videos (keyword, location, location_group, video_id, first_seen) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(keyword, location, keyword_group(keyword), vid, _now()) for vid in video_ids if vid],
+        )
+
+    def keyword_videos(self, keyword=None):
+        """
+        키워드(지역)별 검색된 영상 id
+
+        Returns:
+            list: (keyword, location, location_group, video_id) 튜플
+        """
+        where, args = ("WHERE keyword = ?", (keyword,)) if keyword else ("", ())
+        rows = self.conn.execute(
+            f"SELECT keyword, location, location_group, video_id FROM keyword_videos {where} "
+            "ORDER BY location_group, keyword, first_seen, video_id",
+            args,
+        ).fetchall()
+        return [tuple(r) for r in rows]
+
+    # ===== 상세 정보 캐시 (키워드 공통) =====
+    def search_video_ids(self, cid):
+        """검색 결과 영상 id (검색 순서, 중복 제외)"""
+        rows = self.conn.execute(
+            "SELECT video_id FROM search_items WHERE crawl_id = ? AND video_id IS NOT NULL ORDER BY position",
+            (cid,),
+        ).fetchall()
+        return list(dict.fromkeys(r["video_id"] for r in rows))
+
+    def missing_details(self, video_ids, ttl_hours=None):
+        """
+        상세 정보를 새로 받아야 하는 영상 id (캐시에 없거나 ttl_hours보다 오래된 것)
+
+        Args:
+            video_ids (list): 영상 id (여러 키워드 결과를 합쳐도 됨, 중복 제거)
+            ttl_hours (float): 통계(조회수/좋아요/댓글) 유효 시간 (None이면 cf.DETAIL_TTL_HOURS)
+        """
+        ttl_hours = cf.DETAIL_TTL_HOURS if ttl_hours is None else ttl_hours
+        stale_before = (datetime.now() - timedelta(hours=ttl_hours)).isoformat(timespec="seconds")
+        video_ids = list(dict.fromkeys(video_ids))
+        fresh = set()
+        for i in range(0, len(video_ids), 500):  # SQLite 변수 개수 제한
+            chunk = video_ids[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT video_id FROM videos WHERE fetched_at >= ? AND video_id IN ({','.join('?' * len(chunk))})",
+                [stale_before] + chunk,
+            ).fetchall()
+            fresh.update(r["video_id"] for r in rows)
+        return [vid for vid in video_ids if vid not in fresh]
+
+    def pending_videos(self, cid, ttl_hours=None):
+        """검색 결과 중 상세 정보를 새로 받아야 하는 영상 id (검색 순서)"""
+        return self.missing_details(self.search_video_ids(cid), ttl_hours)
+
+    def record_details(self, video_ids, items):
+        """
+        상세 조회 배치 하나 기록
+
+        응답에 없는 id(삭제/비공개 영상)는 item 없이 기록해서 유효 시간 동안 다시 조회하지 않음
+        """
+        by_id = {item.get("id"): item for item in items}
+        now = _now()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO videos (video_id, item, fetched_at) VALUES (?, ?, ?)",
+                [
+                    (vid, json.dumps(by_id[vid], ensure_ascii=False) if vid in by_id else None, now)
+                    for vid in video_ids
+                ],
+            )
+
+    def cached_details(self, video_ids):
+        """캐시된 상세 응답 아이템 (video_ids 순서, 삭제/비공개 영상 제외)"""
+        video_ids = list(dict.fromkeys(video_ids))
+        found = {}
+        for i in range(0, len(video_ids), 500):
+            chunk = video_ids[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT video_id, item FROM videos WHERE item IS NOT NULL AND video_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            found.update((r["video_id"], r["item"]) for r in rows)
+        return [json.loads(found[vid]) for vid in video_ids if vid in found]
+
+    def detail_items(self, cid):
+        """검색 결과의 캐시된 상세 응답 아이템 (검색 순서)"""
+        return self.cached_details(self.search_video_ids(cid))
+
+    # ===== 완료 =====
+    def mark_saved(self, cid, search_file, cleaned_file):
+        """저장까지 끝난 키워드 표시 (다음 실행에서 건너뜀, cleaned_file은 정리 데이터 CSV 또는 저장소 경로)"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE crawls SET search_file = ?, cleaned_file = ?, saved_at = ?, updated_at = ? WHERE crawl_id = ?",
+                (search_file, cleaned_file, _now(), _now(), cid),
+            )
+
+    def saved_files(self, cid):
+        row = self.conn.execute("SELECT search_file, cleaned_file FROM crawls WHERE crawl_id = ?", (cid,)).fetchone()
+        return (row["search_file"], row["cleaned_file"]) if row else (None, None)
+
+    def reset(self, keyword=None):
+        """기록 삭제 (keyword=None이면 전체) → 다음 실행에서 처음부터 다시 수집"""
+        where, args = ("WHERE crawl_id IN (SELECT crawl_id FROM crawls WHERE keyword = ?)", (keyword,)) if keyword else ("", ())
+        with self.conn:
+            self.conn.execute(f"DELETE FROM search_items {where}", args)
+            self.conn.execute(f"DELETE FROM crawls {'WHERE keyword = ?' if keyword else ''}", args)
+
+    def summary(self):
+        """수집 상태별 키워드 수"""
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS total, SUM(saved_at IS NOT NULL) AS saved, "
+            "SUM(search_done = 0) AS searching FROM crawls"
+        ).fetchone()
+        return {"total": row["total"], "saved": row["saved"] or 0, "searching": row["searching"] or 0}
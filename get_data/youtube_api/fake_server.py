@@ -0,0 +1,274 @@
+"""
+로컬 가짜 YouTube API 서버 (search / videos)
+
+녹화된 응답(http_replay.py의 record 모드)을 색인해서 그대로 돌려주고, 녹화에 없는 요청은
+검색어에서 만든 고정된 가짜 데이터로 응답한다. 응답 지연, 오류 주입(429 / 403 rateLimitExceeded /
+500 / quotaExceeded), 쿼터 상한을 설정할 수 있어서 수집기의 처리량, 재시도, 동시성을 API 키 없이 측정할 수 있다.
+
+    python fake_server.py
+    YOUTUBE_API_BASE_URL=http://127.0.0.1:8080/youtube/v3 python async_collector.py
+
+/stats는 엔드포인트별 요청 수, 주입한 오류 수, 최대 동시 요청 수를 JSON으로 돌려준다 (/reset으로 초기화).
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+import config as cf
+from http_replay import Cassette
+
+# 검색 API가 한 쿼리에서 넘겨주는 최대 결과 수
+MAX_SEARCH_RESULTS = 500
+
+ERRORS = {
+    "429": (429, "rateLimitExceeded", "Too Many Requests"),
+    "rateLimitExceeded": (403, "rateLimitExceeded", "Rate limit exceeded"),
+    "500": (500, "backendError", "Backend Error"),
+    "quotaExceeded": (403, "quotaExceeded", "The request cannot be completed because you have exceeded your quota."),
+}
+
+
+def error_body(status, reason, message):
+    """YouTube API 오류 응답 형식"""
+    return {"error": {"code": status, "message": message, "errors": [{"reason": reason, "message": message}]}}
+
+
+def _hash(*parts):
+    return hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+def _time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class FakeYouTube:
+    """
+    가짜 API 상태 (녹화 색인 + 설정 + 요청 통계)
+
+    Args:
+        cassette_dir (str): 녹화 폴더 (None이면 녹화 없이 가짜 데이터만)
+        latency (float): 응답 지연 (초)
+        jitter (float): 지연에 더할 무작위 시간 최대값 (초)
+        error_rate (float): 오류를 돌려줄 요청 비율 (0~1)
+        errors (list): 주입할 오류 종류 (ERRORS의 키)
+        quota (int): 이 쿼터를 다 쓰면 quotaExceeded (None이면 무제한)
+        synthetic (bool): 녹화에 없는 요청에 가짜 데이터로 응답 (False면 404)
+        seed (int): 오류 주입 난수 시드
+    """
+
+    def __init__(self, cassette_dir=None, latency=None, jitter=None, error_rate=None, errors=None, quota=None,
+                 synthetic=True, seed=0):
+        self.latency = cf.FAKE_LATENCY if latency is None else latency
+        self.jitter = cf.FAKE_JITTER if jitter is None else jitter
+        self.error_rate = cf.FAKE_ERROR_RATE if error_rate is None else error_rate
+        self.errors = list(cf.FAKE_ERRORS if errors is None else errors)
+        self.quota = quota
+        self.synthetic = synthetic
+        self.random = random.Random(seed)
+
+        self.search_pages = {}  # (q, publishedAfter, publishedBefore, pageToken) → 응답 본문
+        self.videos = {}  # video_id → videos API 아이템
+        if cassette_dir is not None:
+            self.load(cassette_dir)
+        self.reset()
+
+    def load(self, cassette_dir):
+        """녹화 폴더 색인 (검색은 페이지 단위, 상세 정보는 영상 id 단위라 배치 구성이 달라도 응답 가능)"""
+        for record in Cassette(cassette_dir).records():
+            if record["status"] >= 400:
+                continue
+            body = json.loads(record["body"])
+            params = record["params"]
+            if record["url"].rstrip("/").endswith("/search"):
+                self.search_pages[self._search_key(params)] = body
+            elif record["url"].rstrip("/").endswith("/videos"):
+                for item in body.get("items", []):
+                    self.videos[item["id"]] = item
+        print(f"[가짜 서버] 녹화 검색 페이지 {len(self.search_pages)}개, 영상 {len(self.videos)}개")
+
+    @staticmethod
+    def _search_key(params):
+        return (params.get("q"), params.get("publishedAfter"), params.get("publishedBefore"),
+                params.get("pageToken") or "")
+
+    def reset(self):
+        self.stats = {
+            "requests": {"search": 0, "videos": 0},
+            "recorded": 0,
+            "synthetic": 0,
+            "errors": {kind: 0 for kind in ERRORS},
+            "quota_used": 0,
+            "in_flight": 0,
+            "max_in_flight": 0,
+        }
+
+    # ===== 오류 주입 =====
+    def inject_error(self, endpoint):
+        """
+        이번 요청에 돌려줄 오류 (없으면 None)
+
+        쿼터 상한을 넘으면 항상 quotaExceeded, 아니면 error_rate 비율로 errors 중 하나.
+        """
+        cost = cf.QUOTA_COST[endpoint]
+        if self.quota is not None and self.stats["quota_used"] + cost > self.quota:
+            kind = "quotaExceeded"
+        elif self.errors and self.random.random() < self.error_rate:
+            kind = self.random.choice(self.errors)
+        else:
+            self.stats["quota_used"] += cost
+            return None
+        self.stats["errors"][kind] += 1
+        status, reason, message = ERRORS[kind]
+        return web.json_response(error_body(status, reason, message), status=status)
+
+    # ===== 가짜 데이터 =====
+    def synthetic_search(self, params):
+        """검색어마다 고정된 영상 목록에서 기간 안의 영상을 offset 토큰으로 페이지 나눔"""
+        query = params.get("q", "")
+        start, end = _time(cf.publishedAfter), _time(cf.publishedBefore)
+        after = _time(params.get("publishedAfter") or cf.publishedAfter)
+        before = _time(params.get("publishedBefore") or cf.publishedBefore)
+
+        count = 50 + int(_hash(query)[:4], 16) % 1500
+        hits = []
+        for n in range(count):
+            h = _hash(query, n)
+            published = start + (end - start) * (int(h[:8], 16) / 0xFFFFFFFF)
+            if after <= published < before:
+                hits.append((h[:11], published))
+
+        offset = int(params.get("pageToken") or 0)
+        size = int(params.get("maxResults") or 5)
+        page = hits[:MAX_SEARCH_RESULTS][offset:offset + size]
+        body = {
+            "kind": "youtube#searchListResponse",
+            "regionCode": params.get("regionCode", "KR"),
+            "pageInfo": {"totalResults": len(hits), "resultsPerPage": size},
+            "items": [{
+                "kind": "youtube#searchResult",
+                "etag": _hash("etag", vid)[:27],
+                "id": {"kind": "youtube#video", "videoId": vid},
+                "snippet": {
+                    "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "channelId": "UC" + _hash("channel", vid)[:22],
+                    "title": f"{query.split()[0] if query else ''} 영상 {vid}",
+                    "description": "",
+                    "channelTitle": f"채널 {vid[:3]}",
+                    "publishTime": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                },
+            } for vid, published in page],
+        }
+        if offset + size < min(len(hits), MAX_SEARCH_RESULTS):
+            body["nextPageToken"] = str(offset + size)
+        return body
+
+    @staticmethod
+    def synthetic_video(video_id):
+        h = _hash("video", video_id)
+        views = int(h[:6], 16)
+        return {
+            "kind": "youtube#video",
+            "id": video_id,
+            "snippet": {
+                "publishedAt": (datetime(2023, 1, 1, tzinfo=timezone.utc)
+                                + timedelta(hours=int(h[6:10], 16) % 26000)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "title": f"영상 {video_id}",
+                "description": "",
+                "channelTitle": f"채널 {video_id[:3]}",
+                "categoryId": "22",
+                "tags": [],
+            },
+            "statistics": {
+                "viewCount": str(views),
+                "likeCount": str(views // 50),
+                "commentCount": str(views // 800),
+            },
+            "contentDetails": {"duration": f"PT{int(h[10:12], 16) % 20}M{int(h[12:14], 16) % 60}S",
+                               "licensedContent": False},
+        }
+
+    # ===== 핸들러 =====
+    async def _serve(self, endpoint, request, respond):
+        self.stats["requests"][endpoint] += 1
+        self.stats["in_flight"] += 1
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+        try:
+            await asyncio.sleep(self.latency + self.random.uniform(0, self.jitter))
+            error = self.inject_error(endpoint)
+            return error if error is not None else respond(dict(request.query))
+        finally:
+            self.stats["in_flight"] -= 1
+
+    def _search(self, params):
+        body = self.search_pages.get(self._search_key(params))
+        if body is not None:
+            self.stats["recorded"] += 1
+            return web.json_response(body)
+        if not self.synthetic:
+            return web.json_response(error_body(404, "notFound", "녹화되지 않은 검색 요청"), status=404)
+        self.stats["synthetic"] += 1
+        return web.json_response(self.synthetic_search(params))
+
+    def _videos(self, params):
+        items = []
+        for video_id in params.get("id", "").split(","):
+            if video_id in self.videos:
+                self.stats["recorded"] += 1
+                items.append(self.videos[video_id])
+            elif self.synthetic and video_id:
+                self.stats["synthetic"] += 1
+                items.append(self.synthetic_video(video_id))
+        return web.json_response({"kind": "youtube#videoListResponse", "items": items,
+                                  "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}})
+
+    async def search(self, request):
+        return await self._serve("search", request, self._search)
+
+    async def video_list(self, request):
+        return await self._serve("videos", request, self._videos)
+
+    async def stats_view(self, request):
+        return web.json_response(self.stats)
+
+    async def reset_view(self, request):
+        self.reset()
+        return web.json_response(self.stats)
+
+
+def make_app(fake=None):
+    """가짜 서버 aiohttp 앱 (경로는 실제 API와 같은 /youtube/v3/...)"""
+    fake = fake or FakeYouTube()
+    app = web.Application()
+    app["fake"] = fake
+    app.router.add_get("/youtube/v3/search", fake.search)
+    app.router.add_get("/youtube/v3/videos", fake.video_list)
+    app.router.add_get("/stats", fake.stats_view)
+    app.router.add_post("/reset", fake.reset_view)
+    return app
+
+
+async def start_server(fake=None, host="127.0.0.1", port=None):
+    """
+    테스트/벤치마크 코드 안에서 가짜 서버 실행
+
+    Returns:
+        web.AppRunner: 끝나면 await runner.cleanup()
+    """
+    runner = web.AppRunner(make_app(fake))
+    await runner.setup()
+    await web.TCPSite(runner, host, port or cf.FAKE_PORT).start()
+    return runner
+
+
+# 메인 실행
+if __name__ == "__main__":
+    cassette_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), cf.CASSETTE_DIR)
+    fake = FakeYouTube(cassette_dir if os.path.isdir(cassette_dir) else None, quota=cf.FAKE_QUOTA)
+    print(f"[가짜 서버] http://127.0.0.1:{cf.FAKE_PORT}/youtube/v3 "
+          f"(지연 {fake.latency}s, 오류 비율 {fake.error_rate:.0%}, 쿼터 {fake.quota or '무제한'})")
+    web.run_app(make_app(fake), host="127.0.0.1", port=cf.FAKE_PORT, print=None)
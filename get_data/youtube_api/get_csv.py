@@ -1,11 +1,15 @@
-import requests
-from dotenv import load_dotenv
+"""
+단일 키워드 → 행정동 CSV (district, id, title, publishedAt, 조회수/좋아요/댓글 수)
+
+검색/상세 조회는 get_csv_filtered.py와 같은 함수를 쓴다.
+여러 키워드를 한 번에, 필터와 저장소(video_store)까지 거쳐 수집하려면 collector 패키지 CLI:
+    python -m collector collect "코엑스 맛집" --district 삼성1동
+"""
 import os
 import csv
 from datetime import datetime
 
-load_dotenv()
-API_KEY = os.getenv("YOUTUBE_API")
+import get_csv_filtered
 
 # @@@@@@@ 검색 설정 @@@@@@@
 district = "삼성1동"
@@ -17,56 +21,11 @@ total_count = 100
 
 def search_youtube(query, publishedAfter, publishedBefore, total_count=100, max_results=50, region_code="KR"):
     """
-    YouTube 검색 결과를 조회수 순으로 가져오기
+    YouTube 검색 결과의 영상 id (정렬은 config.py의 order, 기본 조회수 순)
     """
-    base_url = "https://www.googleapis.com/youtube/v3/search"
-
-    video_ids = []
-    next_page_token = None
-    total_fetched = 0
-
-    print(f"검색 키워드: {query}")
-    print(f"기간: {publishedAfter} ~ {publishedBefore}")
-    print("-" * 50)
-
-    while total_fetched < total_count:
-        params = {
-            "key": API_KEY,
-            "part": "snippet",
-            "q": query,
-            "publishedAfter": publishedAfter,
-            "publishedBefore": publishedBefore,
-            "type": "video",
-            "maxResults": min(max_results, total_count - total_fetched),
-            "order": "viewCount",
-            "regionCode": region_code
-        }
-
-        if next_page_token:
-            params["pageToken"] = next_page_token
-
-        try:
-            response = requests.get(base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            items = data.get("items", [])
-            for item in items:
-                if "id" in item and "videoId" in item["id"]:
-                    video_ids.append(item["id"]["videoId"])
-
-            total_fetched += len(items)
-            print(f"[검색] 가져온 데이터: {len(items)}개 (총: {total_fetched}개)")
-
-            next_page_token = data.get("nextPageToken")
-
-            if not next_page_token or total_fetched >= total_count:
-                break
-
-        except requests.exceptions.RequestException as e:
-            print(f"API 요청 실패: {e}")
-            break
-
+    video_ids, *_ = get_csv_filtered.search_youtube(
+        query, publishedAfter, publishedBefore, total_count, max_results, region_code=region_code
+    )
     return video_ids
 
 
@@ -74,47 +33,21 @@ def get_video_details(video_ids, district):
     """
     YouTube 동영상 세부 정보를 가져와서 필요한 필드만 반환
     """
-    base_url = "https://www.googleapis.com/youtube/v3/videos"
-    all_items = []
-    batch_size = 50
-
     print("-" * 50)
-
-    for i in range(0, len(video_ids), batch_size):
-        batch_ids = video_ids[i:i+batch_size]
-
-        params = {
-            "key": API_KEY,
-            "part": "snippet,statistics",
-            "id": ",".join(batch_ids)
-        }
-
-        try:
-            response = requests.get(base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            items = data.get("items", [])
-
-            for item in items:
-                statistics = item.get("statistics", {})
-                cleaned_item = {
-                    "district": district,
-                    "id": item.get("id"),
-                    "title": item.get("snippet", {}).get("title"),
-                    "publishedAt": item.get("snippet", {}).get("publishedAt"),
-                    "viewCount": statistics.get("viewCount"),
-                    "likeCount": statistics.get("likeCount"),
-                    "commentCount": statistics.get("commentCount")
-                }
-                all_items.append(cleaned_item)
-
-            print(f"[상세] 가져온 데이터: {len(items)}개 (총: {len(all_items)}개)")
-
-        except requests.exceptions.RequestException as e:
-            print(f"API 요청 실패: {e}")
-            break
-
+    all_items = []
+    for item in get_csv_filtered.fetch_video_details(video_ids):
+        snippet = item.get("snippet", {})
+        statistics = item.get("statistics", {})
+        all_items.append({
+            "district": district,
+            "id": item.get("id"),
+            "title": snippet.get("title"),
+            "publishedAt": snippet.get("publishedAt"),
+            "viewCount": statistics.get("viewCount"),
+            "likeCount": statistics.get("likeCount"),
+            "commentCount": statistics.get("commentCount")
+        })
+    print(f"[상세] 가져온 데이터: 총 {len(all_items)}개")
     return all_items
 
 
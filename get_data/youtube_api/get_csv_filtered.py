@@ -1,26 +1,35 @@
+import asyncio
 import requests
-from dotenv import load_dotenv
 import os
 import json
 import csv
 from datetime import datetime
 import config as cf
+from content_filter import HIT_KEYS, STAT_KEYS, default_filter
+from crawl_journal import CrawlJournal
+from http_replay import youtube_api_key, youtube_base_url
+from quota_scheduler import (
+    GroupBudgetExhausted, ParkedWork, QuotaBudget, QuotaExhausted, api_get, keyword_group, order_by_group,
+)
+from time_slicer import is_saturated
+from video_store import VideoStore
 
-load_dotenv()
-API_KEY = os.getenv("YOUTUBE_API")
+# API 키와 주소(YOUTUBE_API_BASE_URL)는 요청할 때 읽음 (http_replay.youtube_api_key / youtube_base_url)
 
 # @@@@@@@ config.py에서 설정 @@@@@@@
 
 # 단일 키워드 설정 
 # keyword = "가산 카페"
 
-print(f"\n{'='*50}")
-print(f"📋 생성된 키워드: {len(cf.KEYWORDS)}개") 
-for i, kw in enumerate(cf.KEYWORDS, 1): 
-    print(f"  {i}. {kw}") 
-print(f"{'='*50}\n")
+def print_keywords(keywords):
+    """생성된 키워드 목록 출력"""
+    print(f"\n{'='*50}")
+    print(f"📋 생성된 키워드: {len(keywords)}개") 
+    for i, kw in enumerate(keywords, 1): 
+        print(f"  {i}. {kw}") 
+    print(f"{'='*50}\n")
 
-def search_youtube(query, publishedAfter, publishedBefore, total_count=100, max_results=50, order="relevance", region_code="KR"):
+def search_youtube(query, publishedAfter, publishedBefore, total_count=100, max_results=50, order="relevance", region_code="KR", budget=None, journal=None, stop_if_saturated=False):
     """
     YouTube 검색 결과를 가져오기
 
@@ -32,12 +41,17 @@ def search_youtube(query, publishedAfter, publishedBefore, total_count=100, max_
         max_results (int): 한 번에 가져올 결과 수 (0-50)
         order (str): 정렬 방식 (date, rating, relevance, title, videoCount, viewCount)
         region_code (str): 지역 코드
+        budget (QuotaBudget): 쿼터 예산 (요청마다 차감, 소진 시 QuotaExhausted)
+        journal (CrawlJournal): 수집 기록 (주면 받은 페이지를 기록하고 마지막 페이지 토큰부터 이어서 검색)
+        stop_if_saturated (bool): 첫 페이지의 totalResults가 포화(time_slicer.is_saturated)면 더 넘기지 않음
 
     Returns:
         tuple: (video_ids 리스트, all_items 리스트, 검색 파라미터 dict, page_info dict)
     """
 
-    base_url = "https://www.googleapis.com/youtube/v3/search"
+    base_url = f"{youtube_base_url()}/search"
+    publishedAfter = publishedAfter or cf.publishedAfter
+    publishedBefore = publishedBefore or cf.publishedBefore
 
     video_ids = []
     all_items = []
@@ -46,27 +60,35 @@ def search_youtube(query, publishedAfter, publishedBefore, total_count=100, max_
     total_results_from_api = 0
     results_per_page_from_api = 0
 
-    search_params = {
-        "query": query,
-        "publishedAfter": cf.publishedAfter,
-        "publishedBefore": cf.publishedBefore,
-        "order": cf.order,
-        "regionCode": region_code,
-        "requestedCount": total_count,
-        "maxResultsPerPage": max_results
-    }
+    search_params = build_search_params(query, total_count, max_results, region_code,
+                                        publishedAfter, publishedBefore, time_sliced=False)
 
     print(f"검색 키워드: {query}")
-    print(f"기간: {cf.publishedAfter} ~ {cf.publishedBefore}")
+    print(f"기간: {publishedAfter} ~ {publishedBefore}")
     print("-" * 50)
 
+    # 수집 기록이 있으면 이어서 검색 (이미 받은 페이지는 다시 요청하지 않음)
+    crawl = None
+    if journal is not None:
+        crawl = journal.start(query, search_params)
+        total_fetched = crawl["fetched"]
+        next_page_token = crawl["next_page_token"]
+        if crawl["search_done"] or (total_fetched and not next_page_token) or (
+            stop_if_saturated and total_fetched and is_saturated(crawl["total_results"])
+        ):
+            video_ids, all_items, page_info = journal.search_result(crawl["crawl_id"])
+            print(f"[검색] 기록된 결과 사용: {len(all_items)}개")
+            return video_ids, all_items, search_params, page_info
+        if total_fetched:
+            print(f"[검색] 기록된 {total_fetched}개 이후부터 이어서 검색")
+
     while total_fetched < total_count:
         params = {
-            "key": API_KEY,
+            "key": youtube_api_key(),
             "part": "snippet",
             "q": query,
-            "publishedAfter": cf.publishedAfter,
-            "publishedBefore": cf.publishedBefore,
+            "publishedAfter": publishedAfter,
+            "publishedBefore": publishedBefore,
             "type": "video",
             "maxResults": min(max_results, total_count - total_fetched),
             "order": cf.order,
@@ -77,9 +99,8 @@ def search_youtube(query, publishedAfter, publishedBefore, total_count=100, max_
             params["pageToken"] = next_page_token
 
         try:
-            response = requests.get(base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            # 403(속도 제한)/429/5xx는 지터 백오프 후 재시도
+            data = api_get(base_url, params, "search", budget, keyword_group(query))
 
             # 첫 번째 요청에서 pageInfo 저장
             if total_fetched == 0:
@@ -88,38 +109,40 @@ def search_youtube(query, publishedAfter, publishedBefore, total_count=100, max_
                 results_per_page_from_api = page_info.get("resultsPerPage", 0)
 
             items = data.get("items", [])
+            cleaned = [clean_search_item(item) for item in items]
             for item in items:
                 # video ID 추출
                 if "id" in item and "videoId" in item["id"]:
                     video_ids.append(item["id"]["videoId"])
 
-                # 원본 데이터 저장 (keyword_search.py 형식)
-                filtered_item = {
-                    "etag": item.get("etag"),
-                    "id": item.get("id"),
-                    "snippet": {
-                        "publishedAt": item["snippet"].get("publishedAt"),
-                        "channelId": item["snippet"].get("channelId"),
-                        "title": item["snippet"].get("title"),
-                        "description": item["snippet"].get("description"),
-                        "channelTitle": item["snippet"].get("channelTitle"),
-                        "publishTime": item["snippet"].get("publishTime")
-                    }
-                }
-                all_items.append(filtered_item)
+            # 원본 데이터 저장 (keyword_search.py 형식)
+            all_items.extend(cleaned)
 
             total_fetched += len(items)
             print(f"[검색] 가져온 데이터: {len(items)}개 (총: {total_fetched}개)")
 
             next_page_token = data.get("nextPageToken")
+            done = not next_page_token or not items or total_fetched >= total_count
+            if crawl is not None:
+                journal.record_page(crawl["crawl_id"], data, cleaned, done)
 
-            if not next_page_token or total_fetched >= total_count:
+            if done:
+                break
+
+            # 포화 구간은 더 넘기지 않고 호출한 쪽에서 구간을 나눠서 다시 검색
+            if stop_if_saturated and is_saturated(total_results_from_api):
+                print(f"[검색] 결과 {total_results_from_api:,}개 → 구간 분할")
                 break
 
         except requests.exceptions.RequestException as e:
             print(f"API 요청 실패: {e}")
             break
 
+    if crawl is not None:
+        # 이전 실행에서 받은 페이지까지 합친 전체 결과
+        video_ids, all_items, page_info = journal.search_result(crawl["crawl_id"])
+        return video_ids, all_items, search_params, page_info
+
     page_info = {
         "totalResults": total_results_from_api,
         "resultsPerPage": results_per_page_from_api
@@ -127,27 +150,88 @@ def search_youtube(query, publishedAfter, publishedBefore, total_count=100, max_
 
     return video_ids, all_items, search_params, page_info
 
+def build_search_params(query, total_count=100, max_results=50, region_code="KR",
+                        published_after=None, published_before=None, time_sliced=None):
+    """
+    검색 조건 기록용 dict (JSON의 searchParams, 수집 기록의 키로 사용)
+
+    time_sliced(None이면 cf.TIME_SLICING)가 True면 시간 분할 검색 결과라는 표시를 남김
+    """
+    params = {
+        "query": query,
+        "publishedAfter": published_after or cf.publishedAfter,
+        "publishedBefore": published_before or cf.publishedBefore,
+        "order": cf.order,
+        "regionCode": region_code,
+        "requestedCount": total_count,
+        "maxResultsPerPage": max_results
+    }
+    if cf.TIME_SLICING if time_sliced is None else time_sliced:
+        params["timeSliced"] = True
+    return params
+
+
+def search_youtube_sliced(query, total_count=100, max_results=50, region_code="KR", budget=None, journal=None):
+    """
+    시간 분할 검색: 결과가 포화된 기간을 반씩 나눠서 다시 검색하고 영상 id 기준으로 합침
+
+    search API는 한 쿼리에서 약 500개까지만 넘겨주기 때문에, 결과가 많은 키워드(예: 성수 카페)는
+    전체 기간을 한 번에 검색하면 일부만 수집된다. 구간마다 첫 페이지의 totalResults를 보고
+    포화된 구간만 나누고, 결과가 적은 구간은 그대로 끝까지 넘긴다.
+
+    구간 검색은 async_collector.search_sliced에 맡겨서 나눈 두 구간을 동시에 검색한다
+    (동시 요청 수는 cf.MAX_CONCURRENCY, 페이지 크기는 50 고정이라 max_results는 기록용).
+    구간마다 수집 기록(journal)이 따로 남아서, 중간에 멈춰도 끝난 구간은 다시 요청하지 않는다.
+
+    Returns:
+        tuple: search_youtube와 같은 형식 (video_ids, all_items, 검색 파라미터 dict, page_info dict)
+
+    Raises:
+        QuotaExhausted: 쿼터 소진 (호출한 쪽에서 키워드를 미룸)
+    """
+    from async_collector import ApiError, search_sliced_standalone  # async_collector가 이 모듈을 import하므로 여기서
+
+    search_params = build_search_params(query, total_count, max_results, region_code, time_sliced=True)
+    crawl = journal.start(query, search_params) if journal is not None else None
+    if crawl is not None and crawl["search_done"]:
+        video_ids, all_items, page_info = journal.search_result(crawl["crawl_id"])
+        print(f"[시간 분할] 기록된 결과 사용: {len(all_items)}개")
+        return video_ids, all_items, search_params, page_info
+
+    try:
+        merged = asyncio.run(search_sliced_standalone(query, total_count, region_code, budget, journal))
+    except ApiError as e:
+        # 끝난 구간은 수집 기록에 남아 있으므로 다음 실행에서 이어서 검색
+        print(f"API 요청 실패: {e}")
+        return [], [], search_params, {"totalResults": 0, "resultsPerPage": 0}
+
+    video_ids, all_items = merged.result()
+    print(f"[시간 분할] 구간 {merged.slices}개 (분할 {merged.splits}회) → 중복 제외 {len(all_items)}개")
+    page_info = {"totalResults": len(all_items), "resultsPerPage": 50}
+    if crawl is not None:
+        # 합친 결과를 키워드 기록으로 남겨서 상세 조회/저장은 일반 검색과 같은 방식으로 처리
+        journal.record_page(crawl["crawl_id"], {"pageInfo": page_info}, all_items, done=True)
+    return video_ids, all_items, search_params, page_info
+
+def clean_search_item(item):
+    """search API 응답 아이템에서 저장할 필드만 남김 (keyword_search.py 형식)"""
+    return {
+        "etag": item.get("etag"),
+        "id": item.get("id"),
+        "snippet": {
+            "publishedAt": item["snippet"].get("publishedAt"),
+            "channelId": item["snippet"].get("channelId"),
+            "title": item["snippet"].get("title"),
+            "description": item["snippet"].get("description"),
+            "channelTitle": item["snippet"].get("channelTitle"),
+            "publishTime": item["snippet"].get("publishTime")
+        }
+    }
+
 def is_valid_content(title, description):
     """제목과 설명에 금지어가 포함되어 있는지 확인"""
-    # 공백을 제거하고 소문자로 변환하여 검색 정확도를 높입니다.
-    text = (str(title) + " " + str(description)).replace(" ", "").lower()
-    for word in cf.STOPWORDS:
-        if word in text:
-            return False
-    return True
-
-def get_duration_seconds(duration_str):
-    """ISO 8601 duration을 초로 변환 (예: PT2M30S → 150초)""" # <----- duration 변환 함수 추가
-    import re
-    if not duration_str:
-        return 0
-    match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', duration_str)
-    if match:
-        hours = int(match.group(1) or 0)
-        minutes = int(match.group(2) or 0)
-        seconds = int(match.group(3) or 0)
-        return hours * 3600 + minutes * 60 + seconds
-    return 0
+    # 공백을 제거하고 대소문자 구분 없이 비교 (금지어는 content_filter에서 정규식 하나로 컴파일)
+    return not default_filter().has_stopword(title, description)
 
 
 '''
@@ -208,17 +292,83 @@ def get_video_details(video_ids):
     return all_items
 '''
 
-def get_video_details(video_ids):
+def fetch_video_details(video_ids, budget=None, group=None, journal=None, ttl_hours=None):
+    """
+    videos API 원본 응답을 50개씩 조회
+
+    journal을 주면 캐시에 없거나 통계가 오래된 영상만 조회해서 캐시에 기록한다.
+    여러 키워드의 id를 한 번에 넘기면 중복 없이 꽉 찬 50개 배치로 조회된다.
+
+    Args:
+        video_ids (list): 비디오 ID 리스트 (중복 허용)
+        budget (QuotaBudget): 쿼터 예산
+        group (str): 쿼터를 차감할 지역 그룹 (None이면 공용)
+        journal (CrawlJournal): 상세 정보 캐시
+        ttl_hours (float): 캐시 유효 시간 (None이면 cf.DETAIL_TTL_HOURS)
+
+    Returns:
+        list: videos API 응답 아이템 (journal이 있으면 캐시에서 video_ids 순서로)
+    """
+
+    base_url = f"{youtube_base_url()}/videos"
+    raw_items = []
+    batch_size = 50
+
+    video_ids = list(dict.fromkeys(video_ids))
+    targets = video_ids
+    if journal is not None:
+        targets = journal.missing_details(video_ids, ttl_hours)
+        print(f"[상세] 고유 영상 {len(video_ids)}개 중 캐시 {len(video_ids) - len(targets)}개, 조회 {len(targets)}개")
+
+    for i in range(0, len(targets), batch_size):
+        batch_ids = targets[i:i+batch_size]
+
+        params = {
+            "key": youtube_api_key(),
+            "part": "snippet,statistics,contentDetails",  
+            "id": ",".join(batch_ids)
+        }
+
+        try:
+            data = api_get(base_url, params, "videos", budget, group)
+            items = data.get("items", [])
+            raw_items.extend(items)
+            if journal is not None:
+                journal.record_details(batch_ids, items)
+
+            print(f"[상세] 배치 {i//batch_size + 1}: {len(items)}개")
+
+        except requests.exceptions.RequestException as e:
+            print(f"API 요청 실패: {e}")
+            break
+
+    if journal is not None:
+        return journal.cached_details(video_ids)
+    return raw_items
+
+def get_video_details(video_ids, budget=None, group=None, journal=None):
     """
     YouTube 동영상 세부 정보를 가져와서 필요한 필드만 반환
     + 개선된 다단계 필터링 적용 # <----- 개선된 필터링
+
+    journal을 주면 캐시에 없는 영상만 조회하고, 필터는 캐시된 응답 전체에 적용한다.
     """
 
-    base_url = "https://www.googleapis.com/youtube/v3/videos"
-    all_items = []
-    batch_size = 50
-    
     # 필터링 통계 # <----- 필터링 통계 추적
+    stats = new_filter_stats()
+
+    print("-" * 50)
+
+    all_items = filter_video_items(fetch_video_details(video_ids, budget, group, journal), stats)
+    
+    # 최종 필터링 통계 # <----- 최종 통계 출력
+    print_filter_stats(stats)
+
+    return all_items
+
+
+def new_filter_stats():
+    """필터 단계별 제외 건수 (filtered_*: 먼저 걸린 규칙으로 제외한 수, hit_*: 우선순위와 상관없이 규칙에 걸린 수)"""
     stats = {
         'total': 0,
         'filtered_channel': 0,
@@ -228,112 +378,85 @@ def get_video_details(video_ids):
         'filtered_ads': 0,
         'passed': 0
     }
+    stats.update(dict.fromkeys(HIT_KEYS.values(), 0))
+    return stats
 
-    print("-" * 50)
 
-    for i in range(0, len(video_ids), batch_size):
-        batch_ids = video_ids[i:i+batch_size]
+def filter_video_items(items, stats, content_filter=None):
+    """
+    videos API 응답 아이템에 다단계 필터를 적용하고 CSV용 필드만 남김
 
-        params = {
-            "key": API_KEY,
-            "part": "snippet,statistics,contentDetails",  
-            "id": ",".join(batch_ids)
-        }
+    Args:
+        items (list): videos API 응답의 items
+        stats (dict): 필터 단계별 건수 (new_filter_stats, 제자리 갱신)
+        content_filter (ContentFilter): 사용할 필터 (None이면 config.py 설정)
 
-        try:
-            response = requests.get(base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            items = data.get("items", [])
-            
-            stats['total'] += len(items)
+    Returns:
+        list: 정리된 비디오 데이터 리스트
+    """
+    all_items = []
+    stats['total'] += len(items)
 
-            for item in items:
-                snippet = item.get("snippet", {})
-                title = snippet.get("title", "")
-                description = snippet.get("description", "")
-                channel_title = snippet.get("channelTitle", "")
-                
-                # 1️⃣ 채널 블랙리스트 필터 # <----- 채널 필터
-                if channel_title in cf.CHANNEL_BLACKLIST:
-                    stats['filtered_channel'] += 1
-                    continue
-                
-                # 2️⃣ Stopwords 필터 (기존) # <----- 금지어 필터
-                if not is_valid_content(title, description):
-                    stats['filtered_stopwords'] += 1
-                    continue
-                
-                # 3️⃣ 제목에 필수 키워드 체크 # <----- 제목 키워드 필터
-                # if not any(kw in title for kw in cf.REQUIRED_IN_TITLE):
-                #     stats['filtered_title'] += 1
-                #     continue
-                
-                # 4️⃣ 영상 길이 확인 # <----- 길이 필터
-                content_details = item.get("contentDetails", {})
-                duration = content_details.get("duration", "")
-                duration_seconds = get_duration_seconds(duration)
-                
-                if cf.FILTER_SHORTS and duration_seconds < cf.MIN_DURATION:
-                    stats['filtered_duration'] += 1
-                    continue
-                
-                # 5️⃣ 협찬 필터 # <----- 협찬 필터
-                if cf.FILTER_ADS:
-                    text = (title + " " + description).lower()
-                    if any(kw.lower() in text for kw in cf.AD_KEYWORDS):
-                        stats['filtered_ads'] += 1
-                        continue
-
-                # 통과! # <----- 통과한 영상만 저장
-                stats['passed'] += 1
-                statistics = item.get("statistics", {})
+    # 1️⃣ 채널 → 2️⃣ 금지어 → 3️⃣ 제목 키워드 → 4️⃣ 영상 길이 → 5️⃣ 협찬 순으로 먼저 걸린 규칙에 집계
+    reasons, hit_counts = (content_filter or default_filter()).classify(items)
+    for rule, count in hit_counts.items():
+        stats[HIT_KEYS[rule]] += count
 
-                cleaned_item = {
-                    "id": item.get("id"),
+    for item, reason in zip(items, reasons):
+        if reason is not None:
+            stats[STAT_KEYS[reason]] += 1
+            continue
 
-                    # --- snippet ---
-                    "publishedAt": snippet.get("publishedAt"),
-                    "title": snippet.get("title"),
-                    "description": snippet.get("description"),
-                    "channelTitle": snippet.get("channelTitle"),
-                    "categoryId": snippet.get("categoryId"),  
-                    "tags": ",".join(snippet.get("tags", [])),  
+        # 통과! # <----- 통과한 영상만 저장
+        stats['passed'] += 1
+        all_items.append(clean_video_item(item))
 
-                    # --- statistics ---
-                    "viewCount": statistics.get("viewCount"),
-                    "likeCount": statistics.get("likeCount"),
-                    "commentCount": statistics.get("commentCount"),
+    return all_items
 
-                    # --- contentDetails ---
-                    "duration": content_details.get("duration"),  
-                    "licensedContent": content_details.get("licensedContent")  
-                }
 
-                all_items.append(cleaned_item)
+def clean_video_item(item):
+    """videos API 응답 아이템 → CSV용 필드"""
+    snippet = item.get("snippet", {})
+    content_details = item.get("contentDetails", {})
+    statistics = item.get("statistics", {})
 
-            # 배치별 통계 출력 # <----- 상세 통계 출력
-            print(f"[상세] 배치 {i//batch_size + 1}: {len(items)}개 중 {stats['passed']-len(all_items)+len(items)}개 유지")
+    return {
+        "id": item.get("id"),
 
-        except requests.exceptions.RequestException as e:
-            print(f"API 요청 실패: {e}")
-            break
-    
-    # 최종 필터링 통계 # <----- 최종 통계 출력
+        # --- snippet ---
+        "publishedAt": snippet.get("publishedAt"),
+        "title": snippet.get("title"),
+        "description": snippet.get("description"),
+        "channelTitle": snippet.get("channelTitle"),
+        "categoryId": snippet.get("categoryId"),  
+        "tags": ",".join(snippet.get("tags", [])),  
+
+        # --- statistics ---
+        "viewCount": statistics.get("viewCount"),
+        "likeCount": statistics.get("likeCount"),
+        "commentCount": statistics.get("commentCount"),
+
+        # --- contentDetails ---
+        "duration": content_details.get("duration"),  
+        "licensedContent": content_details.get("licensedContent")  
+    }
+
+
+def print_filter_stats(stats):
+    """최종 필터링 통계 출력"""
     print("\n" + "="*70)
     print("📊 필터링 통계")
     print("="*70)
     print(f"  • 총 영상: {stats['total']}개")
-    print(f"  • 채널 제외: {stats['filtered_channel']}개")
-    print(f"  • 금지어 제외: {stats['filtered_stopwords']}개")
-    print(f"  • 제목 불일치: {stats['filtered_title']}개")
-    print(f"  • 길이 부족: {stats['filtered_duration']}개")
-    print(f"  • 협찬 제외: {stats['filtered_ads']}개")
-    print(f"  ✅ 최종 통과: {stats['passed']}개 ({stats['passed']/stats['total']*100:.1f}%)")
+    # 제외 수는 먼저 걸린 규칙 기준, 괄호 안은 규칙에 걸린 전체 영상 수 (여러 규칙에 겹쳐 걸린 영상 포함)
+    print(f"  • 채널 제외: {stats['filtered_channel']}개 (적중 {stats['hit_channel']}개)")
+    print(f"  • 금지어 제외: {stats['filtered_stopwords']}개 (적중 {stats['hit_stopwords']}개)")
+    print(f"  • 제목 불일치: {stats['filtered_title']}개 (적중 {stats['hit_title']}개)")
+    print(f"  • 길이 부족: {stats['filtered_duration']}개 (적중 {stats['hit_duration']}개)")
+    print(f"  • 협찬 제외: {stats['filtered_ads']}개 (적중 {stats['hit_ads']}개)")
+    print(f"  ✅ 최종 통과: {stats['passed']}개 ({stats['passed']/max(stats['total'], 1)*100:.1f}%)")
     print("="*70 + "\n")
 
-    return all_items
-
 
 def save_search_result(search_items, search_params, page_info, folder_path, region_code="KR"):
     """
@@ -414,66 +537,172 @@ def save_cleaned_csv(cleaned_items, search_filename, folder_path):
     return filename
 
 
+def keyword_folder(keyword, data_dir):
+    """키워드별 저장 폴더 (첫 번째 단어만 폴더명으로 사용, 없으면 생성)"""
+    # 폴더명에서 특수문자 제거 
+    safe_keyword = keyword.split()[0] if ' ' in keyword else keyword # 첫 번째 단어만 폴더명으로 사용
+    folder_name = os.path.join(data_dir, safe_keyword.replace(" ", "").replace("|", ""))
+    if not os.path.exists(folder_name):
+        os.makedirs(folder_name)
+        print(f"폴더 생성: {folder_name}/")
+    return folder_name
+
+
 # 메인 실행
 if __name__ == "__main__":
     # from dateutil.relativedelta import relativedelta  # 구간 분할 제거로 불필요
 
+    # 지난 실행에서 쿼터 부족으로 미룬 키워드를 먼저 처리
+    parked = ParkedWork()
+    keywords = order_by_group(dict.fromkeys(parked.take_ready() + cf.KEYWORDS))
+    print_keywords(keywords)
+
+    # 수집 기록: 저장까지 끝난 키워드는 건너뛰고, 중간에 멈춘 키워드는 이어서 수집
+    journal = CrawlJournal()
+    crawl_ids = {kw: journal.start(kw, build_search_params(kw, cf.total_count))["crawl_id"] for kw in keywords}
+    done_keywords = [kw for kw in keywords if journal.state(crawl_ids[kw])["saved"]]
+    if done_keywords:
+        print(f"⏭️ 이미 수집 완료된 키워드 {len(done_keywords)}개 건너뜀 (다시 수집하려면 CrawlJournal().reset())")
+        keywords = [kw for kw in keywords if kw not in done_keywords]
+
+    # 하루 쿼터를 지역 그룹에 돌아가며 키워드 단위로 배분 (search 100 / videos 1 단위)
+    budget = QuotaBudget()
+    group_counts = {}
+    for kw in keywords:
+        group_counts[keyword_group(kw)] = group_counts.get(keyword_group(kw), 0) + 1
+    funded = budget.plan(group_counts, budget.keyword_cost(cf.total_count))
+    print(f"🔋 남은 쿼터: {budget.remaining:,} / {budget.daily_limit:,} (그룹 {len(group_counts)}개)")
+
+    # 예산을 못 받은 키워드는 쿼터를 쓰기 전에 바로 미룸
+    planned = []
+    for kw in keywords:
+        group = keyword_group(kw)
+        if funded[group] > 0:
+            funded[group] -= 1
+            planned.append(kw)
+        else:
+            parked.park(kw, group, "쿼터 부족으로 이번 실행에서 제외")
+    if len(planned) < len(keywords):
+        print(f"⏸️ 쿼터 부족: {len(keywords) - len(planned)}개 키워드를 다음 초기화 이후로 미룸")
+    keywords = planned
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
     total_videos = 0
+    searched = {}  # 검색이 끝난 키워드 → (video_ids, search_items, search_params, page_info)
     
-    # 전체 키워드 순회 
-    for keyword_idx, keyword in enumerate(cf.KEYWORDS, 1): 
+    # 1단계: 키워드별 검색 (기록된 페이지 토큰부터 이어서)
+    for keyword_idx, keyword in enumerate(keywords, 1): 
         print(f"\n{'#'*70}")
-        print(f"키워드 [{keyword_idx}/{len(cf.KEYWORDS)}]: {keyword}") 
+        print(f"키워드 [{keyword_idx}/{len(keywords)}]: {keyword}") 
         print(f"{'#'*70}")
 
-        # data/키워드명 폴더 생성 (스크립트 파일 위치 기준)
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        # 폴더명에서 특수문자 제거 
-        safe_keyword = keyword.split()[0] if ' ' in keyword else keyword # 첫 번째 단어만 폴더명으로 사용
-        folder_name = os.path.join(script_dir, "data", safe_keyword.replace(" ", "").replace("|", ""))
-        if not os.path.exists(folder_name):
-            os.makedirs(folder_name)
-            print(f"폴더 생성: {folder_name}/")
+        group = keyword_group(keyword)
 
-        # 구간 분할 제거: 전체 기간을 한 번에 검색 
+        # 기본은 전체 기간을 한 번에 검색 (TIME_SLICING이면 포화 구간만 나눠서 검색)
         print(f"\n{'='*50}")
-        print(f"전체 기간 검색: {cf.publishedAfter} ~ {cf.publishedBefore}") 
+        print(f"{'시간 분할' if cf.TIME_SLICING else '전체 기간'} 검색: {cf.publishedAfter} ~ {cf.publishedBefore}") 
         print(f"{'='*50}")
 
-        # 1. YouTube 검색 (구간 분할 없이 한 번에 실행) <-----
-        video_ids, search_items, search_params, page_info = search_youtube(
-            query=keyword,
-            publishedAfter=cf.publishedAfter,  # <----- 전체 기간 시작
-            publishedBefore=cf.publishedBefore,  # <----- 전체 기간 종료
-            total_count=cf.total_count,
-            max_results=50,
-            order=cf.order,
-            region_code="KR"
-        )
+        try:
+            if cf.TIME_SLICING:
+                # 1. YouTube 검색 (결과가 많은 기간은 반씩 나눠서 검색)
+                video_ids, search_items, search_params, page_info = search_youtube_sliced(
+                    keyword, total_count=cf.total_count, budget=budget, journal=journal
+                )
+            else:
+                # 1. YouTube 검색 (구간 분할 없이 한 번에 실행) <-----
+                video_ids, search_items, search_params, page_info = search_youtube(
+                    query=keyword,
+                    publishedAfter=cf.publishedAfter,  # <----- 전체 기간 시작
+                    publishedBefore=cf.publishedBefore,  # <----- 전체 기간 종료
+                    total_count=cf.total_count,
+                    max_results=50,
+                    order=cf.order,
+                    region_code="KR",
+                    budget=budget,
+                    journal=journal
+                )
+
+        except QuotaExhausted as e:
+            # 쿼터가 모자라면 키워드를 미뤘다가 다음 초기화 이후 기록된 위치부터 이어서 수집
+            parked.park(keyword, group, str(e))
+            print(f"⏸️ 쿼터 부족으로 미룸: {e}")
+            if isinstance(e, GroupBudgetExhausted):
+                continue  # <----- 다른 그룹은 계속 진행
+            for rest in keywords[keyword_idx:]:
+                parked.park(rest, keyword_group(rest), str(e))
+            print(f"⏸️ 남은 키워드 {len(keywords) - keyword_idx}개도 다음 초기화 이후로 미룸")
+            break
+
+        finally:
+            # 그룹의 마지막 키워드면 남은 배분량을 다른 그룹에 넘김
+            if all(keyword_group(kw) != group for kw in keywords[keyword_idx:]):
+                budget.finish(group)
 
         if not video_ids:
             print(f"❌ 검색 결과가 없습니다.") # <-----
             continue  # <----- 다음 키워드로 넘어감
 
-        # 2. 검색 결과 저장 (JSON)
-        search_filename = save_search_result(search_items, search_params, page_info, folder_name)
-
-        # 3. 비디오 상세 정보 가져오기
-        cleaned_items = get_video_details(video_ids)
-
-        # 4. 정리된 데이터 저장 (CSV)
-        cleaned_filename = save_cleaned_csv(cleaned_items, search_filename, folder_name)
+        # 검색이 중간에 실패했으면 저장하지 않고 다음 실행에서 이어서 수집
+        if not journal.state(crawl_ids[keyword])["search_done"]:
+            print(f"⚠️ 검색이 끝나지 않아 저장을 미룹니다. 다음 실행에서 이어서 수집합니다.")
+            continue
+
+        searched[keyword] = (video_ids, search_items, search_params, page_info)
+
+    # 2단계: 전체 키워드의 고유 영상 id 중 캐시에 없거나 오래된 것만 50개씩 상세 조회
+    # (홍대/서교동, 성수/성수동처럼 겹치는 키워드의 영상을 한 번만 조회)
+    print(f"\n{'='*50}")
+    print(f"상세 정보 조회: 검색 완료 키워드 {len(searched)}개")
+    print(f"{'='*50}")
+    quota_error = None
+    try:
+        fetch_video_details([vid for ids, *_ in searched.values() for vid in ids], budget, journal=journal)
+    except QuotaExhausted as e:
+        quota_error = e
+        print(f"⏸️ 쿼터 부족으로 상세 조회 중단: {e}")
+
+    # 3단계: 키워드별 필터 + 저장소에 추가 (캐시된 상세 정보 사용)
+    store = VideoStore()
+    saved = []  # (keyword, 검색 결과 JSON, 정리 데이터 CSV) → 저장소에 쓴 뒤 수집 기록에 저장 완료 표시
+    for keyword_idx, (keyword, (video_ids, search_items, search_params, page_info)) in enumerate(searched.items(), 1):
+        if journal.pending_videos(crawl_ids[keyword]):
+            if quota_error is not None:
+                parked.park(keyword, keyword_group(keyword), str(quota_error))
+                print(f"⏸️ [{keyword}] 상세 정보가 남아 다음 초기화 이후로 미룸")
+            else:
+                print(f"⚠️ [{keyword}] 상세 조회가 끝나지 않아 저장을 미룹니다. 다음 실행에서 이어서 수집합니다.")
+            continue
+
+        # 2. 비디오 상세 정보 (캐시) + 필터
+        cleaned_items = get_video_details(video_ids, journal=journal)
+
+        # 3. 저장소에 추가 (행정동/수집 날짜 파티션, 실행 끝에 한 번에 씀)
+        store.add(keyword, cleaned_items)
+
+        # 4. SAVE_RUN_FILES면 기존처럼 data/키워드명 폴더에 JSON/CSV도 저장
+        search_filename = cleaned_filename = None
+        if cf.SAVE_RUN_FILES:
+            folder_name = keyword_folder(keyword, os.path.join(script_dir, "data"))
+            search_filename = save_search_result(search_items, search_params, page_info, folder_name)
+            cleaned_filename = save_cleaned_csv(cleaned_items, search_filename, folder_name)
+        saved.append((keyword, search_filename, cleaned_filename))
 
         total_videos += len(cleaned_items)
         print(f"{len(cleaned_items)}개의 비디오 데이터 저장 완료")
         
         # 키워드별 구분선 
         print(f"\n{'#'*70}") 
-        print(f"✅ 키워드 [{keyword_idx}/{len(cf.KEYWORDS)}] 완료: {keyword}") 
+        print(f"✅ 키워드 [{keyword_idx}/{len(searched)}] 완료: {keyword}") 
         print(f"{'#'*70}\n") 
 
+    store.flush()
+    for keyword, search_filename, cleaned_filename in saved:
+        journal.mark_saved(crawl_ids[keyword], search_filename, cleaned_filename or store.root)
+
     print(f"\n{'='*70}") 
     print(f"🎉 전체 완료: 총 {total_videos}개의 비디오 데이터를 저장했습니다.") 
-    print(f"📁 저장 위치: {script_dir}/data/") 
-    print(f"🔑 처리한 키워드 수: {len(cf.KEYWORDS)}개") 
-    print(f"{'='*70}")
\ No newline at end of file
+    print(f"📁 저장 위치: {store.root}/") 
+    print(f"🔑 처리한 키워드 수: {len(keywords)}개") 
+    print(f"⏸️ 미룬 키워드: {len(parked)}개 / 🔋 남은 쿼터: {budget.remaining:,}") 
+    print(f"{'='*70}")
@@ -0,0 +1,239 @@
+"""
+YouTube API 요청 녹화/재생
+
+HTTP_MODE(또는 YOUTUBE_HTTP_MODE 환경변수)에 따라
+    live   : 그대로 요청
+    record : 요청하고 응답(상태 코드 + 본문)을 CASSETTE_DIR에 저장
+    replay : 네트워크 없이 저장된 응답만 돌려줌 (없으면 ReplayMiss, 쿼터는 차감하지 않음)
+API 키 없이 수집 코드를 다시 돌려 보거나, 녹화한 응답을 fake_server.py로 서빙할 때 사용한다.
+수집기(api_get / fetch_json)는 ReplayMiss를 요청 실패로 바꿔서 녹화 없는 키워드만 실패로 남긴다.
+
+    python http_replay.py  # 가짜 서버로 녹화 → 재생 왕복 확인
+
+녹화 파일은 요청마다 JSON 하나 (<endpoint>/<파라미터 해시>.json)이고, 파라미터에서 key는 뺀다.
+상세 조회(videos)는 실행마다 배치 구성이 달라질 수 있어서, 같은 배치가 없으면 녹화된 영상 id 단위로 응답을 만든다.
+"""
+import hashlib
+import json
+import os
+
+import requests
+from dotenv import load_dotenv
+
+import config as cf
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODES = ("live", "record", "replay")
+
+_env_loaded = False
+_cassettes = {}  # (path, mode) → Cassette (영상 색인을 요청마다 다시 만들지 않도록)
+
+
+class ReplayMiss(LookupError):
+    """replay 모드에서 녹화되지 않은 요청 (요청 파라미터가 바뀐 경우 등)"""
+
+
+def request_key(url, params):
+    """
+    요청 → (endpoint, 파라미터 해시)
+
+    파라미터 순서와 key(API 키)는 무시하고, 값은 문자열로 비교한다.
+    """
+    endpoint = url.rstrip("/").rsplit("/", 1)[-1]
+    clean = {k: str(v) for k, v in (params or {}).items() if k != "key" and v is not None}
+    digest = hashlib.sha1(json.dumps(clean, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return endpoint, digest[:16]
+
+
+class ReplayResponse:
+    """requests.Response 대신 쓰는 최소 응답 (status_code, text, json(), raise_for_status())"""
+
+    def __init__(self, status_code, text, url=""):
+        self.status_code = status_code
+        self.text = text
+        self.url = url
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error (replay): {self.url}", response=self)
+
+
+class Cassette:
+    """
+    녹화 파일 폴더
+
+    Args:
+        path (str): 녹화 폴더 (None이면 cf.CASSETTE_DIR, 스크립트 위치 기준)
+        mode (str): live / record / replay
+    """
+
+    def __init__(self, path=None, mode="replay"):
+        if mode not in MODES:
+            raise ValueError(f"알 수 없는 모드: {mode} (가능: {MODES})")
+        self.path = path or os.path.join(SCRIPT_DIR, cf.CASSETTE_DIR)
+        self.mode = mode
+        self._videos = None  # video_id → 아이템 (요청했지만 응답에 없던 삭제/비공개 영상은 None)
+
+    def _file(self, url, params):
+        endpoint, digest = request_key(url, params)
+        return os.path.join(self.path, endpoint, f"{digest}.json")
+
+    def save(self, url, params, status, body):
+        """응답 하나 저장 (같은 요청이면 덮어씀)"""
+        path = self._file(url, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        record = {
+            "url": url,
+            "params": {k: v for k, v in (params or {}).items() if k != "key"},
+            "status": status,
+            "body": body,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        self._videos = None
+
+    def lookup(self, url, params):
+        """
+        저장된 응답
+
+        Returns:
+            tuple: (status, body 문자열)
+
+        Raises:
+            ReplayMiss: 녹화되지 않은 요청
+        """
+        path = self._file(url, params)
+        if not os.path.exists(path) and request_key(url, params)[0] == "videos":
+            body = self._video_batch(str((params or {}).get("id", "")).split(","))
+            if body is not None:
+                return 200, body
+        if not os.path.exists(path):
+            raise ReplayMiss(f"녹화되지 않은 요청: {url} {params and {k: v for k, v in params.items() if k != 'key'}}")
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+        return record["status"], record["body"]
+
+    def _video_batch(self, video_ids):
+        """녹화된 영상 id로 videos 응답 본문 구성 (녹화에 없는 id가 하나라도 있으면 None)"""
+        if self._videos is None:
+            self._videos = {}
+            for record in self.records():
+                if record["status"] >= 400 or not record["url"].rstrip("/").endswith("/videos"):
+                    continue
+                self._videos.update(dict.fromkeys(str(record["params"].get("id", "")).split(",")))
+                self._videos.update((item["id"], item) for item in json.loads(record["body"]).get("items", []))
+        if not video_ids or any(vid not in self._videos for vid in video_ids):
+            return None
+        items = [self._videos[vid] for vid in video_ids if self._videos[vid] is not None]
+        return json.dumps({"kind": "youtube#videoListResponse", "items": items,
+                           "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}}, ensure_ascii=False)
+
+    def records(self):
+        """저장된 녹화 전체 (fake_server.py 색인용)"""
+        for root, _, files in os.walk(self.path):
+            for name in sorted(files):
+                if name.endswith(".json"):
+                    with open(os.path.join(root, name), encoding="utf-8") as f:
+                        yield json.load(f)
+
+    def get(self, url, params=None, timeout=None):
+        """requests.get 대신 호출 (모드에 따라 요청/녹화/재생)"""
+        if self.mode == "replay":
+            status, body = self.lookup(url, params)
+            return ReplayResponse(status, body, url)
+        response = requests.get(url, params=params, timeout=timeout)
+        if self.mode == "record":
+            self.save(url, params, response.status_code, response.text)
+        return response
+
+
+def _load_env():
+    """.env는 처음 필요할 때 한 번만 읽음 (import만으로는 아무 일도 하지 않도록)"""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
+
+def youtube_api_key():
+    """YOUTUBE_API 키 (.env 또는 환경변수)"""
+    _load_env()
+    return os.getenv("YOUTUBE_API")
+
+
+def youtube_base_url():
+    """API 주소 (로컬 가짜 서버로 테스트할 때는 YOUTUBE_API_BASE_URL 환경변수로 교체)"""
+    _load_env()
+    return os.getenv("YOUTUBE_API_BASE_URL", cf.API_BASE_URL)
+
+
+def http_mode():
+    return os.getenv("YOUTUBE_HTTP_MODE", cf.HTTP_MODE)
+
+
+def default_cassette():
+    """HTTP_MODE 설정의 녹화 폴더 (live면 None)"""
+    mode = http_mode()
+    if mode == "live":
+        return None
+    key = (os.getenv("YOUTUBE_CASSETTE_DIR"), mode)
+    if key not in _cassettes:
+        _cassettes[key] = Cassette(*key)
+    return _cassettes[key]
+
+
+def http_get(url, params=None, timeout=None):
+    """
+    requests.get 대신 쓰는 GET (HTTP_MODE에 따라 녹화/재생)
+
+    Returns:
+        requests.Response 또는 ReplayResponse
+    """
+    cassette = default_cassette()
+    if cassette is None:
+        return requests.get(url, params=params, timeout=timeout)
+    return cassette.get(url, params, timeout)
+
+
+# 메인 실행: 가짜 서버로 녹화 → 재생 왕복 확인 (API 키 / 네트워크 없이)
+if __name__ == "__main__":
+    import asyncio
+    import shutil
+    import tempfile
+
+    from async_collector import collect_all
+    from fake_server import FakeYouTube, start_server
+    from quota_scheduler import QuotaBudget
+
+    keywords = cf.KEYWORDS[:3]  # 앞의 2개만 녹화하고, 마지막 키워드는 녹화 없이 재생
+    work_dir = tempfile.mkdtemp(prefix="replay_check_")
+    os.environ.update(YOUTUBE_CASSETTE_DIR=os.path.join(work_dir, "cassettes"), YOUTUBE_API="replay-check",
+                      YOUTUBE_API_BASE_URL=f"http://127.0.0.1:{cf.FAKE_PORT}/youtube/v3")
+
+    async def collect(mode, keywords, with_server=False):
+        os.environ["YOUTUBE_HTTP_MODE"] = mode
+        budget = QuotaBudget(state_path=os.path.join(work_dir, f"quota_{mode}.json"))
+        runner = await start_server(FakeYouTube(latency=0, jitter=0)) if with_server else None
+        try:
+            results = await collect_all(keywords, total_count=60, budget=budget)
+        finally:
+            if runner is not None:
+                await runner.cleanup()
+        return {r["keyword"]: r for r in results}, budget.daily_limit - budget.remaining
+
+    try:
+        recorded, _ = asyncio.run(collect("record", keywords[:2], with_server=True))
+        replayed, spent = asyncio.run(collect("replay", keywords))
+
+        for keyword in keywords[:2]:
+            assert replayed[keyword]["error"] is None, replayed[keyword]["error"]
+            assert replayed[keyword]["video_ids"] == recorded[keyword]["video_ids"], keyword
+            assert replayed[keyword]["cleaned_items"] == recorded[keyword]["cleaned_items"], keyword
+        assert replayed[keywords[2]]["error"], "녹화되지 않은 키워드가 실패로 표시되지 않음"
+        assert spent == 0, f"replay에서 쿼터 {spent} 차감"
+        print(f"✅ 녹화/재생 일치: 키워드 {len(keywords) - 1}개, 녹화 없는 키워드 1개만 실패, 재생 쿼터 차감 0")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
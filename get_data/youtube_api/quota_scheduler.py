@@ -0,0 +1,309 @@
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+import config as cf
+from http_replay import ReplayMiss, default_cassette
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TZ = ZoneInfo("America/Los_Angeles")  # YouTube 쿼터는 태평양 시간 자정에 초기화
+except ImportError:  # Python 3.8
+    QUOTA_TZ = timezone(timedelta(hours=-8))
+
+STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".quota")
+QUOTA_STATE_PATH = os.path.join(STATE_DIR, "quota_state.json")
+PARKED_PATH = os.path.join(STATE_DIR, "parked.json")
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+
+
+class QuotaExhausted(Exception):
+    """하루 쿼터(또는 지역 그룹 배분량)를 다 쓴 경우"""
+
+
+class GroupBudgetExhausted(QuotaExhausted):
+    """지역 그룹에 배분된 쿼터를 다 쓴 경우 (다른 그룹은 계속 진행)"""
+
+
+# ===== 쿼터 날짜 =====
+def quota_day(now=None):
+    """현재 쿼터 날짜 (태평양 시간 기준)"""
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(QUOTA_TZ).strftime("%Y-%m-%d")
+
+
+def next_reset(now=None):
+    """다음 쿼터 초기화 시각 (UTC)"""
+    now = (now or datetime.now(timezone.utc)).astimezone(QUOTA_TZ)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return tomorrow.astimezone(timezone.utc)
+
+
+# ===== 재시도 판정 =====
+def error_reason(body):
+    """API 오류 응답 본문에서 reason 추출 (예: quotaExceeded)"""
+    try:
+        errors = json.loads(body).get("error", {}).get("errors", [])
+        return errors[0].get("reason") if errors else None
+    except (ValueError, AttributeError):
+        return None
+
+
+def classify_error(status, body):
+    """
+    HTTP 오류 분류
+
+    Returns:
+        str: 'quota' (쿼터 소진, 재시도 안 함) / 'retry' (지터 백오프 후 재시도) / 'fail'
+    """
+    reason = error_reason(body)
+    if status == 403 and reason in QUOTA_REASONS:
+        return "quota"
+    if status in RETRY_STATUS or (status == 403 and reason in RATE_LIMIT_REASONS):
+        return "retry"
+    return "fail"
+
+
+def backoff_delay(attempt, base=None, cap=None):
+    """지수 백오프 + 지터 대기 시간 (초)"""
+    base = cf.BACKOFF_BASE if base is None else base
+    cap = cf.BACKOFF_MAX if cap is None else cap
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+# ===== 쿼터 예산 =====
+class QuotaBudget:
+    """
+    하루 쿼터 사용량 추적 + 지역 그룹별 배분
+
+    요청을 보내기 전에 charge()로 비용을 먼저 차감한다.
+    사용량은 파일에 저장되어, 같은 쿼터 날짜 안에서는 여러 번 실행해도 누적된다.
+    """
+
+    def __init__(self, daily_limit=None, state_path=QUOTA_STATE_PATH, costs=None):
+        self.daily_limit = cf.DAILY_QUOTA if daily_limit is None else daily_limit
+        self.state_path = state_path
+        self.costs = costs or cf.QUOTA_COST
+        self.day = quota_day()
+        self.used = 0
+        self.allowance = {}
+        self.spent = {}
+        self.pool = 0  # 끝난 그룹이 남긴 쿼터 (다른 그룹이 빌려 씀)
+        self._load()
+
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("day") == self.day:
+            self.used = state.get("used", 0)
+
+    def _save(self):
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        with open(self.state_path, "w", encoding="utf-8") as f:
+            json.dump({"day": self.day, "used": self.used}, f)
+
+    def _roll_day(self):
+        # 실행 중에 쿼터 날짜가 바뀌면 사용량 초기화
+        today = quota_day()
+        if today != self.day:
+            # 새 날짜의 쿼터는 그룹 구분 없이 공용으로 씀
+            self.day, self.used = today, 0
+            self.pool += self.daily_limit
+
+    @property
+    def remaining(self):
+        self._roll_day()
+        return max(self.daily_limit - self.used, 0)
+
+    def keyword_cost(self, total_count=None, page_size=50):
+        """키워드 하나를 끝까지 수집하는 데 드는 쿼터 (검색 페이지 + 상세 배치)"""
+        total_count = cf.total_count if total_count is None else total_count
+        pages = -(-total_count // page_size)
+        return pages * self.costs["search"] + pages * self.costs["videos"]
+
+    def plan(self, group_counts, keyword_cost=None):
+        """
+        남은 쿼터를 지역 그룹에 배분
+
+        그룹을 돌아가며 키워드 하나씩 예산을 배정한다 (라운드 로빈).
+        쿼터가 모자라도 어느 그룹도 중간에 끊기지 않고, 예산을 못 받은
+        키워드는 쿼터를 쓰기 전에 바로 미룰 수 있다.
+
+        Args:
+            group_counts (dict): 그룹 → 수집할 키워드 수
+            keyword_cost (int): 키워드 하나당 예상 쿼터 (None이면 keyword_cost())
+
+        Returns:
+            dict: 그룹 → 이번에 수집할 키워드 수
+        """
+        keyword_cost = self.keyword_cost() if keyword_cost is None else keyword_cost
+        left = self.remaining
+        funded = {g: 0 for g in group_counts}
+        while left >= keyword_cost:
+            progressed = False
+            for group, count in group_counts.items():
+                if funded[group] < count and left >= keyword_cost:
+                    funded[group] += 1
+                    left -= keyword_cost
+                    progressed = True
+            if not progressed:
+                break
+
+        self.allowance = {g: n * keyword_cost for g, n in funded.items()}
+        self.spent = {g: 0 for g in group_counts}
+        # 재시도 등으로 예상보다 더 쓰는 그룹은 남은 공용 쿼터에서 빌려 씀
+        self.pool = left
+        return funded
+
+    def cost(self, endpoint):
+        return self.costs[endpoint]
+
+    def charge(self, endpoint, group=None):
+        """
+        요청 1회 비용 차감
+
+        Raises:
+            QuotaExhausted: 하루 쿼터가 부족한 경우
+            GroupBudgetExhausted: 그룹 배분량과 남은 공용 쿼터가 모두 부족한 경우
+        """
+        cost = self.cost(endpoint)
+        if cost > self.remaining:
+            raise QuotaExhausted(f"하루 쿼터 소진 ({self.used}/{self.daily_limit})")
+
+        if group is not None and group in self.allowance:
+            shortfall = self.spent[group] + cost - self.allowance[group]
+            if shortfall > 0:
+                if shortfall > self.pool:
+                    raise GroupBudgetExhausted(
+                        f"[{group}] 배분 쿼터 소진 ({self.spent[group]}/{self.allowance[group]})"
+                    )
+                self.pool -= shortfall
+                self.allowance[group] += shortfall
+            self.spent[group] += cost
+
+        self.used += cost
+        self._save()
+
+    def finish(self, group):
+        """그룹 작업이 끝나면 남은 배분량을 공용 쿼터로 돌려줌"""
+        if group in self.allowance:
+            self.pool += self.allowance[group] - self.spent[group]
+            self.allowance[group] = self.spent[group]
+
+    def exhaust(self):
+        """API가 quotaExceeded를 돌려준 경우: 남은 쿼터를 0으로 맞춤"""
+        self.used = max(self.used, self.daily_limit)
+        self._save()
+
+
+# ===== 미룬 작업 =====
+class ParkedWork:
+    """쿼터 부족으로 미룬 키워드 (다음 쿼터 초기화 이후 재개)"""
+
+    def __init__(self, path=PARKED_PATH):
+        self.path = path
+        self.items = []
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.items = json.load(f)
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.items, f, ensure_ascii=False, indent=2)
+
+    def park(self, keyword, group=None, reason=""):
+        if any(item["keyword"] == keyword for item in self.items):
+            return
+        self.items.append({
+            "keyword": keyword,
+            "group": group,
+            "reason": reason,
+            "resume_after": next_reset().isoformat(),
+        })
+        self._save()
+
+    def take_ready(self, now=None):
+        """재개 가능한(초기화 시각이 지난) 키워드를 꺼냄"""
+        now = now or datetime.now(timezone.utc)
+        ready = [i for i in self.items if datetime.fromisoformat(i["resume_after"]) <= now]
+        self.items = [i for i in self.items if i not in ready]
+        self._save()
+        return [i["keyword"] for i in ready]
+
+    def __len__(self):
+        return len(self.items)
+
+
+# ===== 키워드 → 지역 그룹 =====
+def keyword_group(keyword, groups=None):
+    """키워드의 첫 단어(지역)가 속한 LOCATION_GROUPS 이름 (없으면 지역명 그대로)"""
+    groups = cf.LOCATION_GROUPS if groups is None else groups
+    location = keyword.split()[0] if keyword else keyword
+    for group, locations in groups.items():
+        if location in locations:
+            return group
+    return location
+
+
+def order_by_group(keywords, groups=None):
+    """키워드를 지역 그룹 단위로 묶어서 순서 정렬 (그룹 순서는 LOCATION_GROUPS 순)"""
+    groups = cf.LOCATION_GROUPS if groups is None else groups
+    rank = {g: i for i, g in enumerate(groups)}
+    return sorted(keywords, key=lambda k: (rank.get(keyword_group(k, groups), len(rank)), k))
+
+
+# ===== 동기 요청 (get_csv_filtered.py) =====
+def api_get(url, params, endpoint, budget=None, group=None, max_retries=None):
+    """
+    쿼터 차감 + 재시도가 적용된 requests GET
+
+    Raises:
+        QuotaExhausted: 쿼터 소진 (호출한 쪽에서 남은 작업을 미룸)
+        requests.exceptions.RequestException: 재시도 후에도 실패한 경우 / replay 모드에서 녹화되지 않은 요청
+    """
+    max_retries = cf.MAX_RETRIES if max_retries is None else max_retries
+    cassette = default_cassette()  # HTTP_MODE가 record/replay면 녹화/재생
+    replay = cassette is not None and cassette.mode == "replay"
+    for attempt in range(max_retries + 1):
+        if budget is not None and not replay:  # replay는 네트워크를 쓰지 않으므로 쿼터 차감 없음
+            budget.charge(endpoint, group)
+        try:
+            if cassette is None:
+                response = requests.get(url, params=params, timeout=cf.REQUEST_TIMEOUT)
+            else:
+                response = cassette.get(url, params, cf.REQUEST_TIMEOUT)
+        except ReplayMiss as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == max_retries:
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        if response.status_code < 400:
+            return response.json()
+
+        kind = classify_error(response.status_code, response.text)
+        if kind == "quota":
+            if budget is not None:
+                budget.exhaust()
+            raise QuotaExhausted(f"API 쿼터 소진 응답 ({response.status_code})")
+        if kind == "fail" or attempt == max_retries:
+            response.raise_for_status()
+        delay = backoff_delay(attempt)
+        print(f"[재시도] HTTP {response.status_code} → {delay:.1f}초 후 재시도 ({attempt + 1}/{max_retries})")
+        time.sleep(delay)
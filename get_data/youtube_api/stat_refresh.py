@@ -0,0 +1,263 @@
+"""
+수집한 영상의 조회수/좋아요/댓글 수 다시 받기 (검색 없이 통계만)
+
+저장소(video_store)에 있는 영상 id만 videos API(part=statistics)로 50개씩 다시 조회한다.
+배치 하나가 쿼터 1이라 키워드를 다시 검색하는 것(페이지당 100)보다 훨씬 싸다.
+받은 통계는 새 스냅샷으로 저장소에 추가하고, 직전 스냅샷과의 차이(증가량, 하루당 증가 속도)를
+델타 데이터셋에 따로 쌓는다. 행정동별 속도 집계는 이번에 새로 받은 델타만으로 계산해서 한 행씩 추가한다.
+
+cron 등으로 자주 실행해도 영상마다 REFRESH_INTERVAL_HOURS에 한 번만 조회한다.
+"""
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+import requests
+
+import config as cf
+from http_replay import youtube_api_key, youtube_base_url
+from quota_scheduler import QuotaBudget, QuotaExhausted, api_get
+from video_store import (
+    BASE_PATH, PARTITION_SCHEMA, STAT_COLS, STORE_PATH, VideoStore, load_latest, open_store,
+    partition_filter, write_partitions,
+)
+
+# ===== 경로 설정 =====
+DELTA_PATH = os.path.join(BASE_PATH, 'raw_data', 'youtube_deltas')
+VELOCITY_PATH = os.path.join(BASE_PATH, 'raw_data', 'youtube_velocity.parquet')
+
+# 영상별 델타 (직전 스냅샷 → 이번 스냅샷)
+DELTA_SCHEMA = pa.schema([
+    ('id', pa.string()),
+    ('prev_fetched_at', pa.timestamp('s', tz='UTC')),
+    ('fetched_at', pa.timestamp('s', tz='UTC')),
+    ('hours', pa.float64()),
+    ('viewCount', pa.int64()),
+    ('view_delta', pa.int64()),
+    ('like_delta', pa.int64()),
+    ('comment_delta', pa.int64()),
+    ('views_per_day', pa.float64()),
+    ('likes_per_day', pa.float64()),
+    ('comments_per_day', pa.float64()),
+])
+DELTA_FULL_SCHEMA = pa.schema(list(DELTA_SCHEMA) + list(PARTITION_SCHEMA))
+
+DELTA_COLS = {'viewCount': 'view_delta', 'likeCount': 'like_delta', 'commentCount': 'comment_delta'}
+RATE_COLS = {'view_delta': 'views_per_day', 'like_delta': 'likes_per_day', 'comment_delta': 'comments_per_day'}
+
+
+# ===== 조회 대상 =====
+def tracked_videos(districts=None, interval_hours=None, max_age_days=None, now=None, root=STORE_PATH):
+    """
+    다시 조회할 영상 (행정동별 최신 스냅샷 중 REFRESH_INTERVAL_HOURS가 지난 것)
+
+    Args:
+        districts (list): 대상 행정동 (None이면 전체)
+        interval_hours (float): 영상별 최소 조회 간격 (None이면 cf.REFRESH_INTERVAL_HOURS)
+        max_age_days (int): 게시된 지 이 일수가 지난 영상은 제외 (None이면 cf.REFRESH_MAX_AGE_DAYS, 그것도 None이면 전체)
+        now (datetime): 기준 시각 (기본값: 현재)
+        root (str): 저장소 경로
+
+    Returns:
+        pd.DataFrame: 최신 스냅샷 행 (district, id마다 한 행)
+    """
+    interval_hours = cf.REFRESH_INTERVAL_HOURS if interval_hours is None else interval_hours
+    max_age_days = cf.REFRESH_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    now = pd.Timestamp(now or datetime.now(timezone.utc))
+
+    latest = load_latest(districts, root=root)
+    if latest.empty:
+        return latest
+    due = latest['fetched_at'] <= now - pd.Timedelta(hours=interval_hours)
+    if max_age_days is not None:
+        due &= latest['publishedAt'].isna() | (latest['publishedAt'] >= now - pd.Timedelta(days=max_age_days))
+    return latest[due].reset_index(drop=True)
+
+
+def fetch_statistics(video_ids, budget=None, base_url=None, batch_size=50):
+    """
+    videos API에서 statistics만 50개씩 조회 (배치당 쿼터 1)
+
+    쿼터가 모자라면 그때까지 받은 통계만 돌려준다.
+
+    Returns:
+        tuple: (영상 id → statistics dict, 쿼터 소진 여부)
+    """
+    url = (base_url or youtube_base_url()) + "/videos"
+    video_ids = list(dict.fromkeys(video_ids))
+    stats = {}
+    for i in range(0, len(video_ids), batch_size):
+        params = {"key": youtube_api_key(), "part": "statistics", "id": ",".join(video_ids[i:i + batch_size])}
+        try:
+            data = api_get(url, params, "videos", budget)
+        except QuotaExhausted as e:
+            print(f"⏸️ 쿼터 부족으로 통계 조회 중단: {e}")
+            return stats, True
+        except requests.exceptions.RequestException as e:
+            print(f"API 요청 실패: {e}")
+            break
+        for item in data.get("items", []):
+            stats[item["id"]] = item.get("statistics", {})
+    return stats, False
+
+
+# ===== 델타 =====
+def compute_deltas(previous, snapshots):
+    """
+    직전 스냅샷 대비 증가량과 하루당 증가 속도
+
+    Args:
+        previous (pd.DataFrame): 직전 스냅샷 (district, id, fetched_at, viewCount, likeCount, commentCount)
+        snapshots (pd.DataFrame): 이번 스냅샷 (같은 컬럼 + fetch_date)
+
+    Returns:
+        pd.DataFrame: DELTA_FULL_SCHEMA 컬럼
+    """
+    merged = snapshots.merge(previous, on=['district', 'id'], suffixes=('', '_prev'))
+    hours = (merged['fetched_at'] - merged['fetched_at_prev']).dt.total_seconds() / 3600
+    deltas = pd.DataFrame({
+        'district': merged['district'],
+        'fetch_date': merged['fetch_date'],
+        'id': merged['id'],
+        'prev_fetched_at': merged['fetched_at_prev'],
+        'fetched_at': merged['fetched_at'],
+        'hours': hours,
+        'viewCount': merged['viewCount'],
+    })
+    for col, delta_col in DELTA_COLS.items():
+        deltas[delta_col] = (merged[col] - merged[f'{col}_prev']).astype('Int64')
+    for delta_col, rate_col in RATE_COLS.items():
+        deltas[rate_col] = deltas[delta_col].astype('Float64') / hours * 24
+    return deltas[hours > 0].reset_index(drop=True)
+
+
+def district_velocity(deltas):
+    """
+    행정동별 속도 집계 (이번 갱신의 델타만 사용)
+
+    Returns:
+        pd.DataFrame: district, fetched_at, videos, view_delta, views_per_day(합계), median_views_per_day, ...
+    """
+    grouped = deltas.groupby('district', sort=True)
+    velocity = grouped.agg(
+        fetched_at=('fetched_at', 'max'),
+        videos=('id', 'size'),
+        hours=('hours', 'mean'),
+        view_delta=('view_delta', 'sum'),
+        views_per_day=('views_per_day', 'sum'),
+        median_views_per_day=('views_per_day', 'median'),
+        likes_per_day=('likes_per_day', 'sum'),
+        comments_per_day=('comments_per_day', 'sum'),
+    )
+    return velocity.reset_index()
+
+
+def append_velocity(velocity, path=VELOCITY_PATH):
+    """행정동별 속도 집계를 누적 파일에 추가 (행 수가 적어 파일 하나를 다시 씀)"""
+    if os.path.exists(path):
+        velocity = pd.concat([pd.read_parquet(path), velocity], ignore_index=True)
+    tmp_path = path + '.tmp'
+    velocity.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+# ===== 실행 =====
+def refresh_statistics(districts=None, budget=None, base_url=None, interval_hours=None, max_age_days=None,
+                       root=STORE_PATH, delta_root=DELTA_PATH, velocity_path=VELOCITY_PATH):
+    """
+    추적 중인 영상의 통계를 다시 받아 스냅샷/델타/행정동 속도를 추가
+
+    Args:
+        districts (list): 대상 행정동 (None이면 전체)
+        budget (QuotaBudget): 쿼터 예산 (배치마다 videos 비용 차감)
+        base_url (str): API 주소 (None이면 cf.API_BASE_URL, YOUTUBE_API_BASE_URL 환경변수로 교체 가능)
+        interval_hours (float): 영상별 최소 조회 간격 (None이면 cf.REFRESH_INTERVAL_HOURS)
+        max_age_days (int): 게시된 지 오래된 영상 제외 기준 (None이면 cf.REFRESH_MAX_AGE_DAYS)
+        root (str): 스냅샷 저장소 경로
+        delta_root (str): 델타 데이터셋 경로
+        velocity_path (str): 행정동별 속도 누적 파일
+
+    Returns:
+        pd.DataFrame: 이번 갱신의 행정동별 속도 집계
+    """
+    previous = tracked_videos(districts, interval_hours, max_age_days, root=root)
+    if previous.empty:
+        print("[갱신] 다시 조회할 영상이 없습니다.")
+        return district_velocity(pd.DataFrame(columns=DELTA_FULL_SCHEMA.names))
+
+    store = VideoStore(root)
+    stats, exhausted = fetch_statistics(previous['id'].unique().tolist(), budget, base_url)
+    print(f"[갱신] 대상 {previous['id'].nunique():,}개 중 {len(stats):,}개 통계 수신"
+          f"{' (쿼터 부족으로 일부만)' if exhausted else ''}")
+
+    # 제목/게시일 등은 직전 스냅샷 그대로, 통계만 새 값으로
+    refreshed = previous[previous['id'].isin(stats)]
+    for (district, keyword), rows in refreshed.groupby(['district', 'keyword'], sort=False, dropna=False):
+        items = rows.to_dict('records')
+        for item in items:
+            item.update({col: stats[item['id']].get(col) for col in STAT_COLS})
+        store.add(keyword if isinstance(keyword, str) else district, items, district=district)
+    snapshots = pd.DataFrame(list(store.rows.values()))
+    store.flush()
+    if snapshots.empty:
+        return district_velocity(pd.DataFrame(columns=DELTA_FULL_SCHEMA.names))
+
+    snapshots['fetched_at'] = pd.to_datetime(snapshots['fetched_at'], utc=True)
+    deltas = compute_deltas(previous[['district', 'id', 'fetched_at'] + STAT_COLS], snapshots)
+    write_partitions(
+        deltas.astype(object).where(deltas.notna(), None).to_dict('records'), delta_root, DELTA_SCHEMA,
+        store.fetched_at,
+    )
+
+    velocity = district_velocity(deltas)
+    if len(velocity):
+        append_velocity(velocity, velocity_path)
+    print(f"[갱신] 델타 {len(deltas):,}개 → 행정동 {len(velocity)}개 속도 집계 추가")
+    return velocity
+
+
+# ===== 읽기 =====
+def load_deltas(districts=None, start=None, end=None, columns=None, root=DELTA_PATH):
+    """
+    영상별 델타 (갱신할 때마다 한 행씩)
+
+    Args:
+        districts (list): 읽을 행정동 (None이면 전체)
+        start (str): 갱신 날짜 시작 (YYYY-MM-DD, 포함)
+        end (str): 갱신 날짜 끝 (YYYY-MM-DD, 포함)
+        columns (list): 읽을 컬럼 (None이면 전체)
+        root (str): 델타 데이터셋 경로
+
+    Returns:
+        pd.DataFrame: 델타 행 (fetched_at 순)
+    """
+    dataset = open_store(root, DELTA_FULL_SCHEMA)
+    if dataset is None:
+        return pd.DataFrame(columns=list(columns or DELTA_FULL_SCHEMA.names))
+    table = dataset.to_table(columns=list(columns) if columns is not None else None,
+                             filter=partition_filter(districts, start, end))
+    if 'fetched_at' in table.column_names:
+        table = table.sort_by([('fetched_at', 'ascending')])
+    return table.to_pandas()
+
+
+def load_velocity(districts=None, path=VELOCITY_PATH):
+    """행정동별 속도 집계 이력 (갱신마다 행정동당 한 행)"""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=['district', 'fetched_at', 'videos', 'hours', 'view_delta', 'views_per_day',
+                                     'median_views_per_day', 'likes_per_day', 'comments_per_day'])
+    velocity = pd.read_parquet(path)
+    if districts is not None:
+        velocity = velocity[velocity['district'].isin(list(districts))]
+    return velocity.sort_values(['district', 'fetched_at']).reset_index(drop=True)
+
+
+# 메인 실행 (예: cron으로 매시간 실행해도 영상마다 REFRESH_INTERVAL_HOURS에 한 번만 조회)
+if __name__ == "__main__":
+    budget = QuotaBudget()
+    print(f"🔋 남은 쿼터: {budget.remaining:,} / {budget.daily_limit:,}")
+    velocity = refresh_statistics(budget=budget)
+    if len(velocity):
+        print(velocity[['district', 'videos', 'view_delta', 'views_per_day', 'median_views_per_day']].to_string(index=False))
+    print(f"🔋 남은 쿼터: {budget.remaining:,}")
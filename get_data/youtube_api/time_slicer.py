@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import config as cf
+
+
+# ===== 검색 기간 =====
+def parse_time(value):
+    """RFC 3339 문자열 → datetime (예: 2023-01-01T09:00:00+09:00)"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def format_time(dt):
+    return dt.isoformat(timespec="seconds")
+
+
+def split_window(published_after, published_before, min_hours=None):
+    """
+    검색 기간을 반으로 나눔
+
+    Returns:
+        list: [(시작, 중간), (중간, 끝)] (나눈 구간이 min_hours보다 짧아지면 None)
+    """
+    min_hours = cf.MIN_SLICE_HOURS if min_hours is None else min_hours
+    start, end = parse_time(published_after), parse_time(published_before)
+    half = (end - start) / 2
+    if half < timedelta(hours=min_hours):
+        return None
+    mid = format_time((start + half).replace(microsecond=0))
+    return [(published_after, mid), (mid, published_before)]
+
+
+def is_saturated(total_results, max_results=None):
+    """
+    구간이 포화 상태인지 (search API가 페이지로 넘겨주는 결과 수보다 결과가 많음)
+
+    totalResults는 근사값이지만 첫 페이지 하나로 알 수 있어서,
+    결과가 적은 구간은 더 나누지 않고 쿼터를 아낀다.
+    """
+    max_results = cf.SLICE_MAX_RESULTS if max_results is None else max_results
+    return total_results > max_results
+
+
+def slice_count(total_count):
+    """구간 하나에서 가져올 결과 수"""
+    return min(cf.SLICE_MAX_RESULTS, total_count)
+
+
+# ===== 결과 병합 =====
+class SliceMerge:
+    """
+    여러 구간의 검색 결과를 영상 id 기준으로 중복 없이 합침
+
+    구간 경계나 포화 구간의 첫 페이지처럼 같은 영상이 여러 구간에서 나와도 한 번만 남긴다.
+    """
+
+    def __init__(self, total_count):
+        self.total_count = total_count
+        self.items = {}  # video_id(없으면 etag) → 검색 아이템
+        self.slices = 0
+        self.splits = 0
+
+    def add(self, items):
+        """
+        새 영상만 추가 (total_count를 넘는 영상은 버림)
+
+        Returns:
+            list: 이번에 새로 추가된 아이템
+        """
+        added = []
+        for item in items:
+            if self.full:
+                break
+            key = item.get("id", {}).get("videoId") or item.get("etag")
+            if key not in self.items:
+                self.items[key] = item
+                added.append(item)
+        return added
+
+    @property
+    def full(self):
+        """전체 결과 수 상한(total_count)에 도달하면 새 구간은 검색하지 않음"""
+        return len(self.items) >= self.total_count
+
+    def result(self):
+        """
+        Returns:
+            tuple: (video_ids, search_items)
+        """
+        items = list(self.items.values())
+        video_ids = [item["id"]["videoId"] for item in items if "videoId" in item.get("id", {})]
+        return video_ids, items
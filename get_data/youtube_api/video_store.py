@@ -0,0 +1,352 @@
+"""
+수집한 YouTube 영상 저장소
+
+실행마다 data/<키워드>/ 아래에 JSON/CSV를 새로 만드는 대신, 행정동(district)과
+수집 날짜(fetch_date)로 파티션된 Parquet 데이터셋 하나에 계속 추가한다.
+행 하나는 "이 시각에 본 영상 하나"의 스냅샷이라 같은 영상을 다시 수집하면
+조회수/좋아요/댓글 수가 새 행으로 쌓이고, 읽을 때 최신 스냅샷이나 전체 이력을 고른다.
+"""
+import glob
+import os
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from quota_scheduler import keyword_group
+
+# ===== 경로 설정 =====
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STORE_PATH = os.path.join(BASE_PATH, 'raw_data', 'youtube_store')
+
+KST = timezone(timedelta(hours=9))  # 수집 날짜(fetch_date)는 한국 시간 기준
+
+STAT_COLS = ['viewCount', 'likeCount', 'commentCount']
+
+# 파티션 컬럼 (경로: district=성수동/fetch_date=2025-01-31/)
+PARTITION_SCHEMA = pa.schema([
+    ('district', pa.string()),
+    ('fetch_date', pa.string()),
+])
+
+# 파일에 저장되는 컬럼 (save_cleaned_csv의 CSV 컬럼 + 수집 정보)
+SCHEMA = pa.schema([
+    ('id', pa.string()),
+    ('keyword', pa.string()),
+    ('location', pa.string()),
+    ('fetched_at', pa.timestamp('s', tz='UTC')),
+    ('publishedAt', pa.timestamp('s', tz='UTC')),
+    ('title', pa.string()),
+    ('description', pa.string()),
+    ('channelTitle', pa.string()),
+    ('categoryId', pa.string()),
+    ('tags', pa.string()),
+    ('duration', pa.string()),
+    ('licensedContent', pa.bool_()),
+    ('viewCount', pa.int64()),
+    ('likeCount', pa.int64()),
+    ('commentCount', pa.int64()),
+])
+
+FULL_SCHEMA = pa.schema(list(SCHEMA) + list(PARTITION_SCHEMA))
+PARTITIONING = ds.HivePartitioning(PARTITION_SCHEMA, segment_encoding='none')  # 폴더명은 한글 그대로 (flush 참고)
+
+
+def partition_dir(root, district, fetch_date):
+    return os.path.join(root, f'district={district}', f'fetch_date={fetch_date}')
+
+
+def write_partitions(rows, root, schema, fetched_at):
+    """
+    행 dict 리스트를 district/fetch_date 파티션 폴더마다 새 Parquet 파일 하나로 씀
+
+    파티션 폴더는 직접 만든다 (write_dataset은 한글 폴더명을 %인코딩함).
+
+    Returns:
+        list: 새로 쓴 파일 경로
+    """
+    by_partition = {}
+    for row in rows:
+        by_partition.setdefault((row['district'], row['fetch_date']), []).append(row)
+
+    basename = f"{fetched_at.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+    written = []
+    for (district, fetch_date), part in by_partition.items():
+        folder = partition_dir(root, district, fetch_date)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, basename)
+        pq.write_table(pa.Table.from_pylist(part, schema=schema), path)
+        written.append(path)
+    return written
+
+
+def district_name(keyword):
+    """키워드 → 행정동 이름 (LOCATION_GROUPS 이름에서 괄호 설명 제거, 예: 삼성1동(삼성역) → 삼성1동)"""
+    return re.sub(r'\(.*?\)', '', keyword_group(keyword)).strip()
+
+
+# ===== 값 변환 (API 응답은 숫자도 문자열, 기존 CSV는 빈 칸이 NaN) =====
+def _is_missing(value):
+    return value is None or value == '' or (isinstance(value, float) and value != value)
+
+
+def _to_int(value):
+    return None if _is_missing(value) else int(value)
+
+
+def _to_str(value):
+    return None if _is_missing(value) else str(value)
+
+
+def _to_bool(value):
+    return None if _is_missing(value) else str(value).lower() == 'true'
+
+
+def _to_time(value):
+    """ISO 8601 문자열 → UTC datetime (시간대가 없으면 UTC로 간주)"""
+    if _is_missing(value):
+        return None
+    ts = pd.Timestamp(value)
+    return (ts.tz_convert('UTC') if ts.tzinfo else ts.tz_localize('UTC')).to_pydatetime()
+
+
+# ===== 쓰기 =====
+class VideoStore:
+    """
+    실행 하나의 수집 결과를 모았다가 파티션마다 파일 하나로 추가
+
+    add()는 메모리에만 쌓고, flush()가 (행정동, 수집 날짜) 파티션마다 Parquet 파일 하나를 새로 쓴다.
+    기존 파일은 건드리지 않는다 (추가 전용).
+    """
+
+    def __init__(self, root=STORE_PATH, fetched_at=None):
+        self.root = root
+        self.fetched_at = (fetched_at or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(microsecond=0)
+        self.fetch_date = self.fetched_at.astimezone(KST).strftime('%Y-%m-%d')
+        self.rows = {}  # (district, id) → 행 (같은 행정동의 여러 키워드에서 나온 영상은 한 번만)
+
+    def add(self, keyword, cleaned_items, district=None):
+        """
+        키워드 하나의 정리된 영상 목록 추가 (filter_video_items 결과)
+
+        Args:
+            keyword (str): 검색 키워드 (첫 단어 = 지역)
+            cleaned_items (list): 정리된 영상 dict 리스트
+            district (str): 행정동 (None이면 키워드의 지역 그룹에서 찾음)
+
+        Returns:
+            int: 새로 추가된 영상 수
+        """
+        district = district or district_name(keyword)
+        location = keyword.split()[0] if keyword else keyword
+        added = 0
+        for item in cleaned_items:
+            key = (district, item.get('id'))
+            if key in self.rows:
+                continue
+            self.rows[key] = {
+                'district': district,
+                'fetch_date': self.fetch_date,
+                'id': item.get('id'),
+                'keyword': keyword,
+                'location': location,
+                'fetched_at': self.fetched_at,
+                'publishedAt': _to_time(item.get('publishedAt')),
+                'title': _to_str(item.get('title')),
+                'description': _to_str(item.get('description')),
+                'channelTitle': _to_str(item.get('channelTitle')),
+                'categoryId': _to_str(item.get('categoryId')),
+                'tags': _to_str(item.get('tags')),
+                'duration': _to_str(item.get('duration')),
+                'licensedContent': _to_bool(item.get('licensedContent')),
+                **{col: _to_int(item.get(col)) for col in STAT_COLS},
+            }
+            added += 1
+        return added
+
+    def __len__(self):
+        return len(self.rows)
+
+    def flush(self):
+        """
+        모은 행을 파티션별 Parquet 파일로 추가
+
+        Returns:
+            list: 새로 쓴 파일 경로
+        """
+        if not self.rows:
+            return []
+        written = write_partitions(list(self.rows.values()), self.root, SCHEMA, self.fetched_at)
+        print(f"[저장소] {len(self.rows):,}개 영상 → {len(written)}개 파일 ({self.fetch_date})")
+        self.rows = {}
+        return written
+
+
+# ===== 읽기 =====
+def open_store(root=STORE_PATH, schema=FULL_SCHEMA):
+    """district/fetch_date 파티션 데이터셋 전체를 pyarrow Dataset으로 열기 (없으면 None)"""
+    if not os.path.isdir(root) or not glob.glob(os.path.join(root, '*', '*', '*.parquet')):
+        return None
+    return ds.dataset(root, schema=schema, format='parquet', partitioning=PARTITIONING,
+                      exclude_invalid_files=True)
+
+
+def partition_filter(districts=None, start=None, end=None):
+    """행정동/수집 날짜 조건 (파티션 경로에서 걸러서 해당 파일만 읽음)"""
+    conditions = []
+    if districts is not None:
+        conditions.append(ds.field('district').isin(list(districts)))
+    if start is not None:
+        conditions.append(ds.field('fetch_date') >= str(start)[:10])
+    if end is not None:
+        conditions.append(ds.field('fetch_date') <= str(end)[:10])
+    row_filter = None
+    for condition in conditions:
+        row_filter = condition if row_filter is None else row_filter & condition
+    return row_filter
+
+
+def _empty(columns):
+    return pd.DataFrame(columns=list(columns or FULL_SCHEMA.names))
+
+
+def load_snapshots(districts=None, start=None, end=None, columns=None, root=STORE_PATH):
+    """
+    수집된 스냅샷 전체 (같은 영상이 수집할 때마다 한 행씩)
+
+    Args:
+        districts (list): 읽을 행정동 (None이면 전체)
+        start (str): 수집 날짜 시작 (YYYY-MM-DD, 포함)
+        end (str): 수집 날짜 끝 (YYYY-MM-DD, 포함)
+        columns (list): 읽을 컬럼 (None이면 전체)
+        root (str): 저장소 경로
+
+    Returns:
+        pd.DataFrame: 스냅샷 행 (fetched_at 순)
+    """
+    dataset = open_store(root)
+    if dataset is None:
+        return _empty(columns)
+    table = dataset.to_table(columns=list(columns) if columns is not None else None,
+                             filter=partition_filter(districts, start, end))
+    if 'fetched_at' in table.column_names:
+        table = table.sort_by([('fetched_at', 'ascending')])
+    return table.to_pandas()
+
+
+def load_latest(districts=None, as_of=None, columns=None, root=STORE_PATH):
+    """
+    행정동별 영상마다 가장 최근 스냅샷 하나 (youtube_data.csv와 같은 단위)
+
+    Args:
+        districts (list): 읽을 행정동 (None이면 전체)
+        as_of (str): 이 수집 날짜까지의 스냅샷만 봄 (YYYY-MM-DD, None이면 전체)
+        columns (list): 돌려줄 컬럼 (None이면 전체)
+        root (str): 저장소 경로
+
+    Returns:
+        pd.DataFrame: (district, id)마다 한 행
+    """
+    dataset = open_store(root)
+    if dataset is None:
+        return _empty(columns)
+    read_cols = None if columns is None else list(dict.fromkeys(list(columns) + ['district', 'id', 'fetched_at']))
+    table = dataset.to_table(columns=read_cols, filter=partition_filter(districts, end=as_of))
+    if not table.num_rows:
+        return _empty(columns)
+
+    # 최신 스냅샷을 앞으로 정렬한 뒤 (district, id)별 첫 행만 남김
+    df = table.sort_by([('fetched_at', 'descending')]).to_pandas()
+    df = df.drop_duplicates(['district', 'id']).sort_values(['district', 'fetched_at', 'id'], kind='stable')
+    df = df.reset_index(drop=True)
+    return df[list(columns)] if columns is not None else df
+
+
+# ===== 관리 =====
+def compact(districts=None, root=STORE_PATH):
+    """
+    파티션마다 여러 실행의 작은 파일을 파일 하나로 합침 (스냅샷은 그대로 유지)
+
+    Returns:
+        int: 합친 파티션 수
+    """
+    compacted = 0
+    for folder in sorted(glob.glob(os.path.join(root, 'district=*', 'fetch_date=*'))):
+        district = os.path.basename(os.path.dirname(folder)).split('=', 1)[1]
+        if districts is not None and district not in districts:
+            continue
+        files = sorted(glob.glob(os.path.join(folder, '*.parquet')))
+        if len(files) < 2:
+            continue
+        table = pa.concat_tables(pq.read_table(f, schema=SCHEMA) for f in files).sort_by([('fetched_at', 'ascending')])
+        tmp_path = os.path.join(folder, '_compacting.tmp')
+        pq.write_table(table, tmp_path)
+        for f in files:
+            os.remove(f)
+        os.replace(tmp_path, os.path.join(folder, f"compacted-{uuid.uuid4().hex[:8]}.parquet"))
+        compacted += 1
+    print(f"[저장소 정리] 파티션 {compacted}개 합침")
+    return compacted
+
+
+def export_csv(path, districts=None, as_of=None, root=STORE_PATH):
+    """최신 스냅샷을 raw_data/youtube_data.csv 형식으로 내보내기"""
+    columns = ['district', 'id', 'title', 'publishedAt', 'viewCount', 'likeCount', 'commentCount']
+    df = load_latest(districts, as_of, columns, root)
+    if len(df):
+        df['publishedAt'] = df['publishedAt'].dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+    print(f"[내보내기] {path} ({len(df):,}행)")
+    return path
+
+
+def import_run_files(data_dir, root=STORE_PATH):
+    """
+    기존 실행별 CSV(data/<지역>/*_data_YYYYMMDD_HHMMSS.csv)를 저장소로 옮김
+
+    파일명의 저장 시각을 수집 시각으로 쓰고, 폴더명(지역)으로 행정동을 찾는다.
+
+    Returns:
+        int: 옮긴 파일 수
+    """
+    files = sorted(glob.glob(os.path.join(data_dir, '*', '*_data_*.csv')))
+    for path in files:
+        match = re.search(r'_data_(\d{8}_\d{6})\.csv$', path)
+        if not match:
+            continue
+        fetched_at = datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').replace(tzinfo=KST)
+        location = os.path.basename(os.path.dirname(path))
+        store = VideoStore(root, fetched_at)
+        store.add(location, pd.read_csv(path, encoding='utf-8-sig', dtype=str).to_dict('records'))
+        store.flush()
+    return len(files)
+
+
+def import_csv(path, fetched_at, root=STORE_PATH):
+    """
+    district 컬럼이 있는 CSV(raw_data/youtube_data.csv 형식)를 주어진 수집 시각의 스냅샷으로 추가
+
+    Returns:
+        int: 추가한 행 수
+    """
+    df = pd.read_csv(path, encoding='utf-8-sig', dtype=str)
+    fetched_at = pd.Timestamp(fetched_at)
+    fetched_at = (fetched_at.tz_localize(KST) if fetched_at.tzinfo is None else fetched_at).to_pydatetime()
+    store = VideoStore(root, fetched_at)
+    for district, group in df.groupby('district', sort=False):
+        store.add(district, group.to_dict('records'), district=district)
+    count = len(store)
+    store.flush()
+    return count
+
+
+if __name__ == '__main__':
+    # 기존 실행별 CSV를 저장소로 옮기고 파티션 정리
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    moved = import_run_files(os.path.join(script_dir, 'data'))
+    print(f"[이전] 실행별 CSV {moved}개")
+    compact()
@@ -0,0 +1,245 @@
+"""
+여러 회귀 사양(변수 조합 × 기간)을 한 번에 적합하는 배치 OLS
+
+노트북에서는 cols_model2 / cols_hotplace마다 sm.OLS를 한 번씩 돌리고,
+유의하지 않은 변수를 손으로 빼 가며 다시 돌렸다.
+여기서는 기간마다 [후보 변수 전체 + 종속변수]의 Gram 행렬(XᵀX)을 한 번만 만들고,
+각 변수 조합은 그 부분 행렬만 잘라서 푼다.
+같은 변수 개수의 조합끼리는 (조합 수, k, k) 배열로 묶어 np.linalg로 한 번에 푼다.
+
+수치 안정성을 위해 Gram 행렬은 평균 0 / 표준편차 1로 표준화한 값으로 만들고,
+계수와 표준오차는 원래 단위로 되돌려서 돌려준다 (sm.OLS + add_constant와 같은 값).
+부분 행렬의 조건수가 MAX_CONDITION을 넘는 조합(상수 컬럼, 거의 같은 변수 등)과
+관측치가 모자란 조합은 결과에서 빼고, 빠진 모형_ID와 사유를 결과의 attrs['dropped']로 남긴다.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from data_loader import QUARTER_COL
+
+# 기간 구분 (modeling_data.py의 corona_df: 2020~2022)
+PERIODS = {
+    '전체': None,
+    '코로나': (20201, 20224),
+}
+
+RESULT_COLUMNS = [
+    '기간', '모형_ID', '변수_조합', '관측치', '변수_수', 'R2', '수정_R2', 'F', 'F_p값', '조건수',
+    '변수', '계수', '표준오차', 't', 'p값',
+]
+DROPPED_COLUMNS = ['기간', '모형_ID', '변수_조합', '사유', '조건수']
+
+# 표준화한 Gram 부분 행렬의 조건수 상한 (넘으면 특이행렬에 가까워 계수를 믿을 수 없으므로 제외)
+MAX_CONDITION = 1e10
+
+
+def feature_subsets(candidates, min_size=1, max_size=None, required=()):
+    """
+    후보 변수의 모든 조합
+
+    Args:
+        candidates (list): 후보 변수
+        min_size (int): 최소 변수 수
+        max_size (int): 최대 변수 수 (None이면 후보 전체)
+        required (list): 모든 조합에 반드시 넣을 변수
+    """
+    optional = [c for c in candidates if c not in required]
+    max_size = len(candidates) if max_size is None else max_size
+    subsets = []
+    for size in range(max(min_size, len(required)), max_size + 1):
+        for combo in itertools.combinations(optional, size - len(required)):
+            subsets.append(list(required) + list(combo))
+    return subsets
+
+
+def _period_rows(df, period):
+    if period is None:
+        return df
+    start, end = period
+    return df[df[QUARTER_COL].between(start, end)]
+
+
+def _fit_same_size(C, mean, scale, n, y_idx, subsets, index):
+    """
+    변수 수가 같은 조합들을 한 번에 적합
+
+    Args:
+        C (np.ndarray): 표준화된 [후보 변수..., y]의 Gram 행렬
+        mean, scale (np.ndarray): 표준화에 쓴 평균 / 표준편차
+        n (int): 관측치 수
+        y_idx (int): C에서 y의 위치
+        subsets (list): 변수 조합 목록 (모두 같은 길이)
+        index (dict): 변수명 → C에서의 위치
+
+    Returns:
+        dict: 조합별 계수/표준오차 배열과 모형 통계
+            (keep: 조건수가 MAX_CONDITION 이하라 적합한 조합 여부, cond: 조합별 조건수)
+    """
+    cols = np.array([[index[c] for c in subset] for subset in subsets])  # (m, k)
+    A = C[cols[:, :, None], cols[:, None, :]]  # (m, k, k)
+    cond = np.linalg.cond(A)
+    keep = np.isfinite(cond) & (cond <= MAX_CONDITION)
+    cols, A = cols[keep], A[keep]
+    m, k = cols.shape
+
+    b = C[cols, y_idx]  # (m, k)
+    A_inv = np.linalg.inv(A)
+    beta_std = np.einsum('mij,mj->mi', A_inv, b)
+
+    df_resid = n - k - 1
+    tss = C[y_idx, y_idx]
+    rss = np.maximum(tss - np.einsum('mi,mi->m', beta_std, b), 0)
+    r2 = 1 - rss / tss
+    adj_r2 = 1 - (1 - r2) * (n - 1) / df_resid
+    f_stat = (r2 / k) / ((1 - r2) / df_resid)
+    f_p = stats.f.sf(f_stat, k, df_resid)
+
+    # 원래 단위로 환산
+    sx, sy = scale[cols], scale[y_idx]
+    mx, my = mean[cols], mean[y_idx]
+    sigma2 = rss * sy ** 2 / df_resid
+    beta = beta_std * sy / sx
+    diag = np.einsum('mii->mi', A_inv)
+    se = np.sqrt(sigma2[:, None] * diag) / sx
+
+    # 절편: ȳ - x̄·β, 분산 = σ²(1/n + zᵀ A⁻¹ z), z = x̄ / sx
+    z = mx / sx
+    intercept = my - np.einsum('mi,mi->m', mx, beta)
+    intercept_se = np.sqrt(sigma2 * (1 / n + np.einsum('mi,mij,mj->m', z, A_inv, z)))
+
+    return {
+        'beta': np.column_stack([intercept, beta]),
+        'se': np.column_stack([intercept_se, se]),
+        'r2': r2, 'adj_r2': adj_r2, 'f': f_stat, 'f_p': f_p, 'df_resid': df_resid,
+        'keep': keep, 'cond': cond,
+    }
+
+
+def batch_ols(df, y_col, subsets, periods=PERIODS):
+    """
+    변수 조합 × 기간 전체에 대한 OLS (절편 포함)
+
+    기간마다 후보 변수 전체와 y에 결측이 없는 행만 사용한다 (조합마다 행이 달라지지 않도록).
+
+    Args:
+        df (pd.DataFrame): 행정동-분기 테이블
+        y_col (str): 종속변수 (예: 'MZ_유동_증가율')
+        subsets (list): 변수 조합 목록 (feature_subsets 결과 또는 직접 지정한 리스트의 리스트)
+        periods (dict): 기간명 → (시작 분기, 끝 분기) 또는 None(전체)
+
+    Returns:
+        pd.DataFrame: 모형 × 변수(const 포함) 한 행씩의 계수/표준오차/t/p값과 모형별 R2, F 통계, 조건수
+            (attrs['dropped']: 적합하지 못한 기간 × 모형_ID와 사유 DataFrame)
+    """
+    subsets = [list(s) for s in subsets]
+    candidates = list(dict.fromkeys(c for subset in subsets for c in subset))
+    index = {c: i for i, c in enumerate(candidates)}
+    y_idx = len(candidates)
+
+    by_size = {}
+    for model_id, subset in enumerate(subsets):
+        by_size.setdefault(len(subset), []).append((model_id, subset))
+
+    frames, dropped = [], []
+
+    def drop(period_name, items, reason, cond=np.nan):
+        dropped.extend((period_name, model_id, ' + '.join(subset), reason, cond) for model_id, subset in items)
+
+    for period_name, period in periods.items():
+        data = _period_rows(df, period)[candidates + [y_col]].dropna()
+        Z = data.to_numpy(dtype=np.float64)
+        n = len(Z)
+        if n < 3:
+            print(f"[배치 OLS] {period_name}: 관측치 {n}개 → 건너뜀")
+            drop(period_name, enumerate(subsets), f'관측치 {n}개')
+            continue
+
+        # 표준화 후 Gram 행렬 한 번 계산 (상수 컬럼은 scale 1로 두고, 해당 조합은 조건수 검사에서 제외)
+        mean = Z.mean(axis=0)
+        scale = Z.std(axis=0)
+        scale = np.where(scale > 0, scale, 1)
+        Zs = (Z - mean) / scale
+        C = Zs.T @ Zs
+
+        for size, items in by_size.items():
+            if n - size - 1 <= 0:
+                drop(period_name, items, f'관측치 {n}개 ≤ 변수 {size}개 + 1')
+                continue
+            with np.errstate(divide='ignore', invalid='ignore'):
+                try:
+                    fits = [(items, _fit_same_size(C, mean, scale, n, y_idx, [s for _, s in items], index))]
+                except np.linalg.LinAlgError:
+                    # 조건수 검사를 통과했는데도 역행렬이 실패하면 조합 하나씩 풀어서 해당 조합만 제외
+                    fits = []
+                    for item in items:
+                        try:
+                            fits.append(([item], _fit_same_size(C, mean, scale, n, y_idx, [item[1]], index)))
+                        except np.linalg.LinAlgError:
+                            drop(period_name, [item], '특이행렬 (역행렬 계산 실패)')
+            for group, fit in fits:
+                for (model_id, subset), cond in zip(group, fit['cond']):
+                    if not (np.isfinite(cond) and cond <= MAX_CONDITION):
+                        drop(period_name, [(model_id, subset)], '특이행렬 근접 (조건수 초과)', cond)
+                kept = [item for item, keep in zip(group, fit['keep']) if keep]
+                if kept:
+                    frames.append(_to_frame(period_name, [i for i, _ in kept], [s for _, s in kept], fit, n))
+
+    if frames:
+        results = pd.concat(frames, ignore_index=True)
+        results = results.sort_values(['기간', '모형_ID'], kind='stable').reset_index(drop=True)
+    else:
+        results = pd.DataFrame(columns=RESULT_COLUMNS)
+    results.attrs['dropped'] = pd.DataFrame(dropped, columns=DROPPED_COLUMNS)
+    if dropped:
+        reasons = results.attrs['dropped'].groupby(['기간', '사유'], sort=False).size()
+        print(f"[배치 OLS] 적합하지 못한 모형 {len(dropped)}개 (attrs['dropped']): "
+              + ', '.join(f"{period}/{reason} {count}개" for (period, reason), count in reasons.items()))
+    return results
+
+
+def _to_frame(period_name, ids, subsets, fit, n):
+    """적합 결과 배열 → 모형 × 변수 long 테이블"""
+    k = len(subsets[0])
+    t_stat = fit['beta'] / fit['se']
+    p_val = 2 * stats.t.sf(np.abs(t_stat), fit['df_resid'])
+
+    m = len(ids)
+    return pd.DataFrame({
+        '기간': period_name,
+        '모형_ID': np.repeat(ids, k + 1),
+        '변수_조합': np.repeat([' + '.join(s) for s in subsets], k + 1),
+        '관측치': n,
+        '변수_수': k,
+        'R2': np.repeat(fit['r2'], k + 1),
+        '수정_R2': np.repeat(fit['adj_r2'], k + 1),
+        'F': np.repeat(fit['f'], k + 1),
+        'F_p값': np.repeat(fit['f_p'], k + 1),
+        '조건수': np.repeat(fit['cond'][fit['keep']], k + 1),
+        '변수': np.concatenate([['const'] + list(s) for s in subsets]),
+        '계수': fit['beta'].reshape(m * (k + 1)),
+        '표준오차': fit['se'].reshape(m * (k + 1)),
+        't': t_stat.reshape(m * (k + 1)),
+        'p값': p_val.reshape(m * (k + 1)),
+    }, columns=RESULT_COLUMNS)
+
+
+def significant_models(results, alpha=0.05):
+    """
+    상수항을 뺀 모든 변수가 유의한 모형만 수정 R² 순으로 정리
+
+    Returns:
+        pd.DataFrame: 기간 / 모형_ID / 변수_조합 / 수정_R2 / F / 최대_p값
+    """
+    coefs = results[results['변수'] != 'const']
+    models = coefs.groupby(['기간', '모형_ID', '변수_조합'], sort=False).agg(
+        관측치=('관측치', 'first'),
+        수정_R2=('수정_R2', 'first'),
+        F=('F', 'first'),
+        F_p값=('F_p값', 'first'),
+        최대_p값=('p값', 'max'),
+    ).reset_index()
+    models = models[models['최대_p값'] < alpha]
+    return models.sort_values(['기간', '수정_R2'], ascending=[True, False]).reset_index(drop=True)
@@ -0,0 +1,370 @@
+"""
+서울 열린데이터광장 상권 테이블 로더
+
+cp949 CSV 원본을 한 번만 파싱해서 기준_년분기_코드 단위로 파티션된
+Parquet 캐시로 변환하고, 이후에는 필요한 컬럼/분기만 읽어온다.
+원본 파일의 mtime 또는 해시가 바뀌면 해당 캐시만 다시 만든다.
+"""
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import unicodedata
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from schema import (
+    DONG_COL, DONG_NAME_COL, QUARTER, QUARTER_COL, SCHEMA_VERSION, SECTOR_COL,
+    apply_schema, validate,
+)
+
+# ===== 경로 설정 =====
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(BASE_PATH, 'raw_data')
+CACHE_DIRNAME = '.parquet_cache'
+MANIFEST_NAME = '_manifest.json'
+
+# 매출 테이블에서 합산 대상이 되는 금액 컬럼
+SALES_AMOUNT_COLS = [
+    '당월_매출_금액', '주중_매출_금액', '주말_매출_금액',
+    '연령대_10_매출_금액', '연령대_20_매출_금액', '연령대_30_매출_금액'
+]
+
+# ===== 원본 테이블 정의 =====
+# 테이블명: (파일 패턴, 인코딩)
+SOURCES = {
+    '매출': ('매출_*.csv', 'cp949'),
+    '유동인구': ('유동인구.csv', 'cp949'),
+    '상주인구': ('상주인구.csv', 'cp949'),
+    '상권변화지표': ('상권변화지표.csv', 'cp949'),
+    '집객시설': ('집객시설.csv', 'cp949'),
+    '카페': ('카페.csv', 'utf-8-sig'),
+    '면적': ('면적.csv', 'cp949'),
+}
+
+
+def _nfc(text):
+    return unicodedata.normalize('NFC', text)
+
+
+def find_sources(name, data_path=DATA_PATH):
+    """
+    테이블명에 해당하는 원본 CSV 경로 목록 (파일명 NFC/NFD 차이 무시)
+
+    Args:
+        name (str): SOURCES에 정의된 테이블명
+        data_path (str): raw_data 폴더 경로
+
+    Returns:
+        list: 정렬된 원본 파일 경로 리스트
+    """
+    if name not in SOURCES:
+        raise KeyError(f"알 수 없는 테이블: {name} (가능: {list(SOURCES)})")
+
+    pattern = _nfc(SOURCES[name][0])
+    paths = [
+        os.path.join(data_path, f) for f in os.listdir(data_path)
+        if fnmatch.fnmatch(_nfc(f), pattern)
+    ]
+    return sorted(paths, key=lambda p: _nfc(os.path.basename(p)))
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """파일 내용의 sha256 해시"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_dir(name, source_path, cache_path):
+    stem = _nfc(os.path.splitext(os.path.basename(source_path))[0])
+    return os.path.join(cache_path, name, stem)
+
+
+def _read_manifest(target_dir):
+    path = os.path.join(target_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_manifest(target_dir, manifest):
+    with open(os.path.join(target_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def is_cache_valid(source_path, target_dir):
+    """
+    캐시가 원본과 일치하는지 확인
+
+    mtime/크기가 같으면 해시 계산 없이 유효로 판단하고,
+    mtime만 바뀐 경우(복사, touch 등)에는 해시를 비교해서 내용이 같으면
+    manifest의 mtime만 갱신한다.
+    """
+    manifest = _read_manifest(target_dir)
+    if manifest is None or manifest.get('schema_version') != SCHEMA_VERSION:
+        return False
+
+    stat = os.stat(source_path)
+    if manifest['mtime'] == stat.st_mtime and manifest['size'] == stat.st_size:
+        return True
+
+    if manifest['size'] != stat.st_size or manifest['sha256'] != file_sha256(source_path):
+        return False
+
+    manifest['mtime'] = stat.st_mtime
+    _write_manifest(target_dir, manifest)
+    return True
+
+
+def read_source_csv(name, source_path, **kwargs):
+    """원본 CSV 한 개를 읽어서 schema.py에 선언된 타입으로 변환 (pandas.read_csv 인자 그대로 전달)"""
+    df = pd.read_csv(source_path, encoding=SOURCES[name][1], **kwargs)
+    return apply_schema(name, df, partial='usecols' in kwargs)
+
+
+def _to_arrow(df):
+    """category 컬럼의 인덱스 타입을 int32로 통일해서 파일마다 스키마가 달라지지 않게 함"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    fields = [
+        pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type)) if pa.types.is_dictionary(f.type) else f
+        for f in table.schema
+    ]
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+
+def convert_source(name, source_path, cache_path):
+    """
+    원본 CSV 한 개를 기준_년분기_코드 파티션 Parquet으로 변환
+
+    Returns:
+        str: 생성된 캐시 폴더 경로
+    """
+    target_dir = _cache_dir(name, source_path, cache_path)
+    if os.path.exists(target_dir):
+        shutil.rmtree(target_dir)
+    os.makedirs(target_dir)
+
+    df = read_source_csv(name, source_path)
+    table = _to_arrow(df)
+
+    if QUARTER_COL in df.columns:
+        ds.write_dataset(
+            table, target_dir, format='parquet',
+            partitioning=ds.partitioning(pa.schema([(QUARTER_COL, table.schema.field(QUARTER_COL).type)]), flavor='hive'),
+            existing_data_behavior='overwrite_or_ignore',
+        )
+    else:
+        # 면적처럼 분기 구분이 없는 테이블은 단일 파일로 저장
+        pq.write_table(table, os.path.join(target_dir, 'part-0.parquet'))
+
+    stat = os.stat(source_path)
+    _write_manifest(target_dir, {
+        'source': os.path.basename(source_path),
+        'mtime': stat.st_mtime,
+        'size': stat.st_size,
+        'sha256': file_sha256(source_path),
+        'schema_version': SCHEMA_VERSION,
+        'rows': len(df),
+    })
+    print(f"[캐시 생성] {name}: {os.path.basename(source_path)} ({len(df):,}행)")
+    return target_dir
+
+
+def ensure_cache(name, data_path=DATA_PATH, cache_path=None, force=False):
+    """
+    테이블의 모든 원본에 대해 유효한 캐시를 보장
+
+    Returns:
+        list: 원본별 캐시 폴더 경로 리스트
+    """
+    cache_path = cache_path or os.path.join(data_path, CACHE_DIRNAME)
+    sources = find_sources(name, data_path)
+    if not sources:
+        raise FileNotFoundError(f"{name} 원본 파일이 없습니다: {os.path.join(data_path, SOURCES[name][0])}")
+
+    target_dirs = []
+    for source_path in sources:
+        target_dir = _cache_dir(name, source_path, cache_path)
+        if force or not is_cache_valid(source_path, target_dir):
+            convert_source(name, source_path, cache_path)
+        target_dirs.append(target_dir)
+
+    # 원본이 삭제된 캐시는 정리
+    table_dir = os.path.join(cache_path, name)
+    for d in os.listdir(table_dir):
+        path = os.path.join(table_dir, d)
+        if os.path.isdir(path) and path not in target_dirs:
+            shutil.rmtree(path)
+
+    return target_dirs
+
+
+def build_cache(data_path=DATA_PATH, cache_path=None, force=False):
+    """raw_data 폴더에 있는 모든 테이블의 캐시를 생성/갱신"""
+    for name, (pattern, _) in SOURCES.items():
+        if find_sources(name, data_path):
+            ensure_cache(name, data_path, cache_path, force=force)
+        else:
+            print(f"[건너뜀] {name}: {pattern} 파일 없음")
+
+
+def open_dataset(name, data_path=DATA_PATH, cache_path=None):
+    """테이블 캐시를 pyarrow Dataset으로 열기 (원본별 캐시를 하나로 합침)"""
+    target_dirs = ensure_cache(name, data_path, cache_path)
+    datasets = [ds.dataset(d, format='parquet', partitioning='hive', exclude_invalid_files=True) for d in target_dirs]
+    return datasets[0] if len(datasets) == 1 else ds.dataset(datasets)
+
+
+def load_table(name, columns=None, quarters=None, data_path=DATA_PATH, cache_path=None):
+    """
+    캐시에서 테이블을 읽어 DataFrame으로 반환
+
+    Args:
+        name (str): 테이블명 ('매출', '유동인구', '상주인구', '상권변화지표', '집객시설', '카페', '면적')
+        columns (list): 읽을 컬럼 (None이면 전체)
+        quarters (list): 읽을 기준_년분기_코드 목록 (None이면 전체)
+        data_path (str): raw_data 폴더 경로
+        cache_path (str): 캐시 폴더 경로 (기본값: raw_data/.parquet_cache)
+
+    Returns:
+        pd.DataFrame: 요청한 컬럼/분기만 담긴 데이터
+    """
+    dataset = open_dataset(name, data_path, cache_path)
+
+    row_filter = None
+    if quarters is not None:
+        if QUARTER_COL not in dataset.schema.names:
+            raise ValueError(f"{name} 테이블에는 {QUARTER_COL} 컬럼이 없습니다.")
+        row_filter = ds.field(QUARTER_COL).isin([int(q) for q in quarters])
+
+    table = dataset.to_table(columns=list(columns) if columns is not None else None, filter=row_filter)
+    df = table.to_pandas()
+
+    # 파티션 컬럼은 경로에서 추론된 타입으로 돌아오므로 선언 타입으로 복원
+    if QUARTER_COL in df.columns:
+        df[QUARTER_COL] = df[QUARTER_COL].astype(QUARTER)
+
+    if columns is not None:
+        df = df[list(columns)]
+    return validate(name, df)
+
+
+# ===== 매출 스트리밍 집계 =====
+def _iter_cached_sales(sectors, quarters, columns, chunksize, data_path, cache_path):
+    """Parquet 캐시를 batch 단위로 스캔 (업종/분기 조건은 스캐너에 push-down)"""
+    row_filter = None
+    if sectors is not None:
+        row_filter = ds.field(SECTOR_COL).isin(list(sectors))
+    if quarters is not None:
+        quarter_filter = ds.field(QUARTER_COL).isin([int(q) for q in quarters])
+        row_filter = quarter_filter if row_filter is None else row_filter & quarter_filter
+
+    dataset = open_dataset('매출', data_path, cache_path)
+    for batch in dataset.to_batches(columns=columns, filter=row_filter, batch_size=chunksize):
+        if batch.num_rows:
+            chunk = batch.to_pandas()
+            if QUARTER_COL in chunk.columns:
+                chunk[QUARTER_COL] = chunk[QUARTER_COL].astype(QUARTER)
+            yield chunk
+
+
+def iter_sales_chunks(sectors=None, quarters=None, columns=None, chunksize=200_000, data_path=DATA_PATH,
+                      use_cache=True, cache_path=None):
+    """
+    매출 데이터를 chunk 단위로 읽으면서 업종/분기 필터를 바로 적용
+
+    Args:
+        sectors (list): 남길 서비스_업종_코드_명 목록 (None이면 전체)
+        quarters (list): 남길 기준_년분기_코드 목록 (None이면 전체)
+        columns (list): 읽을 컬럼 (None이면 전체)
+        chunksize (int): 한 번에 읽을 행 수
+        data_path (str): raw_data 폴더 경로
+        use_cache (bool): True면 Parquet 캐시를 스캔, False면 매출_*.csv를 직접 읽음
+        cache_path (str): 캐시 폴더 경로 (기본값: raw_data/.parquet_cache)
+
+    Yields:
+        pd.DataFrame: 필터를 통과한 chunk
+    """
+    if use_cache:
+        yield from _iter_cached_sales(sectors, quarters, columns, chunksize, data_path, cache_path)
+        return
+
+    usecols = None
+    if columns is not None:
+        usecols = list(dict.fromkeys(
+            list(columns)
+            + ([SECTOR_COL] if sectors is not None else [])
+            + ([QUARTER_COL] if quarters is not None else [])
+        ))
+    sectors = set(sectors) if sectors is not None else None
+    quarters = {int(q) for q in quarters} if quarters is not None else None
+
+    encoding = SOURCES['매출'][1]
+    for source_path in find_sources('매출', data_path):
+        for chunk in pd.read_csv(source_path, encoding=encoding, usecols=usecols, chunksize=chunksize):
+            chunk = apply_schema('매출', chunk, partial=True)
+            if sectors is not None:
+                chunk = chunk[chunk[SECTOR_COL].isin(sectors)]
+            if quarters is not None:
+                chunk = chunk[chunk[QUARTER_COL].isin(quarters)]
+            if len(chunk):
+                yield chunk[list(columns)] if columns is not None else chunk
+
+
+def stream_sales(sectors=None, quarters=None, value_cols=SALES_AMOUNT_COLS, group_by=(QUARTER_COL, DONG_COL),
+                 chunksize=200_000, data_path=DATA_PATH, use_cache=True):
+    """
+    매출 데이터를 chunk 단위로 읽으면서 바로 group_by 키로 합산
+
+    chunk마다 부분합을 구해서 누적 결과에 더하기 때문에, 메모리에는
+    chunk 하나와 (분기 × 행정동) 크기의 누적 결과만 올라간다.
+    연도 파일이 늘어나도 최대 메모리 사용량은 거의 변하지 않는다.
+
+    Args:
+        sectors (list): 남길 서비스_업종_코드_명 목록 (None이면 전체)
+        quarters (list): 남길 기준_년분기_코드 목록 (None이면 전체)
+        value_cols (list): 합산할 금액 컬럼
+        group_by (tuple): 집계 키 (업종별 상세가 필요하면 SECTOR_COL 추가)
+        chunksize (int): 한 번에 읽을 행 수
+        data_path (str): raw_data 폴더 경로
+        use_cache (bool): True면 Parquet 캐시를 스캔, False면 매출_*.csv를 직접 읽음
+
+    Returns:
+        pd.DataFrame: group_by 키 + 행정동_코드_명 + value_cols 합계
+    """
+    group_by = list(group_by)
+    value_cols = list(value_cols)
+    columns = list(dict.fromkeys(group_by + [DONG_NAME_COL] + value_cols))
+
+    total = None
+    dong_names = {}
+    n_rows = 0
+    for chunk in iter_sales_chunks(sectors, quarters, columns, chunksize, data_path, use_cache):
+        n_rows += len(chunk)
+        part = chunk.groupby(group_by, sort=False, observed=True)[value_cols].sum()
+        total = part if total is None else pd.concat([total, part]).groupby(level=group_by, sort=False, observed=True).sum()
+
+        # 행정동명은 코드별로 처음 나온 값을 사용
+        new_names = chunk.drop_duplicates(DONG_COL)
+        new_names = new_names[~new_names[DONG_COL].isin(dong_names)]
+        dong_names.update(zip(new_names[DONG_COL], new_names[DONG_NAME_COL]))
+
+    if total is None:
+        return pd.DataFrame(columns=group_by + [DONG_NAME_COL] + value_cols)
+
+    result = total.sort_index().reset_index()
+    result.insert(group_by.index(DONG_COL) + 1, DONG_NAME_COL, result[DONG_COL].map(dong_names))
+    print(f"[매출 집계] {n_rows:,}행 → {len(result):,}행 ({', '.join(group_by)})")
+    return result
+
+
+if __name__ == '__main__':
+    build_cache()
@@ -0,0 +1,150 @@
+"""
+행정동 중심 좌표 (면적.csv 엑스좌표_값 / 와이좌표_값 → 위경도)
+
+면적.csv의 좌표는 서울시 상권분석 데이터 공통 좌표계인 중부원점 TM (EPSG:5181, GRS80 타원체,
+원점 북위 38° 동경 127°, 가산 X 200,000m / Y 500,000m)이다.
+TM 역변환식(Snyder)을 배열 연산으로 적용해서 행정동 전체(약 425개)를 한 번에 위경도로 바꾼다.
+통합 이름(성수동_통합 등)은 소속 행정동 중심을 면적 가중 평균한 좌표를 쓴다.
+
+    from dong_geo import locate
+    coords = locate(df['행정동'])  # 행정동 × (lat, lon), 이름 표기가 달라도 레지스트리 별칭으로 찾음
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATA_PATH, DONG_COL, load_table
+from dong_registry import (
+    CANONICAL_NAME_COL, GROUP_NAME_COL, MERGE_GROUPS, alias_table, group_name, load_registry, strip_name,
+)
+
+X_COL, Y_COL, AREA_COL = '엑스좌표_값', '와이좌표_값', '영역_면적'
+
+# ===== 중부원점 TM (EPSG:5181) =====
+TM_A = 6378137.0  # GRS80 장반경 (m)
+TM_F = 1 / 298.257222101  # GRS80 편평률
+TM_LAT0, TM_LON0 = 38.0, 127.0  # 원점 위도 / 경도
+TM_K0 = 1.0  # 축척 계수
+TM_FALSE_EASTING, TM_FALSE_NORTHING = 200_000.0, 500_000.0
+
+
+def _meridian_arc(phi, e2):
+    """적도에서 위도 phi(rad)까지 자오선 호 길이 / 장반경"""
+    e4, e6 = e2 * e2, e2 ** 3
+    return ((1 - e2 / 4 - 3 * e4 / 64 - 5 * e6 / 256) * phi
+            - (3 * e2 / 8 + 3 * e4 / 32 + 45 * e6 / 1024) * np.sin(2 * phi)
+            + (15 * e4 / 256 + 45 * e6 / 1024) * np.sin(4 * phi)
+            - (35 * e6 / 3072) * np.sin(6 * phi))
+
+
+def tm_to_latlon(x, y, a=TM_A, f=TM_F, lat0=TM_LAT0, lon0=TM_LON0, k0=TM_K0,
+                 false_easting=TM_FALSE_EASTING, false_northing=TM_FALSE_NORTHING):
+    """
+    TM 좌표 → 위경도 (배열 가능, 기본값은 중부원점 EPSG:5181)
+
+    Returns:
+        tuple: (위도, 경도) 도 단위 ndarray
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    e2 = f * (2 - f)
+    ep2 = e2 / (1 - e2)
+
+    # 발밑 위도 (footpoint latitude)
+    arc = _meridian_arc(np.radians(lat0), e2) + (y - false_northing) / (k0 * a)
+    mu = arc / (1 - e2 / 4 - 3 * e2 ** 2 / 64 - 5 * e2 ** 3 / 256)
+    e1 = (1 - np.sqrt(1 - e2)) / (1 + np.sqrt(1 - e2))
+    phi1 = (mu + (3 * e1 / 2 - 27 * e1 ** 3 / 32) * np.sin(2 * mu)
+            + (21 * e1 ** 2 / 16 - 55 * e1 ** 4 / 32) * np.sin(4 * mu)
+            + (151 * e1 ** 3 / 96) * np.sin(6 * mu)
+            + (1097 * e1 ** 4 / 512) * np.sin(8 * mu))
+
+    sin1, cos1, tan1 = np.sin(phi1), np.cos(phi1), np.tan(phi1)
+    c1, t1 = ep2 * cos1 ** 2, tan1 ** 2
+    n1 = a / np.sqrt(1 - e2 * sin1 ** 2)
+    r1 = a * (1 - e2) / (1 - e2 * sin1 ** 2) ** 1.5
+    d = (x - false_easting) / (n1 * k0)
+
+    lat = phi1 - (n1 * tan1 / r1) * (
+        d ** 2 / 2
+        - (5 + 3 * t1 + 10 * c1 - 4 * c1 ** 2 - 9 * ep2) * d ** 4 / 24
+        + (61 + 90 * t1 + 298 * c1 + 45 * t1 ** 2 - 252 * ep2 - 3 * c1 ** 2) * d ** 6 / 720)
+    lon = np.radians(lon0) + (
+        d
+        - (1 + 2 * t1 + c1) * d ** 3 / 6
+        + (5 - 2 * c1 + 28 * t1 - 3 * c1 ** 2 + 8 * ep2 + 24 * t1 ** 2) * d ** 5 / 120) / cos1
+    return np.degrees(lat), np.degrees(lon)
+
+
+# ===== 행정동 중심 =====
+@lru_cache(maxsize=None)
+def dong_centroids(data_path=DATA_PATH):
+    """
+    행정동별 중심 위경도
+
+    Returns:
+        pd.DataFrame: 행정동_코드, 행정동_명(정식 표기), 통합_행정동_명, lat, lon, 영역_면적
+    """
+    area = load_table('면적', columns=[DONG_COL, X_COL, Y_COL, AREA_COL], data_path=data_path)
+    lat, lon = tm_to_latlon(area[X_COL].to_numpy(), area[Y_COL].to_numpy())
+    coords = pd.DataFrame({DONG_COL: area[DONG_COL].to_numpy(), 'lat': lat, 'lon': lon,
+                           AREA_COL: area[AREA_COL].to_numpy()})
+    return load_registry(data_path).merge(coords, on=DONG_COL, how='inner')
+
+
+@lru_cache(maxsize=None)
+def group_centroids(data_path=DATA_PATH):
+    """통합 이름(MERGE_GROUPS)별 중심 (소속 행정동 중심의 면적 가중 평균)"""
+    centroids = dong_centroids(data_path)
+    centroids = centroids[centroids[GROUP_NAME_COL].isin(MERGE_GROUPS)]
+    weights = centroids[AREA_COL].astype(float)
+    grouped = centroids.assign(lat=centroids['lat'] * weights, lon=centroids['lon'] * weights, w=weights)
+    sums = grouped.groupby(GROUP_NAME_COL, observed=True)[['lat', 'lon', 'w']].sum()
+    return pd.DataFrame({'lat': sums['lat'] / sums['w'], 'lon': sums['lon'] / sums['w']})
+
+
+def locate(names, dong_codes=None, data_path=DATA_PATH):
+    """
+    행정동명 (또는 행정동_코드) → 중심 위경도
+
+    레지스트리 별칭(깨진 문자, 특수문자 제거 표기 등)으로 행정동을 찾고, 없으면 통합 이름 규칙
+    (예: 성수동 → 성수동_통합)으로 찾는다. 여러 구에 같은 이름이 있거나 면적.csv에 없는 이름은 결측.
+    고유 이름마다 한 번만 찾는다.
+
+    Args:
+        names (pd.Series): 행정동명
+        dong_codes (pd.Series): 행정동_코드 (주면 코드로 먼저 찾아서 같은 이름 행정동도 구분)
+
+    Returns:
+        pd.DataFrame: names와 같은 인덱스, 컬럼 lat, lon
+    """
+    names = pd.Series(names)
+    aliases, _ = alias_table(data_path)
+    by_code = dong_centroids(data_path).set_index(DONG_COL)[['lat', 'lon']]
+    groups = group_centroids(data_path)
+
+    def find(name):
+        code = aliases.get(str(name))
+        if code is not None and code in by_code.index:
+            return tuple(by_code.loc[code])
+        group = group_name(strip_name(name))
+        if group in groups.index:
+            return tuple(groups.loc[group])
+        return (np.nan, np.nan)
+
+    codes, uniques = pd.factorize(names)
+    found = np.array([find(name) for name in uniques] + [(np.nan, np.nan)], dtype=float)
+    located = pd.DataFrame(found[codes], index=names.index, columns=['lat', 'lon'])
+    if dong_codes is not None:
+        by_dong_code = by_code.reindex(pd.to_numeric(pd.Series(dong_codes), errors='coerce').to_numpy())
+        located = pd.DataFrame(by_dong_code.to_numpy(), index=names.index, columns=['lat', 'lon']).fillna(located)
+    return located
+
+
+# 메인 실행
+if __name__ == "__main__":
+    centroids = dong_centroids()
+    print(f"📍 행정동 {len(centroids)}개 중심 좌표 "
+          f"(위도 {centroids['lat'].min():.4f}~{centroids['lat'].max():.4f}, "
+          f"경도 {centroids['lon'].min():.4f}~{centroids['lon'].max():.4f})")
+    print(centroids[[CANONICAL_NAME_COL, GROUP_NAME_COL, 'lat', 'lon']].head(10).round(5).to_string(index=False))
@@ -0,0 +1,186 @@
+"""
+행정동 이름 레지스트리 (면적.csv 기준 행정동_코드 ↔ 정식 행정동명)
+
+원본 CSV마다 행정동명 표기가 조금씩 다르다.
+- cp949 변환 과정에서 가운데점(·)이 '?'로 깨짐 (예: 종로1?2?3?4가동)
+- NFC / NFD 유니코드 정규화 차이
+- 특수문자를 지운 표기 (예: 종로1234가동)
+- 분석용 통합 이름 (예: 성수1가1동 ~ 성수2가3동 → 성수동_통합)
+
+가능한 표기를 미리 전부 펼쳐서 표기 → 행정동_코드 별칭 테이블을 만들어 두고,
+행 단위 apply 대신 카테고리(고유값)에 대해서만 한 번씩 변환한 뒤 코드로 펼친다.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATA_PATH, DONG_COL, load_table
+
+CANONICAL_NAME_COL = '행정동_명'
+GROUP_NAME_COL = '통합_행정동_명'
+
+# 통합 이름: 행정동명에 키워드가 포함되면 하나의 이름으로 묶음
+MERGE_GROUPS = {
+    '성수동_통합': '성수',
+    '종로_통합': '종로',
+}
+
+# 핫플레이스 모델 학습 대상 (행정동명 부분 일치)
+HOTPLACE_KEYWORDS = ['성수', '을지로동', '송파1동', '송파2동', '문래동']
+
+
+# ===== 표기 정규화 =====
+def fix_broken_chars(name):
+    """깨진 문자(?)를 가운데점(·)으로 복원 후 NFC 정규화"""
+    return unicodedata.normalize('NFC', str(name).replace('?', '·'))
+
+
+def strip_name(name):
+    """한글/숫자 외 문자 제거 (예: 종로1·2·3·4가동 → 종로1234가동)"""
+    return re.sub(r'[^가-힣0-9]', '', fix_broken_chars(name))
+
+
+def spelling_variants(name):
+    """정식 행정동명에서 나올 수 있는 표기 변형 전체"""
+    variants = set()
+    for base in (fix_broken_chars(name), fix_broken_chars(name).replace('·', '?'), strip_name(name)):
+        variants.update({base, unicodedata.normalize('NFC', base), unicodedata.normalize('NFD', base)})
+    return variants
+
+
+def group_name(name):
+    """통합 이름 규칙 적용 (해당 없으면 정식 이름 그대로)"""
+    for group, keyword in MERGE_GROUPS.items():
+        if keyword in name:
+            return group
+    return name
+
+
+# ===== 레지스트리 =====
+@lru_cache(maxsize=None)
+def load_registry(data_path=DATA_PATH):
+    """
+    행정동 레지스트리
+
+    Returns:
+        pd.DataFrame: 행정동_코드, 행정동_명(정식 표기), 통합_행정동_명
+    """
+    area = load_table('면적', columns=[DONG_COL, CANONICAL_NAME_COL], data_path=data_path)
+    registry = pd.DataFrame({
+        DONG_COL: area[DONG_COL].to_numpy(),
+        CANONICAL_NAME_COL: [fix_broken_chars(n) for n in area[CANONICAL_NAME_COL].astype(str)],
+    })
+    registry[GROUP_NAME_COL] = registry[CANONICAL_NAME_COL].map(group_name)
+    return registry.sort_values(DONG_COL).reset_index(drop=True)
+
+
+@lru_cache(maxsize=None)
+def alias_table(data_path=DATA_PATH):
+    """
+    표기 → 행정동_코드 별칭 테이블
+
+    같은 이름의 행정동이 여러 구에 있으면(예: 신사동) 이름만으로는 코드를
+    정할 수 없으므로 별칭 테이블에서 제외하고 ambiguous로 따로 돌려준다.
+
+    Returns:
+        tuple: (dict 표기 → 행정동_코드, frozenset 모호한 표기)
+    """
+    registry = load_registry(data_path)
+    aliases = {}
+    ambiguous = set()
+    for code, name in zip(registry[DONG_COL], registry[CANONICAL_NAME_COL]):
+        for spelling in spelling_variants(name):
+            if spelling in aliases and aliases[spelling] != code:
+                ambiguous.add(spelling)
+            aliases[spelling] = int(code)
+    for spelling in ambiguous:
+        del aliases[spelling]
+    return aliases, frozenset(ambiguous)
+
+
+# ===== 카테고리 단위 변환 =====
+def _remap(series, func, categories=None):
+    """
+    고유값에만 func를 적용해 카테고리로 재매핑 (행 단위 Python 호출 없음)
+
+    Args:
+        series (pd.Series): 변환할 문자열/카테고리 컬럼
+        func (callable): 고유값 하나 → 새 값
+        categories (list): 결과 카테고리 순서 (None이면 변환 결과 고유값 순서)
+    """
+    codes, uniques = pd.factorize(series)
+    mapped = pd.Index([func(v) for v in uniques])
+    if categories is None:
+        categories = mapped.unique()
+    else:
+        categories = pd.Index(categories).append(mapped.difference(categories)).unique()
+    # 끝에 -1을 붙여 두면 factorize 결측 코드(-1)가 그대로 결측으로 남음
+    lookup = np.append(categories.get_indexer(mapped), -1)
+    return pd.Series(pd.Categorical.from_codes(lookup[codes], categories), index=series.index, name=series.name)
+
+
+def normalize_names(series, data_path=DATA_PATH):
+    """
+    행정동명 컬럼을 정식 표기로 통일
+
+    레지스트리에 있는 이름은 정식 표기로, 없는 이름은 깨진 문자 복원 + NFC만 적용.
+    결과 카테고리는 레지스트리 이름 순서로 고정되어, 분기별로 나눠 저장한 뒤
+    다시 합쳐도 카테고리 타입이 유지된다.
+    """
+    registry = load_registry(data_path)
+    aliases, _ = alias_table(data_path)
+    canonical = dict(zip(registry[DONG_COL], registry[CANONICAL_NAME_COL]))
+
+    def to_canonical(name):
+        code = aliases.get(str(name))
+        return canonical[code] if code is not None else fix_broken_chars(name)
+
+    categories = registry[CANONICAL_NAME_COL].drop_duplicates()
+    return _remap(series, to_canonical, categories)
+
+
+def names_from_codes(codes, data_path=DATA_PATH, grouped=False):
+    """행정동_코드 컬럼 → 정식(또는 통합) 행정동명 카테고리"""
+    registry = load_registry(data_path)
+    name_col = GROUP_NAME_COL if grouped else CANONICAL_NAME_COL
+    categories = pd.Index(registry[name_col].drop_duplicates())
+
+    # 레지스트리(코드 정렬)에서 위치를 찾고, 없는 코드는 결측
+    reg_codes = registry[DONG_COL].to_numpy()
+    values = np.asarray(codes)
+    pos = np.minimum(np.searchsorted(reg_codes, values), len(reg_codes) - 1)
+    name_codes = np.where(reg_codes[pos] == values, categories.get_indexer(registry[name_col])[pos], -1)
+    return pd.Series(pd.Categorical.from_codes(name_codes, categories), index=getattr(codes, 'index', None))
+
+
+def codes_from_names(series, data_path=DATA_PATH):
+    """
+    행정동명 → 행정동_코드 (레지스트리에 없거나 모호한 이름은 결측)
+
+    Returns:
+        pd.Series: Int32 행정동_코드
+    """
+    aliases, _ = alias_table(data_path)
+    codes, uniques = pd.factorize(series)
+    lookup = pd.array([aliases.get(str(v)) for v in uniques] + [None], dtype='Int32')
+    return pd.Series(lookup[codes], index=series.index, name=DONG_COL)
+
+
+def group_names(series):
+    """통합 이름 적용 (성수1가1동 … → 성수동_통합), 나머지는 특수문자를 지운 이름"""
+    return _remap(series, lambda name: group_name(strip_name(name)))
+
+
+def match_names(series, keywords=HOTPLACE_KEYWORDS):
+    """
+    행정동명에 키워드 중 하나라도 포함되는 행 (고유값 단위로 판정)
+
+    Returns:
+        np.ndarray: bool 마스크
+    """
+    codes, uniques = pd.factorize(series)
+    hit = np.array([any(k in fix_broken_chars(name) for k in keywords) for name in uniques] + [False])
+    return hit[codes]
@@ -0,0 +1,219 @@
+"""
+상권 파생변수 레지스트리
+
+파생변수를 '이름 → (의존 컬럼, 계산식)'으로 한 곳에 선언해 두고,
+요청한 변수와 그 의존 변수만 의존 순서대로 한 번씩 계산한다.
+
+계산 결과는 입력 컬럼의 해시를 키로 캐시해 두기 때문에, 같은 테이블로
+여러 실험을 돌릴 때 같은 컬럼을 매번 다시 계산하지 않는다.
+입력 컬럼 값이 바뀌면 해시가 달라져서 자동으로 다시 계산된다.
+"""
+import hashlib
+from collections import OrderedDict
+
+import pandas as pd
+
+# 파생변수 정의
+#   deps: 계산에 필요한 컬럼 (원본 컬럼 또는 다른 파생변수)
+#   func: 의존 컬럼 dict → pd.Series
+#   desc: 계산식 설명 (출력용)
+FEATURES = {}
+
+CACHE_SIZE = 256
+_cache = OrderedDict()
+
+
+def register_feature(name, deps, desc):
+    """파생변수 등록 데코레이터"""
+    def decorator(func):
+        FEATURES[name] = {'deps': list(deps), 'func': func, 'desc': desc}
+        return func
+    return decorator
+
+
+# ===== 매출 =====
+@register_feature('주말_매출_가중', ['주말_매출_금액'], '주말_매출_금액 × 1.5')
+def _weekend_weighted(c):
+    return c['주말_매출_금액'] * 1.5
+
+
+@register_feature(
+    'MZ_매출_가중', ['연령대_10_매출_금액', '연령대_20_매출_금액', '연령대_30_매출_금액'],
+    '(연령대_10 + 20 + 30 매출) × 1.2',
+)
+def _mz_weighted(c):
+    return (c['연령대_10_매출_금액'] + c['연령대_20_매출_금액'] + c['연령대_30_매출_금액']) * 1.2
+
+
+@register_feature(
+    '가중_총매출', ['당월_매출_금액', '주말_매출_가중', 'MZ_매출_가중'],
+    '당월 × 0.3 + 주말_매출_가중 × 0.3 + MZ_매출_가중 × 0.4',
+)
+def _weighted_total(c):
+    return c['당월_매출_금액'] * 0.3 + c['주말_매출_가중'] * 0.3 + c['MZ_매출_가중'] * 0.4
+
+
+@register_feature('주말_매출_비중', ['주말_매출_금액', '당월_매출_금액'], '주말_매출_금액 / (당월_매출_금액 + 1)')
+def _weekend_share(c):
+    return c['주말_매출_금액'] / (c['당월_매출_금액'] + 1)
+
+
+@register_feature(
+    'MZ_매출_비중', ['연령대_20_매출_금액', '연령대_30_매출_금액', '당월_매출_금액'],
+    '(연령대_20 + 30 매출) / (당월_매출_금액 + 1)',
+)
+def _mz_sales_share(c):
+    return (c['연령대_20_매출_금액'] + c['연령대_30_매출_금액']) / (c['당월_매출_금액'] + 1)
+
+
+# ===== 유동인구 =====
+@register_feature(
+    'MZ_유동인구', ['연령대_10_유동인구_수', '연령대_20_유동인구_수', '연령대_30_유동인구_수'],
+    '연령대_10 + 20 + 30 유동인구',
+)
+def _mz_population(c):
+    return c['연령대_10_유동인구_수'] + c['연령대_20_유동인구_수'] + c['연령대_30_유동인구_수']
+
+
+@register_feature(
+    'MZ_유입_비중', ['연령대_20_유동인구_수', '연령대_30_유동인구_수', '총_유동인구_수'],
+    '(연령대_20 + 30 유동인구) / (총_유동인구_수 + 1)',
+)
+def _mz_inflow_share(c):
+    return (c['연령대_20_유동인구_수'] + c['연령대_30_유동인구_수']) / (c['총_유동인구_수'] + 1)
+
+
+@register_feature('상권_유입_강도', ['총_유동인구_수', '총_상주인구_수'], '총_유동인구_수 / (총_상주인구_수 + 1)')
+def _inflow_intensity(c):
+    return c['총_유동인구_수'] / (c['총_상주인구_수'] + 1)
+
+
+# ===== 상권 =====
+@register_feature('상권_에너지_지수', ['가중_총매출', '집객시설_수'], '가중_총매출 × 집객시설_수')
+def _energy_index(c):
+    return c['가중_총매출'] * c['집객시설_수']
+
+
+@register_feature('카페_밀집도', ['카페_점포_수', '행정동_면적'], '카페_점포_수 / 행정동_면적(km²)')
+def _cafe_density(c):
+    return c['카페_점포_수'] / (c['행정동_면적'] / 1_000_000)
+
+
+# ===== 계산 엔진 =====
+def resolve_order(names, available=()):
+    """
+    요청한 파생변수를 계산하기 위한 순서 (의존 변수 먼저)
+
+    Args:
+        names (list): 요청한 파생변수
+        available (iterable): 이미 테이블에 있는 컬럼 (다시 계산하지 않음)
+
+    Raises:
+        KeyError: 등록되지 않았고 테이블에도 없는 컬럼이 필요한 경우
+        ValueError: 의존 관계에 순환이 있는 경우
+    """
+    available = set(available)
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in available or name in order:
+            return
+        if name not in FEATURES:
+            raise KeyError(f"'{name}' 컬럼이 테이블에 없고 등록된 파생변수도 아닙니다.")
+        if name in visiting:
+            raise ValueError(f"파생변수 의존 관계에 순환이 있습니다: {name}")
+        visiting.add(name)
+        for dep in FEATURES[name]['deps']:
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return order
+
+
+def _column_hash(series):
+    hashed = pd.util.hash_pandas_object(series, index=True).to_numpy()
+    return hashlib.sha256(hashed.tobytes()).hexdigest()
+
+
+def _cache_get(key):
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    return None
+
+
+def _cache_put(key, values):
+    _cache[key] = values
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def clear_feature_cache():
+    _cache.clear()
+
+
+def compute_features(df, names, use_cache=True, overwrite=False):
+    """
+    요청한 파생변수만 계산해서 컬럼으로 추가
+
+    Args:
+        df (pd.DataFrame): 행정동-분기 테이블
+        names (list): 추가할 파생변수 이름
+        use_cache (bool): 입력 컬럼 해시 기준 캐시 사용 여부
+        overwrite (bool): True면 테이블에 이미 있는 파생변수도 다시 계산
+
+    Returns:
+        pd.DataFrame: 파생변수가 추가된 복사본
+    """
+    names = [names] if isinstance(names, str) else list(names)
+    available = set(df.columns) - (set(names) if overwrite else set())
+    order = resolve_order(names, available)
+
+    columns = {}
+    hashes = {}
+
+    def lookup(col):
+        return columns[col] if col in columns else df[col]
+
+    def input_hash(col):
+        # 파생변수는 (이름, 의존 컬럼 해시)로, 원본 컬럼은 값 해시로 식별
+        if col not in hashes:
+            if col in columns:
+                deps = [input_hash(dep) for dep in FEATURES[col]['deps']]
+                hashes[col] = hashlib.sha256('|'.join([col] + deps).encode('utf-8')).hexdigest()
+            else:
+                hashes[col] = _column_hash(df[col])
+        return hashes[col]
+
+    for name in order:
+        deps = FEATURES[name]['deps']
+        key = None
+        if use_cache:
+            key = (name, tuple(input_hash(dep) for dep in deps))
+            cached = _cache_get(key)
+            if cached is not None:
+                columns[name] = pd.Series(cached, index=df.index, name=name)
+                continue
+
+        values = FEATURES[name]['func']({dep: lookup(dep) for dep in deps})
+        columns[name] = pd.Series(values, index=df.index, name=name)
+        if use_cache:
+            _cache_put(key, columns[name].to_numpy())
+
+    result = df.copy()
+    for name in names:
+        if name in columns:
+            result[name] = columns[name]
+    return result
+
+
+def describe_features(names=None):
+    """파생변수 계산식 표"""
+    names = names or list(FEATURES)
+    return pd.DataFrame(
+        [{'파생변수': n, '계산식': FEATURES[n]['desc'], '의존_컬럼': ', '.join(FEATURES[n]['deps'])} for n in names]
+    )
@@ -0,0 +1,110 @@
+"""
+(기준_년분기_코드, 행정동_코드) 정렬 정수 키 기반 조인
+
+merge를 여러 번 이어 붙이면 커지는 매출 테이블을 매번 다시 해싱한다.
+여기서는 키를 quarter * 10^8 + 행정동_코드 하나의 int64로 만들고,
+기준 테이블의 고유 키에 대해 각 보조 테이블 위치를 searchsorted로 한 번씩만
+찾은 뒤 컬럼을 take로 붙인다. 병합 결과는 left merge와 같다(중복 키는 첫 행 사용).
+
+조인하면서 '데이터 손실 검증'(미매칭 행)과 '중복 데이터 체크'(중복 키로 인한
+행 증가)를 테이블별 리포트로 함께 계산한다.
+"""
+import numpy as np
+import pandas as pd
+
+from data_loader import DONG_COL, QUARTER_COL
+
+KEYS = [QUARTER_COL, DONG_COL]
+DONG_CODE_BASE = 10 ** 8  # 행정동_코드는 8자리
+
+REPORT_COLUMNS = ['테이블', '행_수', '매칭_행', '미매칭_행', '미사용_키', '중복_키', '팬아웃_행']
+
+
+def make_key(df, keys=KEYS):
+    """(기준_년분기_코드, 행정동_코드) → int64 단일 키"""
+    quarter = df[keys[0]].to_numpy(dtype=np.int64)
+    dong = df[keys[1]].to_numpy(dtype=np.int64)
+    if len(dong) and (dong.min() < 0 or dong.max() >= DONG_CODE_BASE):
+        raise ValueError(f"{keys[1]} 값이 8자리 범위를 벗어났습니다.")
+    return quarter * DONG_CODE_BASE + dong
+
+
+def _align(base_keys, side_keys):
+    """
+    정렬된 고유 키(base_keys)마다 side 테이블의 행 위치 (없으면 -1)
+
+    Returns:
+        tuple: (행 위치 배열, 중복 키 개수, 키별 추가 행 수(팬아웃), base에 없는 side 키 개수)
+    """
+    if len(side_keys) == 0:
+        return np.full(len(base_keys), -1), 0, np.zeros(len(base_keys), dtype=np.int64), 0
+
+    order = np.argsort(side_keys, kind='stable')
+    uniq_side, first, counts = np.unique(side_keys[order], return_index=True, return_counts=True)
+
+    pos = np.minimum(np.searchsorted(uniq_side, base_keys), len(uniq_side) - 1)
+    found = uniq_side[pos] == base_keys
+    # 같은 키가 여러 행이면 첫 행을 사용하고, merge였다면 늘어났을 행 수를 기록
+    row_idx = np.where(found, order[first[pos]], -1)
+    extra = np.where(found, counts[pos] - 1, 0)
+
+    unused = len(uniq_side) - int(found.sum())
+    return row_idx, int((counts > 1).sum()), extra, unused
+
+
+def indexed_left_join(base, sides, keys=KEYS):
+    """
+    base에 여러 보조 테이블을 한 번에 left join
+
+    Args:
+        base (pd.DataFrame): 기준 테이블 (예: 업종별 매출)
+        sides (dict): 테이블명 → 보조 DataFrame (keys 컬럼 포함)
+        keys (list): 조인 키 [기준_년분기_코드, 행정동_코드]
+
+    Returns:
+        tuple: (병합된 DataFrame, 테이블별 조인 리포트 DataFrame)
+    """
+    base = base.reset_index(drop=True)
+    uniq_keys, inverse = np.unique(make_key(base, keys), return_inverse=True)
+
+    columns = {}
+    report = []
+    for name, side in sides.items():
+        side = side.reset_index(drop=True)
+        row_idx_uniq, dup_keys, dup_count_uniq, unused = _align(uniq_keys, make_key(side, keys))
+
+        # 고유 키 단위로 찾은 위치를 base 행으로 펼침
+        row_idx = row_idx_uniq[inverse]
+        matched = int((row_idx >= 0).sum())
+        report.append({
+            '테이블': name,
+            '행_수': len(side),
+            '매칭_행': matched,
+            '미매칭_행': len(base) - matched,
+            '미사용_키': unused,
+            '중복_키': dup_keys,
+            '팬아웃_행': int(dup_count_uniq[inverse].sum()),
+        })
+
+        for col in side.columns:
+            if col in keys:
+                continue
+            if col in base.columns or col in columns:
+                raise ValueError(f"{name} 테이블의 {col} 컬럼이 이미 존재합니다.")
+            columns[col] = pd.api.extensions.take(side[col].array, row_idx, allow_fill=True)
+
+    result = pd.concat([base, pd.DataFrame(columns, index=base.index)], axis=1)
+    return result, pd.DataFrame(report, columns=REPORT_COLUMNS)
+
+
+def print_join_report(report, base_rows):
+    """조인 리포트 출력 (데이터 손실 / 중복 데이터 체크)"""
+    print(f"--- [조인 검증] 기준 테이블 {base_rows:,}행 ---")
+    print(report.to_string(index=False))
+
+    if (report['팬아웃_행'] > 0).any():
+        print("⚠️ 주의: 중복 키가 있는 테이블이 있습니다. (merge였다면 행이 늘어났을 수 있음, 첫 행 사용)")
+    if (report['미매칭_행'] > 0).any():
+        print("⚠️ 주의: 매칭되지 않은 행이 있습니다. (결측 처리)")
+    if not (report['팬아웃_행'] > 0).any() and not (report['미매칭_행'] > 0).any():
+        print("✅ 성공: 데이터 누락이나 중복 없이 완벽하게 병합되었습니다.")
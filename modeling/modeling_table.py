@@ -0,0 +1,319 @@
+"""
+하이브리드 모델용 행정동-분기 팩트 테이블 생성 및 분기 단위 증분 갱신
+
+매출을 먼저 (기준_년분기_코드, 행정동_코드)로 합산한 뒤 유동인구 + 상주인구 +
+상권변화지표 + 집객시설 + 카페 밀집도를 붙인 팩트 테이블(df_grouped)을 만들고,
+MZ_유동_증가율과 함께 분기별 Parquet 저장소에 보관한다. 업종별 행에 인구/시설을
+붙였다가 다시 'first'로 묶는 대신 처음부터 행정동 1행으로 조인하므로 조인 크기가
+업종 수만큼 줄어든다. 업종별 상세 테이블은 build_sector_detail로 필요할 때만 만든다.
+
+새 분기가 공개되면 원본의 분기별 해시를 비교해서 새로 생겼거나 바뀐 분기만
+다시 계산하고, MZ_유동_증가율은 해당 분기와 그 다음 분기만 갱신한다.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (
+    DATA_PATH, DONG_COL, DONG_NAME_COL, QUARTER_COL, SALES_AMOUNT_COLS, SECTOR_COL,
+    iter_sales_chunks, load_table, stream_sales,
+)
+from dong_registry import normalize_names
+from features import compute_features
+from join_engine import indexed_left_join, print_join_report
+
+STORE_DIRNAME = '.modeling_store'
+STORE_VERSION = 4
+KEYS = [QUARTER_COL, DONG_COL]
+
+# ===== 분석 대상 업종 및 컬럼 =====
+TARGET_SECTORS = [
+    '섬유제품', '완구', '운동/경기_용품', '화장품', '문구', '서적',
+    '시계및귀금속', '안경', '일반의류', '편의점', '노래방', '미용실',
+    '당구장', '커피-음료', '호프-간이주점', '분식전문점', '치킨전문점',
+    '패스트푸드점', '제과점', '양식음식점', '중식음식점', '한식음식점'
+]
+
+SALES_COLS = [QUARTER_COL, DONG_COL, DONG_NAME_COL, SECTOR_COL] + SALES_AMOUNT_COLS
+
+# 보조 테이블별 사용 컬럼 (키 제외)
+SIDE_COLUMNS = {
+    '유동인구': ['총_유동인구_수', '연령대_10_유동인구_수', '연령대_20_유동인구_수', '연령대_30_유동인구_수'],
+    '상주인구': ['총_상주인구_수', '총_가구_수'],
+    '상권변화지표': ['운영_영업_개월_평균'],
+    '집객시설': ['집객시설_수', '지하철_역_수'],
+    '카페': ['점포_수'],
+}
+AREA_COLUMNS = [DONG_COL, '영역_면적']
+WEIGHTED_SALES_COLS = ['주말_매출_가중', 'MZ_매출_가중', '가중_총매출']
+
+# ===== 테이블 생성 =====
+def add_weighted_sales(df):
+    """주말 및 MZ 매출 가중치 부여 (금액 합계에 대해 선형이므로 집계 전/후 어디서나 동일)"""
+    return compute_features(df, WEIGHTED_SALES_COLS, use_cache=False)
+
+
+def load_sales(quarters=None, sectors=TARGET_SECTORS, data_path=DATA_PATH):
+    """업종 필터 + 행정동명 정규화 + 주말/MZ 가중 매출을 적용한 업종별 매출"""
+    df = load_table('매출', columns=SALES_COLS, quarters=quarters, data_path=data_path)
+    df = df[df[SECTOR_COL].isin(sectors)].reset_index(drop=True)
+    df[DONG_NAME_COL] = normalize_names(df[DONG_NAME_COL], data_path)
+    return add_weighted_sales(df)
+
+
+def load_sales_fact(quarters=None, sectors=TARGET_SECTORS, data_path=DATA_PATH):
+    """대상 업종 매출을 (분기, 행정동)으로 스트리밍 합산한 뒤 가중 매출 적용"""
+    df = stream_sales(sectors, quarters, SALES_AMOUNT_COLS, KEYS, data_path=data_path)
+    df[DONG_NAME_COL] = normalize_names(df[DONG_NAME_COL], data_path)
+    return add_weighted_sales(df)
+
+
+def load_side_tables(quarters=None, data_path=DATA_PATH):
+    """
+    병합할 보조 테이블 로드 및 파생 컬럼 생성
+
+    Returns:
+        dict: 테이블명 → (기준_년분기_코드, 행정동_코드) 키를 가진 DataFrame
+    """
+    tables = {
+        name: load_table(name, columns=KEYS + cols, quarters=quarters, data_path=data_path)
+        for name, cols in SIDE_COLUMNS.items()
+    }
+
+    # 유동인구: MZ(10~30대) 유동인구
+    tables['유동인구'] = compute_features(tables['유동인구'], ['MZ_유동인구'], use_cache=False)
+
+    # 카페: 면적(km²) 대비 점포 수
+    area = load_table('면적', columns=AREA_COLUMNS, data_path=data_path)
+    area = area.rename(columns={'영역_면적': '행정동_면적'}).drop_duplicates(subset=DONG_COL)
+    cafe = tables['카페'].rename(columns={'점포_수': '카페_점포_수'}).merge(area, on=DONG_COL, how='left')
+    cafe = compute_features(cafe, ['카페_밀집도'], use_cache=False)
+    tables['카페'] = cafe[KEYS + ['카페_점포_수', '카페_밀집도']]
+
+    return tables
+
+
+def build_fact_table(quarters=None, sectors=TARGET_SECTORS, data_path=DATA_PATH, verbose=True):
+    """
+    행정동-분기 팩트 테이블: 합산 매출에 보조 테이블을 left join
+
+    Args:
+        quarters (list): 만들 기준_년분기_코드 목록 (None이면 전체)
+        sectors (list): 분석 대상 업종
+        data_path (str): raw_data 폴더 경로
+        verbose (bool): 조인 검증 리포트 출력 여부
+
+    Returns:
+        pd.DataFrame: (기준_년분기_코드, 행정동_코드)당 1행 (결측은 0)
+    """
+    df_sales = load_sales_fact(quarters, sectors, data_path)
+    # 보조 테이블을 정렬 정수 키로 한 번에 정렬해서 붙임 (미매칭/중복 키 리포트 포함)
+    fact, report = indexed_left_join(df_sales, load_side_tables(quarters, data_path), KEYS)
+    if verbose:
+        print_join_report(report, len(df_sales))
+
+    return fact.fillna(0)
+
+
+def build_sector_detail(quarters=None, sectors=TARGET_SECTORS, data_path=DATA_PATH, verbose=True):
+    """
+    업종별 상세 테이블(기존 final_df): 업종별 매출 행마다 보조 테이블을 붙임
+
+    팩트 테이블보다 업종 수만큼 크므로 업종 단위 분석이 필요할 때만 만든다.
+    """
+    df_sales = load_sales(quarters, sectors, data_path)
+    detail, report = indexed_left_join(df_sales, load_side_tables(quarters, data_path), KEYS)
+    if verbose:
+        print_join_report(report, len(df_sales))
+
+    return detail.fillna(0)
+
+
+def add_mz_growth(df_grouped):
+    """행정동별 직전 분기 대비 MZ 유동인구 증가율 (MZ_유동_증가율)"""
+    df_grouped = df_grouped.sort_values([DONG_COL, QUARTER_COL])
+    growth = df_grouped.groupby(DONG_COL)['MZ_유동인구'].pct_change()
+    df_grouped['MZ_유동_증가율'] = growth.fillna(0).replace([np.inf, -np.inf], 0)
+    return df_grouped
+
+
+# ===== 변경 분기 감지 =====
+def _frame_hash(df):
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).values.tobytes()).hexdigest()
+
+
+def _sales_quarter_hashes(sectors, data_path):
+    """
+    대상 업종 매출의 분기별 해시 (chunk 단위 스트리밍)
+
+    iter_sales_chunks가 업종 필터를 스캐너에 push-down하므로 대상 업종 행만 읽고,
+    메모리에는 chunk 하나와 분기별 해시 객체만 올라간다.
+    """
+    hashers = {}
+    for chunk in iter_sales_chunks(sectors, columns=SALES_COLS, data_path=data_path):
+        for quarter, slice_df in chunk.groupby(QUARTER_COL, sort=False, observed=True):
+            hasher = hashers.setdefault(int(quarter), hashlib.sha256())
+            hasher.update(pd.util.hash_pandas_object(slice_df, index=False).values.tobytes())
+    return {quarter: hasher.hexdigest() for quarter, hasher in hashers.items()}
+
+
+def quarter_fingerprints(sectors=TARGET_SECTORS, data_path=DATA_PATH):
+    """
+    원본 테이블의 분기별 해시를 합친 분기 지문
+
+    업종 목록과 분기 구분이 없는 면적 테이블은 모든 분기의 지문에 반영된다.
+    매출은 전체를 한 번에 올리지 않고 대상 업종만 chunk 단위로 읽으면서 해시한다.
+
+    Returns:
+        dict: 기준_년분기_코드 → 해시 문자열 (매출에 존재하는 분기만)
+    """
+    common = hashlib.sha256()
+    common.update(json.dumps([STORE_VERSION, sorted(sectors)], ensure_ascii=False).encode('utf-8'))
+    common.update(_frame_hash(load_table('면적', columns=AREA_COLUMNS, data_path=data_path)).encode())
+    common = common.hexdigest()
+
+    parts = {quarter: {'매출': digest} for quarter, digest in _sales_quarter_hashes(sectors, data_path).items()}
+    for name, cols in SIDE_COLUMNS.items():
+        df = load_table(name, columns=KEYS + cols, data_path=data_path)
+        for quarter, slice_df in df.groupby(QUARTER_COL, sort=True):
+            if int(quarter) in parts:
+                parts[int(quarter)][name] = _frame_hash(slice_df)
+
+    fingerprints = {}
+    for quarter, hashes in sorted(parts.items()):
+        payload = json.dumps([common, sorted(hashes.items())], ensure_ascii=False)
+        fingerprints[quarter] = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    return fingerprints
+
+
+# ===== 분기별 저장소 =====
+def _store_path(data_path, store_path):
+    return store_path or os.path.join(data_path, STORE_DIRNAME)
+
+
+def _read_store_manifest(store_path):
+    path = os.path.join(store_path, 'manifest.json')
+    if not os.path.exists(path):
+        return {'version': STORE_VERSION, 'fingerprints': {}}
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != STORE_VERSION:
+        return {'version': STORE_VERSION, 'fingerprints': {}}
+    manifest['fingerprints'] = {int(q): h for q, h in manifest['fingerprints'].items()}
+    return manifest
+
+
+def _write_store_manifest(store_path, manifest):
+    with open(os.path.join(store_path, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def _write_partitions(store_path, kind, df, quarters):
+    folder = os.path.join(store_path, kind)
+    os.makedirs(folder, exist_ok=True)
+    for quarter in quarters:
+        df[df[QUARTER_COL] == quarter].to_parquet(os.path.join(folder, f'{quarter}.parquet'), index=False)
+
+
+def _remove_partitions(store_path, kind, quarters):
+    for quarter in quarters:
+        path = os.path.join(store_path, kind, f'{quarter}.parquet')
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def load_store(kind='grouped', quarters=None, data_path=DATA_PATH, store_path=None):
+    """
+    저장소에서 테이블 읽기
+
+    Args:
+        kind (str): 저장소 폴더 이름 ('grouped': 행정동-분기 팩트 테이블)
+        quarters (list): 읽을 기준_년분기_코드 목록 (None이면 전체)
+    """
+    folder = os.path.join(_store_path(data_path, store_path), kind)
+    if not os.path.isdir(folder):
+        return pd.DataFrame()
+    files = sorted(f for f in os.listdir(folder) if f.endswith('.parquet'))
+    if quarters is not None:
+        wanted = {f'{int(q)}.parquet' for q in quarters}
+        files = [f for f in files if f in wanted]
+    if not files:
+        return pd.DataFrame()
+    return pd.concat([pd.read_parquet(os.path.join(folder, f)) for f in files], ignore_index=True)
+
+
+def _finalize(df_grouped, data_path):
+    """저장소에서 읽은 결과와 새로 계산한 결과의 행 순서/행정동명 타입을 맞춤"""
+    df_grouped = df_grouped.sort_values([DONG_COL, QUARTER_COL]).reset_index(drop=True)
+    # 분기 파일마다 카테고리 목록이 달라 합치면 문자열이 되므로 레지스트리 카테고리로 복원
+    df_grouped[DONG_NAME_COL] = normalize_names(df_grouped[DONG_NAME_COL], data_path)
+    return df_grouped
+
+
+def refresh_modeling_table(sectors=TARGET_SECTORS, data_path=DATA_PATH, store_path=None, full=False):
+    """
+    저장소를 원본과 동기화하고 행정동-분기 팩트 테이블(df_grouped)을 반환
+
+    새로 생겼거나 원본이 바뀐 분기만 집계/조인을 다시 하고,
+    MZ_유동_증가율은 해당 분기와 행정동별 바로 다음 분기만 다시 쓴다.
+
+    Args:
+        sectors (list): 분석 대상 업종 (바뀌면 전체 재계산)
+        data_path (str): raw_data 폴더 경로
+        store_path (str): 저장소 경로 (기본값: raw_data/.modeling_store)
+        full (bool): True면 전체 재계산
+
+    Returns:
+        pd.DataFrame: MZ_유동_증가율이 포함된 df_grouped
+    """
+    store_path = _store_path(data_path, store_path)
+    os.makedirs(store_path, exist_ok=True)
+
+    manifest = _read_store_manifest(store_path)
+    old = {} if full else manifest['fingerprints']
+    new = quarter_fingerprints(sectors, data_path)
+
+    changed = sorted(q for q, h in new.items() if old.get(q) != h)
+    removed = sorted(set(old) - set(new))
+    print(f"[증분 갱신] 전체 {len(new)}개 분기 중 변경 {len(changed)}개, 삭제 {len(removed)}개")
+
+    if not changed and not removed:
+        return _finalize(load_store('grouped', store_path=store_path), data_path)
+
+    _remove_partitions(store_path, 'grouped', removed)
+
+    grouped_cols = None
+    fresh = pd.DataFrame()
+    if changed:
+        fresh = build_fact_table(changed, sectors, data_path)
+        grouped_cols = list(fresh.columns)
+
+    # 바뀌지 않은 분기의 집계 결과와 합쳐서 증가율 재계산
+    stored = load_store('grouped', store_path=store_path)
+    kept = pd.DataFrame()
+    if len(stored):
+        kept = stored[~stored[QUARTER_COL].isin(changed + removed)]
+        grouped_cols = grouped_cols or [c for c in stored.columns if c != 'MZ_유동_증가율']
+        kept = kept[grouped_cols]
+    df_grouped = add_mz_growth(pd.concat([kept, fresh], ignore_index=True))
+
+    # 다시 쓸 분기: 새로 계산한 분기 + 증가율이 달라진 분기(변경/삭제 분기의 다음 분기)
+    rewrite = set(changed)
+    if len(stored):
+        compare = df_grouped[KEYS + ['MZ_유동_증가율']].merge(
+            stored[KEYS + ['MZ_유동_증가율']], on=KEYS, how='inner', suffixes=('', '_저장')
+        )
+        diff = ~np.isclose(compare['MZ_유동_증가율'], compare['MZ_유동_증가율_저장'])
+        rewrite.update(compare.loc[diff, QUARTER_COL].unique())
+    _write_partitions(store_path, 'grouped', df_grouped, sorted(int(q) for q in rewrite))
+
+    manifest['fingerprints'] = new
+    _write_store_manifest(store_path, manifest)
+    return _finalize(df_grouped, data_path)
+
+
+if __name__ == '__main__':
+    refresh_modeling_table()
@@ -0,0 +1,242 @@
+"""
+행정동 사분면 분류 (X: 검색 신호 종합 지수, Y: 하이브리드 점수)
+
+seoul.strategic_map.py와 quad.ipynb의 순위/StandardScaler 셀마다 따로 있던
+'정규화 → 가중합 → 행마다 if로 사분면 판정' 코드를 한 곳으로 모은 것.
+1. X_COLS와 Y_COL을 같은 방식(NORMALIZERS: rank / zscore / minmax)으로 정규화하고
+2. X_Index = 정규화한 X_COLS의 가중합, Y_Index = 정규화한 Y_COL
+3. 기준선(threshold)과 비교해서 사분면을 배열 연산 한 번으로 판정한다.
+
+결과는 (입력 값 해시, 정규화, 가중치, 기준선)을 키로 캐시해 두기 때문에
+지도, 차트, 카이제곱 검정이 같은 표로 classify를 여러 번 불러도 계산은 한 번만 한다.
+
+    from quadrant import classify, load_xy
+    result = classify(load_xy())  # 행정동 × (X_Index, Y_Index, quadrant, label, color)
+"""
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# ===== 경로 설정 =====
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(BASE_PATH, 'raw_data')
+XY_FILE = 'xy.csv'  # quad_x_data.ipynb 결과 (행정동, X축 신호, 하이브리드_점수)
+HYBRID_FILE = 'hybrid_model_ranking.csv'  # hybrid_hotplace.ipynb 결과
+
+# ===== 기본 구성 =====
+KEY_COL = '행정동'
+X_COLS = ['CAGR', 'avg_naver', 'blog_post']
+X_WEIGHTS = (0.34, 0.33, 0.33)
+Y_COL = '하이브리드_점수'
+
+# 사분면 번호 → (이름, 색) — 0은 X/Y 중 하나가 결측이라 분류하지 않은 행정동
+QUADRANTS = {
+    1: ('1사분면 (핵심)', '#e74c3c'),
+    2: ('2사분면 (잠재)', '#f1c40f'),
+    3: ('3사분면 (정체)', '#95a5a6'),
+    4: ('4사분면 (효율)', '#3498db'),
+    0: ('분류 불가', '#d5d8dc'),
+}
+
+# 정규화 정의
+#   func: DataFrame → 같은 모양의 DataFrame (열마다 따로 정규화, 결측은 그대로)
+#   threshold: 이 정규화에서 쓰는 기본 기준선 (숫자 또는 'mean' / 'median')
+NORMALIZERS = {}
+
+CACHE_SIZE = 64
+_cache = OrderedDict()
+
+
+def register_normalizer(name, threshold):
+    """정규화 등록 데코레이터"""
+    def decorator(func):
+        NORMALIZERS[name] = {'func': func, 'threshold': threshold}
+        return func
+    return decorator
+
+
+@register_normalizer('rank', 0.5)
+def _rank(frame):
+    """백분위 순위 (0~1, 동점은 평균 순위) — 쏠린 분포도 사방으로 펼쳐짐"""
+    return frame.rank(pct=True)
+
+
+@register_normalizer('zscore', 'mean')
+def _zscore(frame):
+    """(값 - 평균) / 모표준편차 (StandardScaler와 같음, 표준편차 0이면 0)"""
+    std = frame.std(ddof=0)
+    return (frame - frame.mean()).div(std.where(std > 0)).where(frame.isna() | (std > 0), 0.0)
+
+
+@register_normalizer('minmax', 'mean')
+def _minmax(frame):
+    """(값 - 최솟값) / (최댓값 - 최솟값) (범위가 0이면 0)"""
+    span = frame.max() - frame.min()
+    return (frame - frame.min()).div(span.where(span > 0)).where(frame.isna() | (span > 0), 0.0)
+
+
+# ===== 입력 =====
+def load_xy(data_path=DATA_PATH):
+    """xy.csv (행정동별 X축 신호 + 하이브리드_점수)"""
+    return pd.read_csv(os.path.join(data_path, XY_FILE))
+
+
+def join_scores(signals, hybrid, key=KEY_COL):
+    """
+    X축 신호 표와 하이브리드 점수를 행정동으로 합침 (둘 다 있는 행정동만)
+
+    Args:
+        signals (DataFrame): 인덱스 또는 key 컬럼이 행정동 (signal_builder.build_signals)
+        hybrid (Series | DataFrame): 행정동 → 하이브리드_점수
+            (hybrid_model_ranking.csv처럼 행정동_코드_명 컬럼이 있는 표도 가능)
+
+    Returns:
+        DataFrame: key, 신호 컬럼, Y_COL
+    """
+    if isinstance(hybrid, pd.DataFrame):
+        name_col = key if key in hybrid else '행정동_코드_명'
+        hybrid = hybrid.set_index(name_col)[Y_COL]
+    signals = signals.set_index(key) if key in signals else signals
+    joined = signals.join(hybrid.rename(Y_COL), how='inner')
+    joined.index.name = key
+    return joined.reset_index()
+
+
+# ===== 분류 =====
+def normalize(frame, method='rank'):
+    """NORMALIZERS[method]로 열마다 정규화"""
+    if method not in NORMALIZERS:
+        raise ValueError(f"알 수 없는 정규화: {method} (가능: {', '.join(NORMALIZERS)})")
+    return NORMALIZERS[method]['func'](frame.astype(float))
+
+
+def resolve_threshold(values, threshold):
+    """기준선 값 ('mean' / 'median'이면 결측을 뺀 값의 평균 / 중앙값)"""
+    if threshold == 'mean':
+        return float(np.nanmean(values))
+    if threshold == 'median':
+        return float(np.nanmedian(values))
+    return float(threshold)
+
+
+def quadrant_codes(x, y, x_threshold, y_threshold):
+    """
+    사분면 번호 (배열 연산)
+
+    1: X≥, Y≥ / 2: X<, Y≥ / 3: X<, Y< / 4: X≥, Y< (기준선과 같으면 위/오른쪽), 결측이면 0
+
+    Returns:
+        np.ndarray: int8
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    right, top = x >= x_threshold, y >= y_threshold
+    codes = np.where(top, np.where(right, 1, 2), np.where(right, 4, 3))
+    return np.where(np.isnan(x) | np.isnan(y), 0, codes).astype(np.int8)
+
+
+def _input_hash(df, columns):
+    hashed = pd.util.hash_pandas_object(df[columns], index=True).to_numpy()
+    return hashlib.sha256(hashed.tobytes()).hexdigest()
+
+
+def clear_quadrant_cache():
+    _cache.clear()
+
+
+def classify(df, method='rank', weights=X_WEIGHTS, x_cols=X_COLS, y_col=Y_COL, threshold=None, use_cache=True):
+    """
+    X_Index / Y_Index 계산 후 사분면 판정
+
+    Args:
+        df (DataFrame): x_cols, y_col 컬럼이 있는 행정동 표 (xy.csv 또는 join_scores 결과)
+        method (str): 정규화 (NORMALIZERS의 키)
+        weights (tuple): x_cols 가중치
+        threshold: 기준선 — None이면 정규화 기본값, 숫자 / 'mean' / 'median'이면 X, Y 공통, (X, Y) 튜플이면 따로
+        use_cache (bool): 입력 해시 기준 캐시 사용 여부
+
+    Returns:
+        DataFrame: df와 같은 인덱스, 컬럼 X_Index, Y_Index, quadrant, label, color
+            (attrs: method, x_threshold, y_threshold)
+    """
+    x_cols = list(x_cols)
+    weights = tuple(float(w) for w in weights)
+    if len(weights) != len(x_cols):
+        raise ValueError(f"가중치 수({len(weights)})와 X 컬럼 수({len(x_cols)})가 다릅니다.")
+    if threshold is None:
+        threshold = NORMALIZERS[method]['threshold'] if method in NORMALIZERS else None
+    x_threshold, y_threshold = threshold if isinstance(threshold, (tuple, list)) else (threshold, threshold)
+
+    key = None
+    if use_cache:
+        key = (_input_hash(df, x_cols + [y_col]), method, weights, tuple(x_cols), y_col, x_threshold, y_threshold)
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key].copy()
+
+    normed = normalize(df[x_cols + [y_col]], method)
+    x = normed[x_cols].to_numpy() @ np.asarray(weights)
+    y = normed[y_col].to_numpy()
+    x_cut, y_cut = resolve_threshold(x, x_threshold), resolve_threshold(y, y_threshold)
+    codes = quadrant_codes(x, y, x_cut, y_cut)
+
+    labels = np.array([QUADRANTS[q][0] for q in range(5)], dtype=object)
+    colors = np.array([QUADRANTS[q][1] for q in range(5)], dtype=object)
+    result = pd.DataFrame({
+        'X_Index': x, 'Y_Index': y, 'quadrant': codes, 'label': labels[codes], 'color': colors[codes],
+    }, index=df.index)
+    result.attrs.update(method=method, x_threshold=x_cut, y_threshold=y_cut)
+
+    if use_cache:
+        _cache[key] = result
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result.copy()
+
+
+def attach_quadrants(df, **kwargs):
+    """df 복사본에 classify 결과 컬럼을 붙임 (같은 이름 컬럼은 덮어씀)"""
+    result = classify(df, **kwargs)
+    out = df.copy()
+    for col in result.columns:
+        out[col] = result[col]
+    out.attrs.update(result.attrs)
+    return out
+
+
+def contingency(result):
+    """
+    (X 기준선 이상 여부) × (Y 기준선 이상 여부) 2×2 관측 빈도 (분류 불가 제외)
+
+    Returns:
+        DataFrame: 행 X_high (False, True), 열 Y_high (False, True) — pd.crosstab과 같은 모양
+    """
+    codes = result['quadrant'].to_numpy()
+    counts = np.bincount(codes, minlength=5)
+    table = np.array([[counts[3], counts[2]], [counts[4], counts[1]]])
+    return pd.DataFrame(table, index=pd.Index([False, True], name='X_high'),
+                        columns=pd.Index([False, True], name='Y_high'))
+
+
+def quadrant_summary(result, key=None):
+    """사분면별 행정동 수 (+ key 컬럼을 주면 행정동 목록)"""
+    grouped = result.groupby('label', sort=False)
+    summary = grouped.size().rename('행정동_수').to_frame()
+    if key is not None:
+        summary['행정동'] = grouped[key].agg(', '.join)
+    order = [QUADRANTS[q][0] for q in (1, 2, 3, 4, 0)]
+    return summary.reindex([label for label in order if label in summary.index])
+
+
+# 메인 실행
+if __name__ == "__main__":
+    df = load_xy()
+    for method in NORMALIZERS:
+        result = attach_quadrants(df, method=method)
+        print(f"\n{'='*70}")
+        print(f"🧭 {method}: 기준선 X={result.attrs['x_threshold']:.3f}, Y={result.attrs['y_threshold']:.3f}")
+        print(f"{'='*70}")
+        print(quadrant_summary(result, key=KEY_COL).to_string())
+        print(contingency(result).to_string())
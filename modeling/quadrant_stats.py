@@ -0,0 +1,339 @@
+"""
+사분면 카이제곱 검정의 재표본 검정 (순열 / 부트스트랩)
+
+행정동 23개의 2×2 교차표는 기대 빈도가 작아서 chi2_contingency의 근사 p-value만으로는 믿기 어렵다.
+여기서는
+1. 정확 p-value: Fisher 정확 검정 (행/열 합계 고정, 관측 교차표보다 초기하 확률이 크지 않은 교차표의 확률 합)
+2. 순열 p-value: Y 상위 여부를 행정동끼리 섞은 교차표 n_permutations개의 Yates 보정 카이제곱
+3. 가중치 민감도: X_Index 가중치를 디리클레 분포(평균 = X_WEIGHTS)에서 뽑을 때마다 Fisher 정확 p-value
+4. 부트스트랩: 행정동 복원추출 + 가중치 추출을 같이 한 n_bootstrap개 재표본에서
+   정규화/기준선/사분면을 다시 계산 → 행정동별 사분면 소속 확률과 기준선까지 거리의 신뢰구간
+을 계산한다.
+
+재표본은 (재표본 수 × 행정동 수) 배열 연산으로 한 묶음씩 계산하고 (복원추출은 행정동별 뽑힌 횟수 행렬로 처리),
+묶음은 프로세스 풀에 나눠 보낸다. 묶음마다 SeedSequence에서 난수를 나눠 받으므로 n_jobs와 상관없이 결과가 같다.
+
+    from quadrant_stats import print_significance, quadrant_significance
+    print_significance(quadrant_significance(load_xy()))
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from quadrant import (
+    KEY_COL, NORMALIZERS, QUADRANTS, X_COLS, X_WEIGHTS, Y_COL, classify, contingency, load_xy, normalize,
+    quadrant_codes,
+)
+
+N_PERMUTATIONS = 20_000
+N_BOOTSTRAP = 20_000
+WEIGHT_CONCENTRATION = 100  # 디리클레 집중도 (클수록 X_WEIGHTS 근처, 100이면 가중치 표준편차 약 0.05)
+CHUNK_SIZE = 2_000  # 프로세스 하나가 한 번에 처리할 재표본 수
+
+
+# ===== 통계량 =====
+def chi2_2x2(a, b, c, d):
+    """
+    2×2 교차표 [[a, b], [c, d]]의 Yates 보정 카이제곱 (chi2_contingency 기본값과 같음, 배열 가능)
+
+    행/열 합계 중 0이 있으면 0.
+    """
+    a, b, c, d = (np.asarray(v, dtype=float) for v in (a, b, c, d))
+    n = a + b + c + d
+    margins = (a + b) * (c + d) * (a + c) * (b + d)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        diff = np.maximum(np.abs(a * d - b * c) / n - 0.5, 0)
+        stat = diff ** 2 * n ** 3 / margins
+    return np.where(margins > 0, stat, 0.0)
+
+
+def _chi2_from_codes(codes):
+    """사분면 번호 배열 (..., 행정동) → 교차표 카이제곱 (...)"""
+    counts = [(codes == q).sum(axis=-1) for q in (3, 2, 4, 1)]
+    return chi2_2x2(*counts)
+
+
+def chi2_pvalue(stat):
+    """자유도 1 카이제곱 분포의 상단 확률"""
+    return math.erfc(math.sqrt(max(stat, 0) / 2))
+
+
+def exact_pvalue(table):
+    """
+    Fisher 정확 검정 양측 p-value (scipy.stats.fisher_exact와 같음)
+
+    행/열 합계를 고정했을 때, 초기하 확률이 관측 교차표 이하인 교차표의 확률 합.
+
+    Args:
+        table (array): 2×2 관측 빈도 (행 X 하위/상위, 열 Y 하위/상위)
+    """
+    (a, b), (c, d) = np.asarray(table, dtype=int)
+    n, row, col = a + b + c + d, a + b, a + c
+    weights = {k: math.comb(col, k) * math.comb(n - col, row - k)
+               for k in range(max(0, row + col - n), min(row, col) + 1)}
+    # 확률이 같은 교차표가 부동소수 오차로 빠지지 않도록 상대 오차 허용 (scipy와 같은 1e-7)
+    limit = weights[a] * (1 + 1e-7)
+    return sum(w for w in weights.values() if w <= limit) / math.comb(n, row)
+
+
+# ===== 재표본 정규화 (뽑힌 횟수 행렬) =====
+def _resample_rank(values, counts):
+    """
+    재표본 안에서의 백분위 순위 (원래 행정동 전부를 재표본 분포에 대어 봄)
+
+    (작은 값 수 + (같은 값 수 + 1) / 2) / 표본 크기 — 모든 행정동이 한 번씩 뽑히면 rank(pct=True)와 같음.
+    """
+    n = counts.shape[1]
+    order = np.argsort(values, kind='stable')
+    ordered = counts[:, order]
+    upto = np.cumsum(ordered, axis=1)
+    before = upto - ordered
+
+    sorted_values = values[order]
+    starts = np.r_[True, sorted_values[1:] != sorted_values[:-1]]
+    group = np.cumsum(starts) - 1
+    first = np.flatnonzero(starts)
+    last = np.r_[first[1:], n] - 1
+    less = before[:, first[group]]
+    equal = upto[:, last[group]] - less
+
+    pct = np.empty(counts.shape)
+    pct[:, order] = (less + (equal + 1) / 2) / n
+    return pct
+
+
+def _resample_zscore(values, counts):
+    n = counts.shape[1]
+    mean = counts @ values / n
+    std = np.sqrt(np.clip(counts @ (values * values) / n - mean ** 2, 0, None))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = (values - mean[:, None]) / std[:, None]
+    return np.where(std[:, None] > 0, z, 0.0)
+
+
+def _resample_minmax(values, counts):
+    drawn = counts > 0
+    low = np.where(drawn, values, np.inf).min(axis=1, keepdims=True)
+    high = np.where(drawn, values, -np.inf).max(axis=1, keepdims=True)
+    span = high - low
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(span > 0, (values - low) / span, 0.0)
+
+
+RESAMPLE_NORMALIZERS = {'rank': _resample_rank, 'zscore': _resample_zscore, 'minmax': _resample_minmax}
+
+
+def _row_threshold(values, index, threshold):
+    """재표본마다 기준선 ((재표본 수, 1))"""
+    if threshold in ('mean', 'median'):
+        drawn = np.take_along_axis(values, index, axis=1)
+        stat = drawn.mean(axis=1) if threshold == 'mean' else np.median(drawn, axis=1)
+        return stat[:, None]
+    return np.full((len(values), 1), float(threshold))
+
+
+# ===== 프로세스 풀 작업 단위 =====
+def _permutation_chunk(x_high, y_high, size, seed):
+    """Y 상위 여부를 섞은 교차표 size개의 카이제곱"""
+    rng = np.random.default_rng(seed)
+    shuffled = rng.permuted(np.broadcast_to(y_high, (size, len(y_high))), axis=1)
+    a = (shuffled & x_high).sum(axis=1)
+    row, col, n = x_high.sum(), y_high.sum(), len(x_high)
+    return chi2_2x2(n - row - col + a, col - a, row - a, a)
+
+
+def _bootstrap_chunk(features, target, weights, concentration, method, x_threshold, y_threshold, size, seed):
+    """
+    행정동 복원추출 + 가중치 추출 size개
+
+    Returns:
+        tuple: (사분면 번호 (size, 행정동), X - X기준선, Y - Y기준선, 재표본 교차표 카이제곱 (size,))
+    """
+    rng = np.random.default_rng(seed)
+    n = len(target)
+    index = rng.integers(0, n, size=(size, n))
+    counts = np.bincount((index + n * np.arange(size)[:, None]).ravel(), minlength=size * n)
+    counts = counts.reshape(size, n).astype(float)
+    if concentration:
+        drawn_weights = rng.dirichlet(np.asarray(weights) * concentration, size=size)
+    else:
+        drawn_weights = np.broadcast_to(np.asarray(weights, dtype=float), (size, len(weights)))
+
+    resample = RESAMPLE_NORMALIZERS[method]
+    x = sum(resample(features[:, f], counts) * drawn_weights[:, [f]] for f in range(features.shape[1]))
+    y = resample(target, counts)
+    x_cut, y_cut = _row_threshold(x, index, x_threshold), _row_threshold(y, index, y_threshold)
+    codes = quadrant_codes(x, y, x_cut, y_cut)
+    stats = _chi2_from_codes(np.take_along_axis(codes, index, axis=1))
+    return codes, (x - x_cut).astype(np.float32), (y - y_cut).astype(np.float32), stats
+
+
+def _run_chunks(func, args, total, chunk_size, seed, n_jobs):
+    """total개를 chunk_size 묶음으로 나눠 (묶음마다 독립 난수) 프로세스 풀에서 실행"""
+    sizes = [min(chunk_size, total - start) for start in range(0, total, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(sizes) == 1:
+        return [func(*args, size, s) for size, s in zip(sizes, seeds)]
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(sizes))) as pool:
+        futures = [pool.submit(func, *args, size, s) for size, s in zip(sizes, seeds)]
+        return [f.result() for f in futures]
+
+
+# ===== 검정 =====
+def weight_sensitivity(normed, weights, concentration, x_threshold, y_high, size, seed):
+    """
+    원래 행정동 그대로 가중치만 디리클레 분포에서 size번 뽑았을 때의 Fisher 정확 p-value
+
+    Args:
+        normed (np.ndarray): (행정동 수, X 컬럼 수) 정규화한 X 컬럼
+        y_high (np.ndarray): Y 상위 여부
+
+    Returns:
+        np.ndarray: (size,) Fisher 정확 p-value
+    """
+    rng = np.random.default_rng(seed)
+    drawn = rng.dirichlet(np.asarray(weights) * concentration, size=size)
+    x = drawn @ normed.T
+    if x_threshold in ('mean', 'median'):
+        cut = x.mean(axis=1) if x_threshold == 'mean' else np.median(x, axis=1)
+    else:
+        cut = np.full(size, float(x_threshold))
+    x_high = x >= cut[:, None]
+
+    # 뽑힌 교차표 종류는 많지 않으므로 종류별로 한 번만 계산
+    cells = np.stack([(~x_high & ~y_high).sum(1), (~x_high & y_high).sum(1),
+                      (x_high & ~y_high).sum(1), (x_high & y_high).sum(1)], axis=1)
+    tables, inverse = np.unique(cells, axis=0, return_inverse=True)
+    pvalues = np.array([exact_pvalue(t.reshape(2, 2)) for t in tables])
+    return pvalues[inverse.ravel()]
+
+
+def quadrant_significance(df, method='rank', weights=X_WEIGHTS, x_cols=X_COLS, y_col=Y_COL, threshold=None,
+                          n_permutations=N_PERMUTATIONS, n_bootstrap=N_BOOTSTRAP,
+                          concentration=WEIGHT_CONCENTRATION, level=0.95, alpha=0.05, seed=0,
+                          n_jobs=None, chunk_size=CHUNK_SIZE, key=KEY_COL):
+    """
+    사분면 교차표의 Fisher 정확 / 카이제곱 순열 / 부트스트랩 검정
+
+    X/Y 중 하나가 결측인 행정동(분류 불가)은 빼고 검정한다.
+
+    Args:
+        df (DataFrame): x_cols, y_col, key 컬럼이 있는 행정동 표 (quadrant.classify와 같은 입력)
+        method, weights, threshold: quadrant.classify 설정
+        n_permutations (int): 순열 재표본 수
+        n_bootstrap (int): 부트스트랩 재표본 수 (가중치 민감도도 같은 수만큼 뽑음)
+        concentration (float): 가중치 디리클레 집중도 (None/0이면 가중치 고정)
+        level (float): 신뢰구간 수준
+        alpha (float): 가중치 민감도에서 유의하다고 볼 p-value
+        seed (int): 난수 시드
+        n_jobs (int): 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서 계산)
+
+    Returns:
+        dict: table (교차표), chi2, p_asymptotic, p_exact, p_permutation,
+              p_weights (가중치 민감도 요약), chi2_band (부트스트랩 카이제곱 구간),
+              membership (행정동별 사분면 소속 확률 / 기준선까지 거리 구간 DataFrame), key
+    """
+    x_cols = list(x_cols)
+    threshold = NORMALIZERS[method]['threshold'] if threshold is None else threshold
+    x_threshold, y_threshold = threshold if isinstance(threshold, (tuple, list)) else (threshold, threshold)
+
+    observed = classify(df, method=method, weights=weights, x_cols=x_cols, y_col=y_col, threshold=threshold)
+    complete = (observed['quadrant'] > 0).to_numpy()
+    codes = observed['quadrant'].to_numpy()[complete]
+    table = contingency(observed)
+    x_high, y_high = np.isin(codes, (1, 4)), np.isin(codes, (1, 2))
+    stat = float(_chi2_from_codes(codes))
+
+    # 순열: 행/열 합계 고정
+    perm_stats = np.concatenate(_run_chunks(
+        _permutation_chunk, (x_high, y_high), n_permutations, chunk_size * 10, seed, n_jobs))
+    p_permutation = (1 + np.count_nonzero(perm_stats >= stat - 1e-9)) / (n_permutations + 1)
+
+    # 가중치 민감도 (원래 행정동)
+    p_weights = None
+    if concentration:
+        normed = normalize(df.loc[complete, x_cols + [y_col]], method)[x_cols].to_numpy()
+        pvalues = weight_sensitivity(normed, weights, concentration, x_threshold, y_high, n_bootstrap, seed + 1)
+        low, mid, high = np.quantile(pvalues, [(1 - level) / 2, 0.5, (1 + level) / 2])
+        p_weights = {'low': low, 'median': mid, 'high': high, 'share_significant': float(np.mean(pvalues < alpha))}
+
+    # 부트스트랩: 행정동 복원추출 + 가중치 추출
+    features = df.loc[complete, x_cols].to_numpy(dtype=float)
+    target = df.loc[complete, y_col].to_numpy(dtype=float)
+    parts = _run_chunks(_bootstrap_chunk,
+                        (features, target, tuple(weights), concentration, method, x_threshold, y_threshold),
+                        n_bootstrap, chunk_size, seed + 2, n_jobs)
+    boot_codes = np.concatenate([p[0] for p in parts])
+    x_margin = np.concatenate([p[1] for p in parts])
+    y_margin = np.concatenate([p[2] for p in parts])
+    boot_stats = np.concatenate([p[3] for p in parts])
+
+    quantiles = [(1 - level) / 2, (1 + level) / 2]
+    membership = pd.DataFrame({
+        key: df.loc[complete, key].to_numpy() if key in df else df.index[complete],
+        'quadrant': codes,
+        'label': observed['label'].to_numpy()[complete],
+    })
+    for q in (1, 2, 3, 4):
+        membership[f'p_q{q}'] = (boot_codes == q).mean(axis=0)
+    membership['stability'] = membership[[f'p_q{q}' for q in (1, 2, 3, 4)]].to_numpy()[np.arange(len(codes)), codes - 1]
+    membership[['X_margin_low', 'X_margin_high']] = np.quantile(x_margin, quantiles, axis=0).T
+    membership[['Y_margin_low', 'Y_margin_high']] = np.quantile(y_margin, quantiles, axis=0).T
+
+    return {
+        'method': method,
+        'table': table,
+        'chi2': stat,
+        'p_asymptotic': chi2_pvalue(stat),
+        'p_exact': exact_pvalue(table.to_numpy()),
+        'p_permutation': p_permutation,
+        'p_weights': p_weights,
+        'chi2_band': tuple(np.quantile(boot_stats, quantiles)),
+        'membership': membership.sort_values('stability').reset_index(drop=True),
+        'n_permutations': n_permutations,
+        'n_bootstrap': n_bootstrap,
+        'level': level,
+        'key': key,
+    }
+
+
+def print_significance(result, top=10):
+    """검정 결과 요약 출력"""
+    print(f"\n{'='*70}")
+    print(f"🧪 사분면 카이제곱 재표본 검정 ({result['method']})")
+    print(f"{'='*70}")
+    print(result['table'].to_string())
+    print(f"카이제곱 통계량: {result['chi2']:.4f}")
+    print(f"P-value (근사, chi2_contingency): {result['p_asymptotic']:.4f}")
+    print(f"P-value (Fisher 정확 검정): {result['p_exact']:.4f}")
+    print(f"P-value (순열 {result['n_permutations']:,}회): {result['p_permutation']:.4f}")
+    if result['p_weights'] is not None:
+        w = result['p_weights']
+        print(f"가중치 민감도: Fisher p-value {w['low']:.4f} ~ {w['high']:.4f} (중앙 {w['median']:.4f}), "
+              f"유의한 비율 {w['share_significant']:.1%}")
+    low, high = result['chi2_band']
+    print(f"부트스트랩 {result['n_bootstrap']:,}회 카이제곱 {result['level']:.0%} 구간: {low:.3f} ~ {high:.3f}")
+
+    membership = result['membership']
+    print(f"\n📍 사분면 소속이 흔들리는 행정동 (안정도 낮은 순 {top}개)")
+    print(membership.head(top).drop(columns='quadrant').round(3).to_string(index=False))
+    # 다른 사분면 중 가장 자주 가는 곳 (현재 사분면은 제외)
+    key = result.get('key', KEY_COL)
+    unstable = membership[membership['stability'] < 0.5]
+    others = unstable[[f'p_q{q}' for q in (1, 2, 3, 4)]].to_numpy().copy()
+    others[np.arange(len(unstable)), unstable['quadrant'].to_numpy() - 1] = -1
+    likely = others.argmax(axis=1) + 1
+    moves = [f"{name}→{QUADRANTS[q][0]} {others[i, q - 1]:.0%}"
+             for i, (name, q) in enumerate(zip(unstable[key], likely))] if key in unstable else []
+    print(f"⚠️ 절반 이상 다른 사분면으로 가는 행정동: {len(unstable)}개" + (f" ({', '.join(moves)})" if moves else ""))
+
+
+# 메인 실행
+if __name__ == "__main__":
+    df = load_xy()
+    for method in ('rank', 'zscore'):
+        print_significance(quadrant_significance(df, method=method))
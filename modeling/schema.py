@@ -0,0 +1,202 @@
+"""
+raw_data 상권 테이블 스키마 선언 및 검증
+
+각 원본 테이블의 컬럼 타입을 선언해 두고, 로드할 때 그대로 변환/검증한다.
+- 행정동명, 업종명, 상권변화지표명 등 반복되는 문자열 → category
+- 기준_년분기_코드, 행정동_코드 → int32
+- 인구/시설/점포 수 → 값 범위에 맞는 가장 작은 정수형 (int16/int32)
+- 매출 금액 → int64, 비율 → float32
+
+선언한 정수형은 여러 컬럼을 더해도 넘치지 않도록 여유를 두고 골랐다.
+(예: 연령대_10 + 20 + 30 상주인구는 int16 범위를 넘을 수 있어서 int32)
+"""
+import numpy as np
+import pandas as pd
+
+# ===== 공통 컬럼명 =====
+QUARTER_COL = '기준_년분기_코드'
+DONG_COL = '행정동_코드'
+DONG_NAME_COL = '행정동_코드_명'
+SECTOR_COL = '서비스_업종_코드_명'
+
+# 스키마가 바뀌면 올려서 기존 Parquet 캐시를 다시 만들게 함
+SCHEMA_VERSION = 1
+
+QUARTER = 'int32'
+CODE = 'int32'
+NAME = 'category'
+
+# 테이블별 스키마
+#   columns: 컬럼명 → dtype (반드시 있어야 하는 컬럼)
+#   patterns: (접미사, dtype) — columns에 없는 컬럼은 접미사로 타입 결정
+#   zero_fill: 빈 칸을 0으로 읽을 컬럼 접미사 (집계표의 빈 칸 = 해당 시설/점포 없음)
+SCHEMAS = {
+    '매출': {
+        'columns': {
+            QUARTER_COL: QUARTER, DONG_COL: CODE, DONG_NAME_COL: NAME, SECTOR_COL: NAME,
+            '당월_매출_금액': 'int64',
+        },
+        'patterns': [('_업종_코드', NAME), ('_금액', 'int64'), ('_건수', 'int32')],
+        'zero_fill': ['_금액', '_건수'],
+    },
+    '유동인구': {
+        'columns': {
+            QUARTER_COL: QUARTER, DONG_COL: CODE, DONG_NAME_COL: NAME,
+            '총_유동인구_수': 'int32',
+        },
+        'patterns': [('_유동인구_수', 'int32')],
+    },
+    '상주인구': {
+        'columns': {
+            QUARTER_COL: QUARTER, DONG_COL: CODE, DONG_NAME_COL: NAME,
+            '총_상주인구_수': 'int32', '총_가구_수': 'int32',
+        },
+        'patterns': [('_상주인구_수', 'int32'), ('_가구_수', 'int32')],
+    },
+    '상권변화지표': {
+        'columns': {
+            QUARTER_COL: QUARTER, DONG_COL: CODE, DONG_NAME_COL: NAME,
+            '상권_변화_지표': NAME, '상권_변화_지표_명': NAME,
+            '운영_영업_개월_평균': 'int16',
+        },
+        'patterns': [('_개월_평균', 'int16')],
+    },
+    '집객시설': {
+        'columns': {
+            QUARTER_COL: QUARTER, DONG_COL: CODE, DONG_NAME_COL: NAME,
+            '집객시설_수': 'int16', '지하철_역_수': 'int16',
+        },
+        'patterns': [('_수', 'int16')],
+        'zero_fill': ['_수'],
+    },
+    '카페': {
+        'columns': {
+            QUARTER_COL: QUARTER, DONG_COL: CODE, DONG_NAME_COL: NAME, SECTOR_COL: NAME,
+            '점포_수': 'int16',
+        },
+        'patterns': [('_업종_코드', NAME), ('_점포_수', 'int16'), ('_율', 'float32'), ('_률', 'float32')],
+        'zero_fill': ['_점포_수'],
+    },
+    '면적': {
+        'columns': {
+            DONG_COL: CODE, '행정동_명': NAME,
+            '엑스좌표_값': 'int32', '와이좌표_값': 'int32', '영역_면적': 'int32',
+        },
+        'patterns': [],
+    },
+}
+
+
+def column_dtype(name, column):
+    """테이블 컬럼의 선언 타입 (선언되지 않은 컬럼은 None)"""
+    schema = SCHEMAS[name]
+    if column in schema['columns']:
+        return schema['columns'][column]
+    for suffix, dtype in schema['patterns']:
+        if column.endswith(suffix):
+            return dtype
+    return None
+
+
+def _is_zero_fill(name, column):
+    return any(column.endswith(suffix) for suffix in SCHEMAS[name].get('zero_fill', []))
+
+
+def _check_valid_quarters(name, values):
+    quarter = pd.Series(values)
+    bad = quarter[~(quarter.between(20001, 21004) & (quarter % 10).between(1, 4))]
+    if len(bad):
+        raise ValueError(f"[{name}] 잘못된 {QUARTER_COL} 값: {sorted(bad.unique())[:5]}")
+
+
+def _cast_integer(name, column, series, dtype):
+    if _is_zero_fill(name, column):
+        series = series.fillna(0)
+    elif series.isna().any():
+        raise ValueError(f"[{name}] {column}: 결측값이 있어 {dtype}로 변환할 수 없습니다.")
+
+    values = pd.to_numeric(series, errors='raise')
+    if len(values) and not np.array_equal(values, np.round(values)):
+        raise ValueError(f"[{name}] {column}: 정수가 아닌 값이 있습니다.")
+
+    info = np.iinfo(dtype)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        raise ValueError(
+            f"[{name}] {column}: 값 범위({values.min()} ~ {values.max()})가 {dtype}를 벗어났습니다."
+        )
+    return values.astype(dtype)
+
+
+def apply_schema(name, df, partial=False):
+    """
+    선언된 스키마대로 타입 변환 후 검증
+
+    Args:
+        name (str): 테이블명 (SCHEMAS 키)
+        df (pd.DataFrame): 원본 CSV에서 읽은 데이터
+        partial (bool): True면 일부 컬럼만 읽은 경우로 보고 필수 컬럼 검사 생략
+
+    Returns:
+        pd.DataFrame: 타입이 변환된 데이터
+    """
+    missing = [c for c in SCHEMAS[name]['columns'] if c not in df.columns]
+    if missing and not partial:
+        raise ValueError(f"[{name}] 필수 컬럼 누락: {missing}")
+
+    df = df.copy()
+    for column in df.columns:
+        dtype = column_dtype(name, column)
+        if dtype is None:
+            continue
+        if dtype == NAME:
+            df[column] = df[column].astype('category')
+        elif dtype.startswith('float'):
+            df[column] = pd.to_numeric(df[column], errors='raise').astype(dtype)
+        else:
+            df[column] = _cast_integer(name, column, df[column], dtype)
+
+    if QUARTER_COL in df.columns:
+        _check_valid_quarters(name, df[QUARTER_COL].unique())
+
+    validate(name, df)
+    return df
+
+
+def validate(name, df):
+    """
+    로드한 데이터가 선언된 스키마와 일치하는지 검증 (컬럼 일부만 읽은 경우 해당 컬럼만)
+
+    Raises:
+        ValueError: 타입이 다르거나 키 컬럼에 결측이 있는 경우
+    """
+    for column in df.columns:
+        dtype = column_dtype(name, column)
+        if dtype is None:
+            continue
+        actual = df[column].dtype
+        expected = 'category' if dtype == NAME else np.dtype(dtype)
+        if (dtype == NAME and not isinstance(actual, pd.CategoricalDtype)) or (dtype != NAME and actual != expected):
+            raise ValueError(f"[{name}] {column}: 타입 불일치 (선언 {dtype}, 실제 {actual})")
+
+    for key in (QUARTER_COL, DONG_COL):
+        if key in df.columns and df[key].isna().any():
+            raise ValueError(f"[{name}] 키 컬럼 {key}에 결측값이 있습니다.")
+    return df
+
+
+def memory_report(tables):
+    """
+    테이블별 메모리 사용량 비교
+
+    Args:
+        tables (dict): 테이블명 → (변환 전 DataFrame, 변환 후 DataFrame)
+
+    Returns:
+        pd.DataFrame: 테이블별 변환 전/후 MB와 감소 배수
+    """
+    rows = []
+    for name, (before, after) in tables.items():
+        mb_before = before.memory_usage(deep=True).sum() / 1024 ** 2
+        mb_after = after.memory_usage(deep=True).sum() / 1024 ** 2
+        rows.append({'테이블': name, '변환_전_MB': mb_before, '변환_후_MB': mb_after, '감소_배수': mb_before / mb_after})
+    return pd.DataFrame(rows).round(2)
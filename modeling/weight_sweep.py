@@ -0,0 +1,215 @@
+"""
+넥스트 성수 지수(NSI) 가중치 그리드 탐색
+
+modeling_data.py에서는 가중치 조합(0.4/0.4/0.2, 0.5/0.3/0.2, ...)과
+매출/유입 강도 분위수 컷을 셀마다 손으로 바꿔 가며 성수 순위를 확인했다.
+여기서는
+1. 가중치를 단체(simplex, 합=1) 격자로 만들고
+2. 필터(매출 분위수 컷 × 유입 강도 분위수 컷) 조합마다 정규화 피처 행렬을 만든 뒤
+3. (행정동 × 피처) @ (피처 × 가중치 조합) 행렬곱 한 번으로 모든 조합의 점수를 계산한다.
+가중치 조합은 묶음 단위로 나눠 프로세스 풀에서 순위까지 계산한다.
+
+결과는 조합별 검증 행정동(성수 등) 순위 / 순위 안정성 표와 행정동별 순위 분포 표.
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DONG_NAME_COL, QUARTER_COL
+from dong_registry import group_names
+from features import compute_features
+
+# 넥스트 성수 지수 기본 구성 (modeling_data.py의 MZ_유입_비중 / 상권_유입_강도 / 상권지표 점수)
+# 팩트 테이블에 상권지표 점수가 없어서 운영_영업_개월_평균으로 대신함
+NSI_FEATURES = ['MZ_유입_비중', '상권_유입_강도', '운영_영업_개월_평균']
+SALES_COL = '당월_매출_금액'
+INFLOW_COL = '상권_유입_강도'
+VALIDATION_DONGS = ['성수동_통합']
+
+
+# ===== 가중치 격자 =====
+def simplex_grid(n_features, step=0.1, min_weight=0.0):
+    """
+    합이 1인 가중치 격자
+
+    Args:
+        n_features (int): 피처 수
+        step (float): 격자 간격 (1/step은 정수여야 함)
+        min_weight (float): 피처별 최소 가중치
+
+    Returns:
+        np.ndarray: (조합 수, n_features) 가중치 행렬
+    """
+    units = int(round(1 / step))
+    if not np.isclose(units * step, 1):
+        raise ValueError(f"step({step})은 1을 나누어떨어지게 하는 값이어야 합니다.")
+
+    # 막대 나누기(stars and bars): units개를 n_features칸에 나누는 모든 경우
+    rows = []
+    for bars in itertools.combinations(range(units + n_features - 1), n_features - 1):
+        edges = (-1,) + bars + (units + n_features - 1,)
+        rows.append([edges[i + 1] - edges[i] - 1 for i in range(n_features)])
+    grid = np.array(rows, dtype=np.float64) / units
+    return grid[(grid >= min_weight - 1e-12).all(axis=1)]
+
+
+# ===== 후보 테이블 =====
+def build_dong_table(df_grouped, features=NSI_FEATURES, quarters=None):
+    """
+    행정동 단위 후보 테이블 (성수 4개 동은 성수동_통합으로 묶음)
+
+    매출은 기간 합계, 나머지 피처는 기간 평균 (modeling_data.py와 동일)
+    """
+    df = df_grouped if quarters is None else df_grouped[df_grouped[QUARTER_COL].isin(quarters)]
+    df = compute_features(df, [c for c in features + [INFLOW_COL] if c not in df.columns])
+    df = df.assign(**{DONG_NAME_COL: group_names(df[DONG_NAME_COL])})
+
+    agg = {c: 'mean' for c in dict.fromkeys(features + [INFLOW_COL])}
+    agg[SALES_COL] = 'sum'
+    return df.groupby(DONG_NAME_COL, observed=True).agg(agg).reset_index()
+
+
+def _minmax(X):
+    span = X.max(axis=0) - X.min(axis=0)
+    return (X - X.min(axis=0)) / np.where(span > 0, span, 1)
+
+
+# ===== 순위 계산 (프로세스 풀 작업 단위) =====
+def _rank_chunk(X, weights):
+    """
+    가중치 묶음 하나에 대한 행정동 순위 (1위 = 점수 최고)
+
+    Returns:
+        np.ndarray: (행정동 수, 조합 수) int32 순위
+    """
+    scores = X @ weights.T
+    order = np.argsort(-scores, axis=0, kind='stable')
+    ranks = np.empty_like(order, dtype=np.int32)
+    np.put_along_axis(ranks, order, np.arange(1, len(X) + 1, dtype=np.int32)[:, None], axis=0)
+    return ranks
+
+
+def rank_all(X, grid, n_jobs=None, chunk_size=2_000):
+    """
+    모든 가중치 조합에 대한 순위 행렬
+
+    Args:
+        X (np.ndarray): (행정동 수, 피처 수) 정규화 피처 행렬
+        grid (np.ndarray): (조합 수, 피처 수) 가중치
+        n_jobs (int): 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서 계산)
+        chunk_size (int): 프로세스 하나가 한 번에 처리할 조합 수
+
+    Returns:
+        np.ndarray: (행정동 수, 조합 수) 순위
+    """
+    chunks = [grid[i:i + chunk_size] for i in range(0, len(grid), chunk_size)]
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(chunks) == 1:
+        parts = [_rank_chunk(X, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks))) as pool:
+            parts = list(pool.map(_rank_chunk, [X] * len(chunks), chunks))
+    return np.concatenate(parts, axis=1)
+
+
+# ===== 탐색 =====
+def _filter_mask(table, sales_q, inflow_q):
+    """매출 상위(이미 메이저 상권) 제외 + 유입 강도 하위(단순 주거지) 제외"""
+    mask = np.ones(len(table), dtype=bool)
+    if sales_q is not None:
+        mask &= (table[SALES_COL] < table[SALES_COL].quantile(sales_q)).to_numpy()
+    if inflow_q is not None:
+        mask &= (table[INFLOW_COL] > table[INFLOW_COL].quantile(inflow_q)).to_numpy()
+    return mask
+
+
+def sweep_weights(table, features=NSI_FEATURES, grid=None, sales_quantiles=(None, 0.8),
+                  inflow_quantiles=(None, 0.3), validation=VALIDATION_DONGS, top_k=10, n_jobs=None):
+    """
+    가중치 격자 × 필터 조합 전체에 대한 NSI 순위 탐색
+
+    Args:
+        table (pd.DataFrame): build_dong_table 결과
+        features (list): 지수에 쓰는 피처 (grid 열 순서)
+        grid (np.ndarray): 가중치 격자 (None이면 simplex_grid(len(features), 0.1))
+        sales_quantiles (tuple): 당월_매출_금액 상한 분위수 후보 (None = 컷 없음)
+        inflow_quantiles (tuple): 상권_유입_강도 하한 분위수 후보 (None = 컷 없음)
+        validation (list): 순위를 추적할 검증 행정동
+        top_k (int): TOP-k 안정성 기준
+        n_jobs (int): 프로세스 수
+
+    Returns:
+        tuple: (조합별 결과 DataFrame, 행정동별 순위 분포 DataFrame)
+            조합별 결과: 필터 + 가중치 + 후보_수 + 검증 행정동 순위(필터에서 빠지면 결측)
+                + 합의_순위_상관(스피어만) + TOP{k}_일치율
+            행정동별 분포: 필터별 평균/표준편차/최고/최저 순위와 TOP{k} 포함 비율
+    """
+    grid = simplex_grid(len(features)) if grid is None else np.asarray(grid, dtype=np.float64)
+    names = table[DONG_NAME_COL].astype(str).to_numpy()
+
+    results = []
+    stability = []
+    for sales_q, inflow_q in itertools.product(sales_quantiles, inflow_quantiles):
+        mask = _filter_mask(table, sales_q, inflow_q)
+        n = int(mask.sum())
+        if n == 0:
+            continue
+
+        # 필터 후 후보끼리 다시 min-max 정규화 (modeling_data.py의 필터 → scaler 순서)
+        X = _minmax(table.loc[mask, features].to_numpy(dtype=np.float64))
+        ranks = rank_all(X, grid, n_jobs)
+
+        # 합의 순위: 전체 조합 평균 순위 기준
+        mean_rank = ranks.mean(axis=1)
+        consensus = np.empty(n, dtype=np.int64)
+        consensus[np.argsort(mean_rank, kind='stable')] = np.arange(1, n + 1)
+        d2 = ((ranks - consensus[:, None]) ** 2).sum(axis=0)
+        spearman = 1 - 6 * d2 / (n * (n ** 2 - 1)) if n > 1 else np.ones(len(grid))
+        k = min(top_k, n)
+        top_overlap = ((ranks <= k) & (consensus[:, None] <= k)).sum(axis=0) / k
+
+        frame = pd.DataFrame(grid, columns=[f'w_{f}' for f in features])
+        frame.insert(0, '유입_하위_컷', inflow_q)
+        frame.insert(0, '매출_상위_컷', sales_q)
+        frame['후보_수'] = n
+        cand = names[mask]
+        for dong in validation:
+            hit = np.flatnonzero(cand == dong)
+            frame[f'{dong}_순위'] = ranks[hit[0]] if len(hit) else np.nan
+        frame['합의_순위_상관'] = spearman
+        frame[f'TOP{top_k}_일치율'] = top_overlap
+        results.append(frame)
+
+        stability.append(pd.DataFrame({
+            '매출_상위_컷': sales_q,
+            '유입_하위_컷': inflow_q,
+            DONG_NAME_COL: cand,
+            '합의_순위': consensus,
+            '평균_순위': mean_rank,
+            '순위_표준편차': ranks.std(axis=1),
+            '최고_순위': ranks.min(axis=1),
+            '최저_순위': ranks.max(axis=1),
+            f'TOP{top_k}_비율': (ranks <= k).mean(axis=1),
+        }).sort_values('합의_순위'))
+
+    return pd.concat(results, ignore_index=True), pd.concat(stability, ignore_index=True)
+
+
+def print_sweep_summary(results, validation=VALIDATION_DONGS):
+    """필터 조합별 검증 행정동 순위 범위 요약 출력"""
+    keys = ['매출_상위_컷', '유입_하위_컷']
+    summary = results.fillna({k: '없음' for k in keys}).groupby(keys, sort=False)
+    print("--- [가중치 탐색] 필터별 요약 ---")
+    for (sales_q, inflow_q), part in summary:
+        line = f"매출컷 {sales_q} / 유입컷 {inflow_q}: 후보 {part['후보_수'].iloc[0]}개, 조합 {len(part):,}개"
+        for dong in validation:
+            ranks = part[f'{dong}_순위']
+            if ranks.isna().all():
+                line += f" | {dong}: 필터에서 제외"
+            else:
+                line += f" | {dong}: {int(ranks.min())}~{int(ranks.max())}위 (중앙 {ranks.median():.0f}위)"
+        line += f" | 순위 상관 평균 {part['합의_순위_상관'].mean():.3f}"
+        print(line)